@@ -1,21 +1,58 @@
-from fastapi import APIRouter, Query, Depends
-from ..services.search_service import SearchService
-from ..repositories.operator_repository import OperatorRepository
+from datetime import date
+from functools import lru_cache
+from fastapi import APIRouter, Query, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..repositories.operator_search import InvalidCursor
+from ..services.expense_service import DEFAULT_ACCOUNT, ExpenseService
+from ..services.search_service import COLUMNS, SearchService
 
 router = APIRouter()
 
+@lru_cache
 def get_search_service():
-    service = SearchService()
-    try:
-        yield service
-    finally:
-        del service
+    return SearchService()
+
+def parse_fields(fields):
+    # "razao_social,uf" -> ("razao_social", "uf"); sem fields, todas as colunas
+    if not fields:
+        return tuple(COLUMNS)
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in COLUMNS]
+    if unknown or not names:
+        raise HTTPException(status_code=422, detail=f"Campos inválidos: {', '.join(unknown)}")
+    return names
 
 @router.get("/search")
 async def search_operators(
     query: str = Query(..., min_length=2, description="Termo de busca"),
     limit: int = Query(10, gt=0, le=100, description="Limite de resultados"),
-    service: SearchService = Depends(get_search_service)
+    fields: str = Query(None, description="Colunas retornadas, separadas por vírgula"),
+    cursor: str = Query(None, description="next_cursor da página anterior"),
+    service: SearchService = Depends(get_search_service),
+    db: AsyncSession = Depends(get_async_db)
+):
+    columns = parse_fields(fields)
+    try:
+        page = await service.search_page(db, query, limit, columns, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Os resultados já são dicts de tipos simples: dispensa a validação do response_model
+    return JSONResponse({"query": query, "results": page["results"], "next_cursor": page["next_cursor"]})
+
+@router.get("/despesas/top")
+async def top_expenses(
+    periodo: str = Query("trimestre", pattern="^(trimestre|ano)$", description="Último trimestre completo ou último ano"),
+    limit: int = Query(10, gt=0, le=100, description="Número de operadoras"),
+    conta: str = Query(DEFAULT_ACCOUNT, min_length=2, description="Descrição da conta contábil"),
+    referencia: date = Query(None, description="Data de referência (padrão: hoje)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    results = service.search_operators(query, limit)
-    return {"query": query, "results": results}
\ No newline at end of file
+    # Lê os totais por trimestre de despesas_trimestrais; só as pontas do período que
+    # não cobrem um trimestre inteiro vêm das demonstrações contábeis
+    return await ExpenseService().top_expenses(db, periodo, limit, conta, referencia)
+
+@router.get("/search/cache")
+def search_cache_stats(service: SearchService = Depends(get_search_service)):
+    return service.cache_stats()
@@ -1,10 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .api.endpoints import router as api_router
+from .database import dispose_async_engine, init_db
+from .metrics import LatencyMiddleware, router as metrics_router
 
-app = FastAPI(title="ANS Operators Search API")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    yield
+    await dispose_async_engine()
+
+
+app = FastAPI(title="ANS Operators Search API", lifespan=lifespan)
+
+app.add_middleware(LatencyMiddleware)
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8010)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8010)
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# Rotas com a latência medida; as demais passam pelo middleware sem custo
+INSTRUMENTED_PATHS = {"/api/search"}
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    # Histograma no formato texto do Prometheus, sem depender do prometheus_client
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = sorted((key, list(counts), count, total) for key, (counts, count, total) in self._series.items())
+        for key, counts, count, total in snapshot:
+            labels = ",".join(f'{name}="{value}"' for name, value in key)
+            for bound, bucket in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {bucket}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+request_latency = Histogram(
+    "ans_api_request_duration_seconds", "Latência das requisições, por rota e status.", LATENCY_BUCKETS
+)
+
+
+class LatencyMiddleware:
+    # Middleware ASGI puro: mede do recebimento ao último byte da resposta
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in INSTRUMENTED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_latency.observe(
+                time.perf_counter() - start, method=scope["method"], path=scope["path"], status=status
+            )
+
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    # Inclui as métricas da última execução do pipeline, quando o arquivo existir
+    body = request_latency.render()
+    pipeline_metrics = os.environ.get("PIPELINE_METRICS_FILE")
+    if pipeline_metrics and os.path.exists(pipeline_metrics):
+        with open(pipeline_metrics, encoding="utf-8") as f:
+            body += f.read()
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
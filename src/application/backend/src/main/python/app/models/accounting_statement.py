@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Numeric, String
+from ..database import Base
+
+class AccountingStatement(Base):
+    # Linhas das demonstrações contábeis carregadas por database/ingestion; a
+    # API só as lê nas pontas dos períodos que não cobrem um trimestre inteiro
+    __tablename__ = "demonstracoes_contabeis"
+    
+    data = Column(Date, primary_key=True)
+    reg_ans = Column(String(20), primary_key=True)
+    cd_conta_contabil = Column(String(20), primary_key=True)
+    descricao = Column(String(255), nullable=False)
+    vl_saldo_inicial = Column(Numeric(15, 2), nullable=False)
+    vl_saldo_final = Column(Numeric(15, 2), nullable=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Index, Integer, Numeric, String, func
+from ..database import Base
+
+class QuarterlyExpense(Base):
+    # Totais por operadora, conta e trimestre, mantidos pela ingestão das
+    # demonstrações contábeis (database/ingestion/rollups.py)
+    __tablename__ = "despesas_trimestrais"
+    
+    trimestre = Column(Date, primary_key=True)
+    reg_ans = Column(String(20), primary_key=True)
+    cd_conta_contabil = Column(String(20), primary_key=True)
+    descricao = Column(String(255), nullable=False)
+    total = Column(Numeric(18, 2), nullable=False)
+    linhas = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_despesas_trimestrais_conta", func.upper(descricao), "trimestre", "reg_ans", "total"),
+    )
@@ -0,0 +1,60 @@
+from datetime import date
+from sqlalchemy import and_, func, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.accounting_statement import AccountingStatement
+from ..models.operator import Operator
+from ..models.quarterly_expense import QuarterlyExpense
+
+def quarter_start(value: date):
+    return date(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+
+def whole_quarters(inicio: date, fim: date):
+    # [primeiro, apos_ultimo): trimestres inteiramente dentro de [inicio, fim)
+    primeiro = quarter_start(inicio)
+    if primeiro < inicio:
+        month = primeiro.month + 3
+        primeiro = date(primeiro.year + (month > 12), (month - 1) % 12 + 1, 1)
+    return primeiro, max(primeiro, quarter_start(fim))
+
+class AsyncExpenseRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def top_operators(self, descricao: str, inicio, fim, limit: int = 10):
+        # Soma as despesas da conta no período [inicio, fim), com a mesma regra de
+        # database/sql/queries_analiticas.sql: os trimestres inteiros vêm dos totais
+        # de despesas_trimestrais e as pontas do período que caem no meio de um
+        # trimestre vêm das linhas de demonstracoes_contabeis. upper() em vez de
+        # ILIKE, como no índice de despesas_trimestrais, que cobre a consulta
+        primeiro, apos_ultimo = whole_quarters(inicio, fim)
+        parts = [
+            select(QuarterlyExpense.reg_ans.label("reg_ans"), QuarterlyExpense.total.label("total"))
+            .where(
+                QuarterlyExpense.trimestre >= primeiro,
+                QuarterlyExpense.trimestre < apos_ultimo,
+                func.upper(QuarterlyExpense.descricao) == descricao.upper(),
+            )
+        ]
+        edges = [(start, end) for start, end in ((inicio, primeiro), (apos_ultimo, fim)) if start < end]
+        if edges:
+            parts.append(
+                select(
+                    AccountingStatement.reg_ans.label("reg_ans"),
+                    (AccountingStatement.vl_saldo_final - AccountingStatement.vl_saldo_inicial).label("total"),
+                )
+                .where(
+                    or_(*(and_(AccountingStatement.data >= start, AccountingStatement.data < end)
+                          for start, end in edges)),
+                    func.upper(AccountingStatement.descricao) == descricao.upper(),
+                )
+            )
+        totals = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+        total = func.sum(totals.c.total).label("total_despesas")
+        statement = (
+            select(totals.c.reg_ans, Operator.razao_social, total)
+            .outerjoin(Operator, Operator.registro_ans == totals.c.reg_ans)
+            .group_by(totals.c.reg_ans, Operator.razao_social)
+            .order_by(total.desc(), totals.c.reg_ans)
+            .limit(limit)
+        )
+        return (await self.db.execute(statement)).all()
@@ -0,0 +1,219 @@
+import csv
+import io
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+import pandas as pd
+from sqlalchemy import insert
+from ..models.operator import Operator
+
+logger = logging.getLogger(__name__)
+
+# Colunas do CSV da ANS e os atributos correspondentes do modelo
+COLUMN_MAP = {
+    'Registro_ANS': 'registro_ans',
+    'CNPJ': 'cnpj',
+    'Razao_Social': 'razao_social',
+    'Nome_Fantasia': 'nome_fantasia',
+    'Modalidade': 'modalidade',
+    'Logradouro': 'logradouro',
+    'Numero': 'numero',
+    'Complemento': 'complemento',
+    'Bairro': 'bairro',
+    'Cidade': 'cidade',
+    'UF': 'uf',
+    'CEP': 'cep',
+    'DDD': 'ddd',
+    'Telefone': 'telefone',
+    'Fax': 'fax',
+    'Endereco_eletronico': 'endereco_eletronico',
+    'Representante': 'representante',
+    'Cargo_Representante': 'cargo_representante',
+    'Regiao_de_Comercializacao': 'regiao_de_comercializacao',
+    'Data_Registro_ANS': 'data_registro_ans',
+}
+COLUMNS = list(COLUMN_MAP.values())
+
+# Campos opcionais: vazio vira NULL, como no carregamento original
+OPTIONAL_COLUMNS = [
+    'nome_fantasia', 'complemento', 'ddd', 'telefone', 'fax', 'endereco_eletronico',
+    'representante', 'cargo_representante', 'regiao_de_comercializacao',
+]
+
+UFS = {
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO',
+}
+
+CHUNK_SIZE = 50_000
+
+# Marcador de parâmetro posicional de cada paramstyle da DB-API
+PLACEHOLDERS = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+
+
+@dataclass
+class LoadReport:
+    loaded: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    bad_rows_path: str = None
+
+
+def validate_chunk(df):
+    """Valida e normaliza um bloco do CSV; retorna (válidas, rejeitadas)
+
+    As regras são aplicadas coluna a coluna sobre o bloco inteiro. As linhas
+    rejeitadas ganham a coluna 'erros' com todos os problemas encontrados.
+    """
+    df = df.rename(columns=COLUMN_MAP)
+    df = df.apply(lambda col: col.str.strip())
+
+    checks = [
+        (df['registro_ans'].str.fullmatch(r'\d{1,20}'), 'registro_ans inválido'),
+        (df['cnpj'].str.fullmatch(r'\d{14}'), 'cnpj inválido'),
+        (df['razao_social'] != '', 'razao_social vazia'),
+        (df['modalidade'] != '', 'modalidade vazia'),
+        (df['uf'].isin(UFS), 'uf inválida'),
+        (df['cep'].str.fullmatch(r'\d{8}|'), 'cep inválido'),
+        (pd.to_datetime(df['data_registro_ans'], format='%Y-%m-%d', errors='coerce').notna(),
+         'data_registro_ans inválida'),
+    ]
+    errors = pd.Series('', index=df.index, dtype=object)
+    for valid, message in checks:
+        invalid = ~valid.fillna(False).astype(bool)
+        errors[invalid] = errors[invalid] + message + '; '
+
+    bad = errors != ''
+    rejected = df[bad].assign(erros=errors[bad].str.rstrip('; '))
+
+    valid = df[~bad].astype(object)
+    optional = valid[OPTIONAL_COLUMNS]
+    valid[OPTIONAL_COLUMNS] = optional.where(optional != '', None)
+    return valid[COLUMNS], rejected
+
+
+def read_operators(csv_path, chunk_size=CHUNK_SIZE):
+    """Lê o CSV em blocos; cada bloco guarda na coluna 'linha' a linha do arquivo"""
+    reader = pd.read_csv(
+        csv_path, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False,
+        chunksize=chunk_size
+    )
+    for chunk in reader:
+        chunk.insert(0, 'linha', chunk.index + 2)
+        yield chunk
+
+
+class BulkOperatorLoader:
+    """Carrega o CSV das operadoras em massa, com upsert por registro_ans
+
+    No PostgreSQL, cada bloco validado é enviado com COPY FROM STDIN para uma
+    tabela temporária, e um único INSERT ... ON CONFLICT move os dados para
+    operators. Nos demais bancos, os blocos são gravados com executemany em
+    lotes. Em ambos os casos a carga pode ser repetida sem duplicar linhas.
+    """
+
+    def __init__(self, connection, chunk_size=CHUNK_SIZE):
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.dialect = connection.dialect.name
+
+    def load(self, csv_path, bad_rows_path=None):
+        start = time.perf_counter()
+        report = LoadReport()
+        rejected = []
+
+        if self.dialect == 'postgresql':
+            self._create_staging()
+        for chunk in read_operators(csv_path, self.chunk_size):
+            lines = chunk.pop('linha')
+            valid, bad = validate_chunk(chunk)
+            if not bad.empty:
+                rejected.append(bad.assign(linha=lines[bad.index]))
+            if valid.empty:
+                continue
+            if self.dialect == 'postgresql':
+                self._copy_chunk(valid.assign(linha=lines[valid.index]))
+            else:
+                self._upsert_chunk(valid)
+            report.loaded += len(valid)
+        if self.dialect == 'postgresql':
+            self._merge_staging()
+
+        if rejected:
+            bad_rows = pd.concat(rejected)
+            report.rejected = len(bad_rows)
+            self._report_bad_rows(bad_rows, bad_rows_path)
+            report.bad_rows_path = str(bad_rows_path) if bad_rows_path else None
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _report_bad_rows(self, bad_rows, bad_rows_path):
+        logger.warning("%d linhas rejeitadas ao carregar operadoras", len(bad_rows))
+        for row in bad_rows.head(5).itertuples():
+            logger.warning("  linha %s: %s", row.linha, row.erros)
+        if bad_rows_path:
+            Path(bad_rows_path).parent.mkdir(parents=True, exist_ok=True)
+            bad_rows.to_csv(bad_rows_path, sep=';', index=False, encoding='utf-8')
+
+    def _upsert_chunk(self, valid):
+        placeholder = PLACEHOLDERS.get(self.connection.dialect.paramstyle)
+        if self.dialect not in ('sqlite', 'postgresql') or placeholder is None:
+            # Sem upsert nativo: remove as operadoras do bloco e insere de novo
+            records = valid.to_dict('records')
+            keys = [record['registro_ans'] for record in records]
+            self.connection.execute(Operator.__table__.delete().where(Operator.registro_ans.in_(keys)))
+            self.connection.execute(insert(Operator.__table__), records)
+            return
+
+        # executemany direto no driver, com tuplas: evita montar um dict e
+        # compilar parâmetros por linha
+        columns = ", ".join(COLUMNS)
+        values = ", ".join([placeholder] * len(COLUMNS))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS if column != 'registro_ans')
+        self.connection.exec_driver_sql(
+            f"INSERT INTO operators ({columns}) VALUES ({values}) "
+            f"ON CONFLICT (registro_ans) DO UPDATE SET {updates}",
+            list(valid.itertuples(index=False, name=None))
+        )
+
+    def _raw_cursor(self):
+        return self.connection.connection.driver_connection.cursor()
+
+    def _create_staging(self):
+        columns = ", ".join(f"{column} TEXT" for column in COLUMNS)
+        cursor = self._raw_cursor()
+        cursor.execute("DROP TABLE IF EXISTS operators_staging")
+        cursor.execute(
+            f"CREATE TEMP TABLE operators_staging ({columns}, linha BIGINT) ON COMMIT DROP"
+        )
+        cursor.close()
+
+    def _copy_chunk(self, valid):
+        buffer = io.StringIO()
+        valid.to_csv(buffer, header=False, index=False, na_rep='\\N', quoting=csv.QUOTE_MINIMAL)
+        buffer.seek(0)
+        sql = (
+            f"COPY operators_staging ({', '.join(COLUMNS)}, linha) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+        cursor = self._raw_cursor()
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        cursor.close()
+
+    def _merge_staging(self):
+        # Se o mesmo registro_ans aparecer mais de uma vez, vale a última linha do arquivo
+        columns = ", ".join(COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS if column != 'registro_ans')
+        cursor = self._raw_cursor()
+        cursor.execute(
+            f"INSERT INTO operators ({columns}) "
+            f"SELECT DISTINCT ON (registro_ans) {columns} FROM operators_staging "
+            f"ORDER BY registro_ans, linha DESC "
+            f"ON CONFLICT (registro_ans) DO UPDATE SET {updates}"
+        )
+        cursor.close()
@@ -1,62 +1,73 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..models.operator import Operator
-from ..database import SessionLocal, engine
-import csv
+from . import operator_snapshot
+from .operator_loader import BulkOperatorLoader
+from .operator_search import (
+    ngram_index, search_ngram, search_ngram_async, search_page_ngram_async, search_page_postgres_async,
+    search_postgres, search_postgres_async
+)
 from pathlib import Path
 
-# Cria as tabelas no banco de dados
-Operator.metadata.create_all(bind=engine)
+DEFAULT_CSV_PATH = Path(__file__).parent.parent.parent.parent / "resources" / "operadoras.csv"
+
+# Funções chamadas sempre que load_data altera a tabela de operadoras
+_data_loaded_listeners = []
+
+def on_data_loaded(listener):
+    _data_loaded_listeners.append(listener)
 
 class OperatorRepository:
-    def __init__(self):
-        self.db = SessionLocal()
-        self.load_data()
+    def __init__(self, db: Session):
+        self.db = db
     
-    def load_data(self):
-        # Verifica se já existem dados para não duplicar
-        if self.db.query(Operator).count() == 0:
-            csv_path = Path(__file__).parent.parent.parent.parent / "resources" / "operadoras.csv"
-            with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
-                reader = csv.DictReader(csvfile, delimiter=';')
-                for row in reader:
-                    try:
-                        operator_data = {
-                            'registro_ans': row['Registro_ANS'],
-                            'cnpj': row['CNPJ'],
-                            'razao_social': row['Razao_Social'],
-                            'nome_fantasia': row['Nome_Fantasia'] if row['Nome_Fantasia'] else None,
-                            'modalidade': row['Modalidade'],
-                            'logradouro': row['Logradouro'],
-                            'numero': row['Numero'],
-                            'complemento': row['Complemento'] if row['Complemento'] else None,
-                            'bairro': row['Bairro'],
-                            'cidade': row['Cidade'],
-                            'uf': row['UF'],
-                            'cep': row['CEP'],
-                            'ddd': row['DDD'] if row['DDD'] else None,
-                            'telefone': row['Telefone'] if row['Telefone'] else None,
-                            'fax': row['Fax'] if row['Fax'] else None,
-                            'endereco_eletronico': row['Endereco_eletronico'] if row['Endereco_eletronico'] else None,
-                            'representante': row['Representante'] if row['Representante'] else None,
-                            'cargo_representante': row['Cargo_Representante'] if row['Cargo_Representante'] else None,
-                            'regiao_de_comercializacao': row['Regiao_de_Comercializacao'] if row['Regiao_de_Comercializacao'] else None,
-                            'data_registro_ans': row['Data_Registro_ANS']
-                        }
-                        operator = Operator(**operator_data)
-                        self.db.add(operator)
-                    except Exception as e:
-                        print(f"Error processing row: {row}. Error: {e}")
-                self.db.commit()
+    def load_data(self, csv_path=None, force=False, bad_rows_path=None):
+        # Verifica se já existem dados; com force, recarrega (upsert por registro_ans)
+        if not force and self.db.query(Operator.id).first() is not None:
+            return None
+        csv_path = csv_path or DEFAULT_CSV_PATH
+        report = BulkOperatorLoader(self.db.connection()).load(csv_path, bad_rows_path)
+        self.db.commit()
+        # O índice em memória é reconstruído na próxima busca
+        ngram_index.invalidate()
+        # No modo snapshot, grava o novo arquivo; os workers trocam de snapshot ao detectá-lo
+        if operator_snapshot.snapshot_store is not None:
+            operator_snapshot.snapshot_store.build(self.db)
+        for listener in _data_loaded_listeners:
+            listener()
+        return report
     
     def get_all_operators(self):
         return self.db.query(Operator).all()
     
     def search_operators(self, query: str, limit: int = 10):
-        return self.db.query(Operator).filter(
-            Operator.razao_social.ilike(f"%{query}%") |
-            Operator.nome_fantasia.ilike(f"%{query}%") |
-            Operator.cidade.ilike(f"%{query}%")
-        ).limit(limit).all()
+        # Busca sem acentos, ordenada por relevância: pg_trgm no PostgreSQL e
+        # índice de trigramas em memória nos demais bancos
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return search_postgres(self.db, query, limit)
+        return search_ngram(self.db, query, limit)
+
+class AsyncOperatorRepository:
+    # Mesmas buscas de OperatorRepository, sobre uma AsyncSession
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_all_operators(self):
+        return (await self.db.scalars(select(Operator))).all()
+    
+    async def search_operators(self, query: str, limit: int = 10):
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return await search_postgres_async(self.db, query, limit)
+        return await search_ngram_async(self.db, query, limit)
     
-    def close(self):
-        self.db.close()
\ No newline at end of file
+    async def search_page(self, query: str, limit: int, fields, cursor: str = None, snapshot=None):
+        # Só as colunas pedidas, sem montar objetos Operator; retorna (linhas, próximo cursor).
+        # snapshot fixa o SnapshotIndex usado; sem ele, usa o atual
+        if snapshot is None:
+            snapshot = operator_snapshot.current_snapshot()
+        if snapshot is not None:
+            return operator_snapshot.search_page_snapshot(snapshot, query, limit, fields, cursor)
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return await search_page_postgres_async(self.db, query, limit, fields, cursor)
+        return await search_page_ngram_async(self.db, query, limit, fields, cursor)
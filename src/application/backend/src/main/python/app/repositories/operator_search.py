@@ -0,0 +1,387 @@
+import asyncio
+import base64
+import json
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import and_, bindparam, case, func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.operator import Operator
+
+NGRAM = 3
+SEARCH_FIELDS = ('razao_social', 'nome_fantasia', 'cidade')
+
+# Documento de busca no PostgreSQL. A mesma expressão é usada no índice e nas
+# consultas, para que o planejador use o índice GIN
+SEARCH_DOCUMENT = (
+    "f_unaccent(lower(coalesce(razao_social, '') || ' ' || "
+    "coalesce(nome_fantasia, '') || ' ' || coalesce(cidade, '')))"
+)
+
+POSTGRES_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() não é IMMUTABLE e não pode ser usada em índices; o wrapper
+    # com dicionário explícito pode
+    "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS "
+    "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT",
+    f"CREATE INDEX IF NOT EXISTS ix_operators_search_trgm ON operators "
+    f"USING gin (({SEARCH_DOCUMENT}) gin_trgm_ops)",
+]
+
+
+def normalize(value):
+    """Minúsculas, sem acentos e com espaços simples: 'São  Paulo' -> 'sao paulo'"""
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', value.lower()).strip()
+
+
+def ngrams(value, n=NGRAM):
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
+
+
+def search_document(fields):
+    """Documento indexado de uma operadora: campos de busca normalizados, após um espaço"""
+    return ' ' + normalize(' '.join(field for field in fields if field))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Cursor opaco para a próxima página: JSON em base64 url-safe"""
+    data = json.dumps(values, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, query):
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except ValueError as e:
+        raise InvalidCursor("Cursor inválido") from e
+    if not isinstance(values, dict) or values.get('q') != query:
+        raise InvalidCursor("Cursor de outra consulta")
+    return values
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class NgramIndex:
+    """Índice invertido de trigramas em memória, para SQLite e bancos sem pg_trgm
+
+    Cada operadora vira um documento normalizado (razão social, nome fantasia e
+    cidade, sem acentos), precedido de um espaço para que o início de cada
+    palavra também gere trigramas (' sa'). A busca intersecta as listas de
+    ocorrências dos trigramas da consulta e só então confere a substring nos
+    candidatos, em vez de percorrer a tabela.
+
+    Relevância: primeiro os documentos em que alguma palavra começa com a
+    consulta, depois os que só a contêm no meio de uma palavra; em cada grupo,
+    os documentos mais curtos. Como as posições do índice seguem o tamanho do
+    documento, os candidatos já saem em ordem e a busca para assim que
+    encontra limit resultados, com custo que não cresce com a tabela.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        # Muda a cada construção: posições de versões anteriores não valem mais
+        self.version = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.documents = []
+        self.postings = {}
+
+    @property
+    def built(self):
+        return self._built
+
+    def build(self, rows):
+        """rows: iterável de (id, razao_social, nome_fantasia, cidade)"""
+        entries = [(search_document(fields), operator_id) for operator_id, *fields in rows]
+        # Ordena por tamanho: a posição no índice passa a ser a ordem de relevância
+        entries.sort(key=lambda entry: len(entry[0]))
+        ids = [operator_id for _, operator_id in entries]
+        documents = [document for document, _ in entries]
+        postings = defaultdict(list)
+        for position, document in enumerate(documents):
+            for gram in ngrams(document):
+                postings[gram].append(position)
+
+        with self._lock:
+            self.ids = np.asarray(ids, dtype=np.int64)
+            self.documents = documents
+            # Posições em ordem crescente, como exige a busca binária
+            self.postings = {gram: np.asarray(items, dtype=np.int32) for gram, items in postings.items()}
+            self.version += 1
+            self._built = True
+
+    def build_from_db(self, db: Session):
+        self.build(db.execute(select(*_index_columns())).yield_per(10_000))
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    def _candidate_batches(self, query, start=0, batch=1024):
+        """Gera, em ordem, lotes de posições que contêm todos os trigramas da consulta
+
+        A menor lista é percorrida em lotes, e cada lote é conferido nas demais
+        com busca binária; assim a interseção para junto com a busca, sem
+        percorrer listas inteiras de trigramas muito comuns.
+        """
+        grams = ngrams(query)
+        if not grams:
+            # Consulta menor que um trigrama: une as listas dos trigramas que a contêm
+            lists = self._postings_containing(query)
+            if lists:
+                union = np.unique(np.concatenate(lists))
+                union = union[np.searchsorted(union, start):]
+                for offset in range(0, len(union), batch):
+                    yield union[offset:offset + batch]
+            return
+
+        lists = []
+        for gram in grams:
+            items = self._postings(gram)
+            if items is None:
+                return
+            lists.append(items)
+        lists.sort(key=len)
+        smallest, others = lists[0], lists[1:]
+        smallest = smallest[np.searchsorted(smallest, start):]
+        for offset in range(0, len(smallest), batch):
+            candidates = smallest[offset:offset + batch]
+            for items in others:
+                found = np.searchsorted(items, candidates)
+                found[found == len(items)] = 0
+                candidates = candidates[items[found] == candidates]
+                if not len(candidates):
+                    break
+            if len(candidates):
+                yield candidates
+
+    def _postings(self, gram):
+        return self.postings.get(gram)
+
+    def _postings_containing(self, query):
+        return [items for gram, items in self.postings.items() if query in gram]
+
+    def _matches(self, documents, query, needle, exclude=None, limit=10, start=0):
+        """Percorre os candidatos em ordem, a partir de start, e para ao encontrar limit documentos"""
+        found = []
+        for candidates in self._candidate_batches(query, start):
+            for position in candidates.tolist():
+                document = documents[position]
+                if needle in document and not (exclude and exclude in document):
+                    found.append(position)
+                    if len(found) == limit:
+                        return found
+        return found
+
+    def search_page(self, query, limit=10, after=None):
+        """Retorna ([(grupo, posição, id)], versão) a partir de after=(grupo, posição), exclusive
+
+        grupo 0 são os documentos com uma palavra começando pela consulta e
+        grupo 1, os demais; (grupo, posição) é a chave estável da paginação.
+        """
+        query = normalize(query)
+        after_tier, after_position = after if after else (0, -1)
+        word_prefix = ' ' + query
+        found = []
+        with self._lock:
+            documents = self.documents
+            ids = self.ids
+            version = self.version
+            if not query:
+                return [], version
+            if after_tier == 0:
+                found = [
+                    (0, position) for position in
+                    self._matches(documents, word_prefix, word_prefix, limit=limit, start=after_position + 1)
+                ]
+            if len(found) < limit:
+                start = after_position + 1 if after_tier == 1 else 0
+                found += [
+                    (1, position) for position in
+                    self._matches(documents, query, query, exclude=word_prefix,
+                                  limit=limit - len(found), start=start)
+                ]
+        return [(tier, position, int(ids[position])) for tier, position in found], version
+
+    def search(self, query, limit=10):
+        """Retorna os ids das operadoras mais relevantes para a consulta"""
+        return [operator_id for _, _, operator_id in self.search_page(query, limit)[0]]
+
+
+# Índice único da aplicação, usado quando o banco não é PostgreSQL
+ngram_index = NgramIndex()
+
+
+def setup_search(db: Session):
+    """Prepara a busca na inicialização: índice trigram no PostgreSQL ou índice em memória"""
+    if db.get_bind().dialect.name == 'postgresql':
+        for statement in POSTGRES_SETUP:
+            db.execute(text(statement))
+        db.commit()
+    else:
+        ngram_index.build_from_db(db)
+
+
+def _postgres_ranking(query):
+    """(filtro, grupo, similaridade) da busca no PostgreSQL
+
+    O documento é escrito como SQL literal, igual ao do índice, para que o
+    planejador use o índice GIN no filtro por substring. Grupo 0 são os
+    documentos com uma palavra começando pela consulta, como no NgramIndex.
+    """
+    pattern = _escape_like(query)
+    document = literal_column(SEARCH_DOCUMENT)
+    tier = case(
+        (or_(
+            document.like(bindparam('search_prefix', f"{pattern}%")),
+            document.like(bindparam('search_word_prefix', f"% {pattern}%"))
+        ), 0),
+        else_=1
+    )
+    matches = document.like(bindparam('search_contains', f"%{pattern}%"))
+    return matches, tier, func.similarity(document, bindparam('search_query', query))
+
+
+def postgres_statement(query, limit):
+    matches, tier, score = _postgres_ranking(normalize(query))
+    return select(Operator).where(matches).order_by(
+        tier, score.desc(), Operator.razao_social, Operator.id
+    ).limit(limit)
+
+
+def postgres_page_statement(query, limit, columns, after=None):
+    """Seleciona só as colunas pedidas, mais a chave de ordenação da paginação
+
+    A ordem (grupo, -similaridade, razao_social, id) é total; a próxima página
+    começa depois da última chave vista (keyset), sem OFFSET.
+    """
+    matches, tier, score = _postgres_ranking(query)
+    statement = select(
+        *columns, Operator.id.label('_id'), tier.label('_tier'), score.label('_score'),
+        Operator.razao_social.label('_razao_social')
+    ).where(matches)
+    if after is not None:
+        statement = statement.where(or_(
+            tier > after['t'],
+            and_(tier == after['t'], or_(
+                score < after['s'],
+                and_(score == after['s'], or_(
+                    Operator.razao_social > after['r'],
+                    and_(Operator.razao_social == after['r'], Operator.id > after['i'])
+                ))
+            ))
+        ))
+    return statement.order_by(tier, score.desc(), Operator.razao_social, Operator.id).limit(limit)
+
+
+def _index_columns():
+    return [Operator.id] + [getattr(Operator, field) for field in SEARCH_FIELDS]
+
+
+def _projection(fields):
+    return [Operator.__table__.c[field] for field in fields]
+
+
+def _in_index_order(operators, ids):
+    operators = {op.id: op for op in operators}
+    return [operators[operator_id] for operator_id in ids if operator_id in operators]
+
+
+def search_postgres(db: Session, query, limit):
+    return db.scalars(postgres_statement(query, limit)).all()
+
+
+def search_ngram(db: Session, query, limit):
+    if not ngram_index.built:
+        ngram_index.build_from_db(db)
+    ids = ngram_index.search(query, limit)
+    if not ids:
+        return []
+    return _in_index_order(db.scalars(select(Operator).where(Operator.id.in_(ids))), ids)
+
+
+async def search_postgres_async(db: AsyncSession, query, limit):
+    return (await db.scalars(postgres_statement(query, limit))).all()
+
+
+async def search_ngram_async(db: AsyncSession, query, limit):
+    await _ensure_index_async(db)
+    ids = ngram_index.search(query, limit)
+    if not ids:
+        return []
+    return _in_index_order(await db.scalars(select(Operator).where(Operator.id.in_(ids))), ids)
+
+
+async def _ensure_index_async(db: AsyncSession):
+    if not ngram_index.built:
+        rows = (await db.execute(select(*_index_columns()))).all()
+        # A construção do índice usa CPU; roda fora do event loop
+        await asyncio.to_thread(ngram_index.build, rows)
+
+
+def index_page(index, query, limit, cursor=None):
+    """Uma página de um NgramIndex: ([(grupo, posição, id)], próximo cursor)
+
+    O cursor guarda a versão do índice: depois de uma reconstrução, as
+    posições mudam e o cursor antigo é recusado.
+    """
+    query = normalize(query)
+    after = None
+    if cursor:
+        values = decode_cursor(cursor, query)
+        if values.get('v') != index.version:
+            raise InvalidCursor("Cursor expirado: as operadoras foram recarregadas")
+        after = (values['t'], values['p'])
+
+    # Um resultado a mais indica se existe próxima página
+    found, version = index.search_page(query, limit + 1, after)
+    page = found[:limit]
+    next_cursor = None
+    if len(found) > limit:
+        tier, position, _ = page[-1]
+        next_cursor = encode_cursor({'q': query, 'v': version, 't': tier, 'p': position})
+    return page, next_cursor
+
+
+async def search_page_ngram_async(db: AsyncSession, query, limit, fields, cursor=None):
+    """Uma página da busca no índice em memória; retorna (linhas, próximo cursor)"""
+    await _ensure_index_async(db)
+    page, next_cursor = index_page(ngram_index, query, limit, cursor)
+    if not page:
+        return [], None
+    ids = [operator_id for _, _, operator_id in page]
+    result = await db.execute(select(Operator.id.label('_id'), *_projection(fields)).where(Operator.id.in_(ids)))
+    rows = {row['_id']: {field: row[field] for field in fields} for row in result.mappings()}
+    return [rows[operator_id] for operator_id in ids if operator_id in rows], next_cursor
+
+
+async def search_page_postgres_async(db: AsyncSession, query, limit, fields, cursor=None):
+    """Uma página da busca com pg_trgm; retorna (linhas, próximo cursor)"""
+    query = normalize(query)
+    after = decode_cursor(cursor, query) if cursor else None
+    statement = postgres_page_statement(query, limit + 1, _projection(fields), after)
+    found = (await db.execute(statement)).mappings().all()
+    page = found[:limit]
+    next_cursor = None
+    if len(found) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor({
+            'q': query, 't': last['_tier'], 's': last['_score'], 'r': last['_razao_social'], 'i': last['_id']
+        })
+    return [{field: row[field] for field in fields} for row in page], next_cursor
@@ -0,0 +1,246 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.operator import Operator
+from .operator_search import NgramIndex, SEARCH_FIELDS, index_page, ngrams, search_document
+
+# Snapshot binário das operadoras e do índice de trigramas, mapeado em
+# memória (somente leitura) por todos os workers do uvicorn: as páginas do
+# arquivo ficam no cache do sistema operacional, compartilhadas entre os
+# processos, e a busca não consulta o banco. Ativado por SEARCH_SNAPSHOT_PATH
+SNAPSHOT_PATH = os.environ.get("SEARCH_SNAPSHOT_PATH")
+# Intervalo mínimo entre verificações de um snapshot mais novo no disco
+CHECK_INTERVAL = float(os.environ.get("SEARCH_SNAPSHOT_CHECK_INTERVAL", 1.0))
+
+MAGIC = b"ANSOPS01"
+ALIGNMENT = 8
+# Cada trigrama ocupa até 3 caracteres UTF-8 de até 4 bytes
+GRAM_DTYPE = 'S12'
+COLUMNS = [column.name for column in Operator.__table__.columns if column.name != 'id']
+
+
+class _Strings:
+    # Textos de uma coluna: data[offsets[i]:offsets[i + 1]], None onde nulls[i]
+    def __init__(self, buffer, base, offsets, nulls=None):
+        self.buffer = buffer
+        self.base = base
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        if self.nulls is not None and self.nulls[position]:
+            return None
+        start = self.base + int(self.offsets[position])
+        return self.buffer[start:self.base + int(self.offsets[position + 1])].decode('utf-8')
+
+
+def _encode_strings(values):
+    """(offsets uint64, bytes, nulls uint8) de uma lista de textos"""
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    nulls = np.array([value is None for value in values], dtype=np.uint8)
+    return offsets, b''.join(encoded), nulls
+
+
+def write_snapshot(path, rows):
+    """Grava o snapshot de rows (dicts com id e as colunas de Operator) de forma atômica
+
+    O arquivo é escrito ao lado do destino e só então renomeado sobre ele:
+    quem já mapeou o snapshot anterior continua lendo o arquivo antigo, que
+    o sistema só libera quando o último mapeamento for fechado.
+    """
+    # Mesma ordem do NgramIndex: a posição no índice é a ordem de relevância
+    entries = sorted(
+        ((search_document([row[field] for field in SEARCH_FIELDS]), row) for row in rows),
+        key=lambda entry: len(entry[0])
+    )
+    documents = [document for document, _ in entries]
+    rows = [row for _, row in entries]
+    postings = defaultdict(list)
+    for position, document in enumerate(documents):
+        for gram in ngrams(document):
+            postings[gram].append(position)
+    grams = np.array([gram.encode('utf-8') for gram in postings], dtype=GRAM_DTYPE)
+    order = np.argsort(grams, kind='stable')
+    lists = [postings[gram] for gram in postings]
+    posting_offsets = np.zeros(len(lists) + 1, dtype=np.uint64)
+    np.cumsum([len(lists[i]) for i in order], out=posting_offsets[1:])
+
+    sections = {
+        "ids": np.array([row['id'] for row in rows], dtype=np.int64),
+        "grams": grams[order],
+        "gram_offsets": posting_offsets,
+        "postings": np.array([p for i in order for p in lists[i]], dtype=np.int32),
+    }
+    for name, values in [("documento", documents)] + [(column, [row[column] for row in rows]) for column in COLUMNS]:
+        offsets, data, nulls = _encode_strings(values)
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.data"] = np.frombuffer(data, dtype=np.uint8)
+        sections[f"{name}.nulls"] = nulls
+
+    # Cabeçalho JSON com a posição, o tipo e o tamanho de cada seção
+    layout, offset = {}, 0
+    for name, array in sections.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "count": len(array)}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({
+        "geracao": time.time_ns(), "linhas": len(rows), "colunas": COLUMNS, "secoes": layout
+    }).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + 8 + len(header)) % ALIGNMENT)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + len(header).to_bytes(8, 'little') + header)
+            for array in sections.values():
+                data = array.tobytes()
+                f.write(data + b'\0' * (-len(data) % ALIGNMENT))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class SnapshotIndex(NgramIndex):
+    """NgramIndex somente leitura sobre um snapshot mapeado em memória
+
+    ids, trigramas, postings, documentos e colunas são views do mmap, sem
+    cópia: cada worker só mantém os objetos de acesso, e os textos são
+    decodificados apenas para os resultados da página.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Arquivo não é um snapshot de operadoras: {path}")
+        size = int.from_bytes(self._mmap[len(MAGIC):len(MAGIC) + 8], 'little')
+        start = len(MAGIC) + 8
+        header = json.loads(self._mmap[start:start + size])
+        base = start + size
+        arrays = {
+            name: np.frombuffer(self._mmap, dtype=section["dtype"], count=section["count"],
+                                offset=base + section["offset"])
+            for name, section in header["secoes"].items()
+        }
+
+        def strings(name):
+            data = header["secoes"][f"{name}.data"]
+            return _Strings(self._mmap, base + data["offset"], arrays[f"{name}.offsets"], arrays[f"{name}.nulls"])
+
+        # A geração identifica o arquivo em todos os workers: um cursor criado
+        # em um worker vale nos demais enquanto o snapshot for o mesmo
+        self.version = header["geracao"]
+        self.ids = arrays["ids"]
+        self.documents = strings("documento")
+        self.columns = {column: strings(column) for column in header["colunas"]}
+        self._grams = arrays["grams"]
+        self._gram_offsets = arrays["gram_offsets"]
+        self._postings_data = arrays["postings"]
+        self._built = True
+
+    def __len__(self):
+        return len(self.ids)
+
+    def build(self, rows):
+        raise TypeError("SnapshotIndex é somente leitura; use write_snapshot")
+
+    def invalidate(self):
+        pass
+
+    def _posting_list(self, i):
+        return self._postings_data[int(self._gram_offsets[i]):int(self._gram_offsets[i + 1])]
+
+    def _postings(self, gram):
+        key = gram.encode('utf-8')
+        i = int(np.searchsorted(self._grams, key))
+        if i < len(self._grams) and self._grams[i] == key:
+            return self._posting_list(i)
+        return None
+
+    def _postings_containing(self, query):
+        matches = np.flatnonzero(np.char.find(self._grams, query.encode('utf-8')) >= 0)
+        return [self._posting_list(i) for i in matches]
+
+    def row(self, position, fields):
+        return {
+            field: int(self.ids[position]) if field == 'id' else self.columns[field][position]
+            for field in fields
+        }
+
+
+class SnapshotStore:
+    def __init__(self, path, check_interval=CHECK_INTERVAL):
+        """Snapshot em uso neste processo, trocado quando o arquivo no disco muda
+
+        Um stat no máximo a cada check_interval segundos detecta o arquivo
+        novo (outro inode, renomeado por write_snapshot). As requisições em
+        andamento terminam no snapshot antigo; as seguintes usam o novo.
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._key = None
+        self._checked_at = float('-inf')
+
+    def current(self):
+        """SnapshotIndex atual, ou None se o arquivo ainda não existir"""
+        now = time.monotonic()
+        index = self._index
+        if index is not None and now - self._checked_at < self.check_interval:
+            return index
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._index
+            key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if key != self._key:
+                self._index = SnapshotIndex(self.path)
+                self._key = key
+            return self._index
+
+    def build(self, db: Session):
+        """Grava um novo snapshot com as operadoras do banco e passa a usá-lo"""
+        result = db.execute(select(Operator.__table__)).mappings()
+        write_snapshot(self.path, result)
+        with self._lock:
+            self._checked_at = float('-inf')
+        return self.current()
+
+    def ensure(self, db: Session):
+        # Na inicialização: só grava se nenhum worker gravou ainda
+        if not self.path.exists():
+            self.build(db)
+
+
+snapshot_store = SnapshotStore(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+
+def current_snapshot():
+    """Snapshot em uso neste processo, ou None fora do modo snapshot"""
+    return snapshot_store.current() if snapshot_store is not None else None
+
+
+def search_page_snapshot(index, query, limit, fields, cursor=None):
+    """Uma página da busca servida do snapshot, sem acesso ao banco; retorna (linhas, próximo cursor)"""
+    page, next_cursor = index_page(index, query, limit, cursor)
+    return [index.row(position, fields) for _, position, _ in page], next_cursor
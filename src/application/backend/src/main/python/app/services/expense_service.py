@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..repositories.expense_repository import AsyncExpenseRepository
+
+# Conta usada nos relatórios de database/sql/queries_analiticas.sql
+DEFAULT_ACCOUNT = "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"
+
+def period_window(periodo: str, referencia: date):
+    # [inicio, fim) dos relatórios: o último trimestre completo ou o último ano até a referência
+    if periodo == "trimestre":
+        fim = date(referencia.year, (referencia.month - 1) // 3 * 3 + 1, 1)
+        month = fim.month - 3
+        inicio = date(fim.year - (month < 1), (month - 1) % 12 + 1, 1)
+        return inicio, fim
+    try:
+        inicio = referencia.replace(year=referencia.year - 1)
+    except ValueError:  # 29 de fevereiro
+        inicio = referencia.replace(year=referencia.year - 1, day=28)
+    return inicio, referencia + timedelta(days=1)
+
+class ExpenseService:
+    async def top_expenses(self, db: AsyncSession, periodo: str = "trimestre", limit: int = 10,
+                           conta: str = DEFAULT_ACCOUNT, referencia: date = None):
+        inicio, fim = period_window(periodo, referencia or date.today())
+        rows = await AsyncExpenseRepository(db).top_operators(conta, inicio, fim, limit)
+        return {
+            "periodo": periodo,
+            "inicio": inicio.isoformat(),
+            "fim": (fim - timedelta(days=1)).isoformat(),
+            "conta": conta,
+            "results": [
+                {"registro_ans": row.reg_ans, "razao_social": row.razao_social,
+                 "total_despesas": float(row.total_despesas)}
+                for row in rows
+            ],
+        }
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class _Entry:
+    value: object
+    expires: float
+
+
+@dataclass
+class _Flight:
+    # Consulta em andamento: as requisições iguais esperam por ela
+    generation: int
+    event: threading.Event = field(default_factory=threading.Event)
+    value: object = None
+    error: BaseException = None
+    future: asyncio.Future = None
+    # Líder cancelado (cliente desconectou): quem espera tenta de novo
+    abandoned: bool = False
+
+
+# Resultado entregue a quem espera por uma consulta abandonada pelo líder
+_ABANDONED = object()
+
+
+class MemoryCacheBackend:
+    """Backend compartilhado em memória, com a mesma interface do Redis
+
+    Útil para testes e para vários QueryCache no mesmo processo.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, (0, None))[0]) + 1
+            self._data[key] = (value, None)
+            return value
+
+
+class RedisCacheBackend:
+    """Backend compartilhado no Redis, para que vários workers do uvicorn dividam o cache"""
+
+    def __init__(self, url):
+        import redis  # Dependência opcional, só necessária com SEARCH_CACHE_URL
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+
+class QueryCache:
+    """Cache LRU com TTL para resultados de consultas
+
+    - No máximo max_entries resultados; o menos usado sai primeiro.
+    - Cada resultado vale por ttl segundos.
+    - Requisições simultâneas pela mesma chave fazem uma única consulta ao
+      banco; as demais esperam o resultado (singleflight). get_or_compute
+      atende código síncrono e aget_or_compute, corrotinas.
+    - invalidate() descarta tudo, inclusive resultados de consultas que já
+      estavam em andamento.
+    - Com um backend compartilhado, os resultados (em JSON) e a geração do
+      cache ficam nele: uma invalidação em um worker vale para todos.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60.0, backend=None, namespace="search", clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self.namespace = namespace
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _shared_generation(self):
+        if self.backend is None:
+            return 0
+        return int(self.backend.get(f"{self.namespace}:generation") or 0)
+
+    def _begin(self, local_key):
+        """Retorna (acerto, valor, flight, líder) para a chave"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(local_key)
+            if entry is not None:
+                if entry.expires > now:
+                    self._entries.move_to_end(local_key)
+                    self.hits += 1
+                    return True, entry.value, None, False
+                del self._entries[local_key]
+                self.expirations += 1
+
+            flight = self._inflight.get(local_key)
+            if flight is None:
+                flight = _Flight(self._generation)
+                self._inflight[local_key] = flight
+                self.misses += 1
+                return False, None, flight, True
+            self.coalesced += 1
+            return False, None, flight, False
+
+    def _finish(self, local_key, flight):
+        with self._lock:
+            if self._inflight.get(local_key) is flight:
+                del self._inflight[local_key]
+        flight.event.set()
+        if flight.future is not None and not flight.future.done():
+            if flight.abandoned:
+                flight.future.set_result(_ABANDONED)
+            elif flight.error is not None:
+                flight.future.set_exception(flight.error)
+            else:
+                flight.future.set_result(flight.value)
+
+    @staticmethod
+    def _flight_result(flight):
+        if flight.abandoned:
+            return _ABANDONED
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def get_or_compute(self, key, compute):
+        shared_generation = self._shared_generation()
+        local_key = (shared_generation, key)
+        while True:
+            hit, value, flight, leader = self._begin(local_key)
+            if hit:
+                return value
+            if leader:
+                break
+            flight.event.wait()
+            value = self._flight_result(flight)
+            if value is not _ABANDONED:
+                return value
+
+        try:
+            flight.value = self._compute(shared_generation, key, compute)
+            self._store(local_key, flight)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(local_key, flight)
+
+    async def aget_or_compute(self, key, compute):
+        """Versão assíncrona: compute é uma função que retorna uma corrotina
+
+        Quem espera por uma consulta em andamento aguarda um Future, sem
+        bloquear o event loop; o backend compartilhado é acessado em uma thread.
+        Se o líder for cancelado (por exemplo, o cliente desconectou), o
+        cancelamento não é repassado: uma das requisições que esperavam passa
+        a ser o líder e refaz a consulta.
+        """
+        shared_generation = 0
+        if self.backend is not None:
+            shared_generation = await asyncio.to_thread(self._shared_generation)
+        local_key = (shared_generation, key)
+        while True:
+            hit, value, flight, leader = self._begin(local_key)
+            if hit:
+                return value
+            if leader:
+                break
+            if flight.future is not None and flight.future.get_loop() is asyncio.get_running_loop():
+                value = await asyncio.shield(flight.future)
+            else:
+                # Consulta iniciada por uma chamada síncrona ou em outro event loop
+                await asyncio.to_thread(flight.event.wait)
+                value = self._flight_result(flight)
+            if value is not _ABANDONED:
+                return value
+
+        flight.future = asyncio.get_running_loop().create_future()
+        # Evita o aviso de exceção não lida quando ninguém está esperando
+        flight.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+        try:
+            flight.value = await self._compute_async(shared_generation, key, compute)
+            self._store(local_key, flight)
+            return flight.value
+        except asyncio.CancelledError:
+            flight.abandoned = True
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(local_key, flight)
+
+    def _shared_key(self, shared_generation, key):
+        return f"{self.namespace}:{shared_generation}:{json.dumps(key, ensure_ascii=False)}"
+
+    def _compute(self, shared_generation, key, compute):
+        if self.backend is None:
+            return compute()
+        shared_key = self._shared_key(shared_generation, key)
+        cached = self.backend.get(shared_key)
+        if cached is not None:
+            return json.loads(cached)
+        value = compute()
+        self.backend.set(shared_key, json.dumps(value, ensure_ascii=False, default=str), self.ttl)
+        return value
+
+    async def _compute_async(self, shared_generation, key, compute):
+        if self.backend is None:
+            return await compute()
+        shared_key = self._shared_key(shared_generation, key)
+        cached = await asyncio.to_thread(self.backend.get, shared_key)
+        if cached is not None:
+            return json.loads(cached)
+        value = await compute()
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        await asyncio.to_thread(self.backend.set, shared_key, payload, self.ttl)
+        return value
+
+    def _store(self, local_key, flight):
+        with self._lock:
+            # Resultado calculado antes de uma invalidação: não entra no cache
+            if flight.generation != self._generation:
+                return
+            self._entries[local_key] = _Entry(flight.value, self._clock() + self.ttl)
+            self._entries.move_to_end(local_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._generation += 1
+            self.invalidations += 1
+        if self.backend is not None:
+            self.backend.incr(f"{self.namespace}:generation")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,11 +1,46 @@
-from ..repositories.operator_repository import OperatorRepository
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.operator import Operator
+from ..repositories import operator_snapshot
+from ..repositories.operator_repository import AsyncOperatorRepository, on_data_loaded
+from ..repositories.operator_search import normalize
+from .query_cache import QueryCache, RedisCacheBackend
+
+COLUMNS = [column.name for column in Operator.__table__.columns]
+
+def create_cache():
+    # SEARCH_CACHE_URL (redis://...) compartilha o cache entre os workers do uvicorn
+    url = os.environ.get("SEARCH_CACHE_URL")
+    return QueryCache(
+        max_entries=int(os.environ.get("SEARCH_CACHE_SIZE", 1024)),
+        ttl=float(os.environ.get("SEARCH_CACHE_TTL", 300)),
+        backend=RedisCacheBackend(url) if url else None,
+    )
 
 class SearchService:
-    def __init__(self):
-        self.repo = OperatorRepository()
-    
-    def search_operators(self, query: str, limit: int = 10):
-        return self.repo.search_operators(query, limit)
-    
-    def __del__(self):
-        self.repo.close()
\ No newline at end of file
+    # Sem estado por requisição: uma única instância atende toda a aplicação
+    def __init__(self, cache: QueryCache = None):
+        self.cache = cache if cache is not None else create_cache()
+        on_data_loaded(self.cache.invalidate)
+
+    async def search_operators(self, db: AsyncSession, query: str, limit: int = 10):
+        return (await self.search_page(db, query, limit))["results"]
+
+    async def search_page(self, db: AsyncSession, query: str, limit: int = 10, fields=None, cursor: str = None):
+        # As duas buscas ignoram caixa e acentos, então a consulta normalizada é a chave.
+        # No modo snapshot, a geração do snapshot também: cada worker troca de
+        # snapshot ao detectar o arquivo novo, sem passar por load_data, e as
+        # páginas (e cursores) do snapshot anterior deixam de ser servidas
+        fields = tuple(fields or COLUMNS)
+        snapshot = operator_snapshot.current_snapshot()
+        key = (normalize(query), limit, fields, cursor, snapshot.version if snapshot else None)
+        return await self.cache.aget_or_compute(
+            key, lambda: self._search_page(db, query, limit, fields, cursor, snapshot)
+        )
+
+    async def _search_page(self, db: AsyncSession, query: str, limit: int, fields, cursor, snapshot=None):
+        results, next_cursor = await AsyncOperatorRepository(db).search_page(query, limit, fields, cursor, snapshot)
+        return {"results": results, "next_cursor": next_cursor}
+
+    def cache_stats(self):
+        return self.cache.stats()
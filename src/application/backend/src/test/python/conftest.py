@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Os testes usam um SQLite temporário no lugar do Postgres; a variável precisa
+# estar definida antes de importar app.database
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp()) / 'ans_test.db'}"
+)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "main" / "python"))
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.operator import Operator
+from app.repositories.operator_repository import OperatorRepository
+
+
+class TestSearchAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client_context = TestClient(app)
+        cls.client = cls.client_context.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client_context.__exit__(None, None, None)
+
+    def test_startup_seeds_operators(self):
+        """Testa se as operadoras são carregadas na inicialização"""
+        from app.database import SessionLocal
+        with SessionLocal() as db:
+            self.assertGreater(db.query(Operator).count(), 1000)
+
+    def test_search(self):
+        """Testa a busca por razão social, nome fantasia ou cidade"""
+        response = self.client.get("/api/search", params={"query": "unimed", "limit": 5})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        for operator in results:
+            text = " ".join(filter(None, (operator["razao_social"], operator["nome_fantasia"], operator["cidade"])))
+            self.assertIn("unimed", text.lower())
+
+    def test_requests_do_not_reload_data(self):
+        """Testa se as requisições não verificam nem carregam os dados novamente"""
+        with patch.object(OperatorRepository, "load_data", side_effect=AssertionError("recarregou")):
+            for _ in range(3):
+                self.assertEqual(self.client.get("/api/search", params={"query": "saude"}).status_code, 200)
+
+    def test_pagination(self):
+        """Testa se as páginas seguidas pelo cursor formam a busca completa, sem repetições"""
+        full = self.client.get("/api/search", params={"query": "saude", "limit": 100}).json()["results"]
+        pages = []
+        params = {"query": "saude", "limit": 7, "fields": "registro_ans"}
+        while len(pages) < len(full):
+            body = self.client.get("/api/search", params=params).json()
+            pages += body["results"]
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        self.assertEqual(pages[:len(full)], [{"registro_ans": op["registro_ans"]} for op in full])
+
+    def test_fields_projection(self):
+        """Testa se apenas as colunas pedidas são retornadas"""
+        response = self.client.get("/api/search", params={"query": "unimed", "fields": "razao_social, uf"})
+        self.assertEqual(response.status_code, 200)
+        for operator in response.json()["results"]:
+            self.assertEqual(set(operator), {"razao_social", "uf"})
+        response = self.client.get("/api/search", params={"query": "unimed", "fields": "razao_social,senha"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_invalid_cursor(self):
+        """Testa se um cursor malformado ou de outra consulta é recusado"""
+        self.assertEqual(self.client.get("/api/search", params={"query": "saude", "cursor": "xyz"}).status_code, 400)
+        cursor = self.client.get("/api/search", params={"query": "saude", "limit": 1}).json()["next_cursor"]
+        self.assertEqual(self.client.get("/api/search", params={"query": "unimed", "cursor": cursor}).status_code, 400)
+
+    def test_metrics(self):
+        """Testa o histograma de latência do /api/search exposto em /metrics"""
+        self.client.get("/api/search", params={"query": "unimed"})
+        self.client.get("/api/search", params={"query": "a"})
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        lines = dict(line.rsplit(" ", 1) for line in response.text.splitlines() if not line.startswith("#"))
+        ok = 'method="GET",path="/api/search",status="200"'
+        self.assertGreaterEqual(int(lines[f'ans_api_request_duration_seconds_count{{{ok}}}']), 1)
+        self.assertEqual(lines[f'ans_api_request_duration_seconds_bucket{{{ok},le="+Inf"}}'],
+                         lines[f'ans_api_request_duration_seconds_count{{{ok}}}'])
+        self.assertIn('status="422"', response.text)
+        self.assertNotIn('path="/metrics"', response.text)
+
+    def test_invalid_query(self):
+        """Testa a validação do termo de busca"""
+        self.assertEqual(self.client.get("/api/search", params={"query": "a"}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
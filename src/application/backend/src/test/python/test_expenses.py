@@ -0,0 +1,98 @@
+import unittest
+from datetime import date
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.main import app
+from app.models.accounting_statement import AccountingStatement
+from app.models.operator import Operator
+from app.models.quarterly_expense import QuarterlyExpense
+from app.repositories.expense_repository import whole_quarters
+from app.services.expense_service import DEFAULT_ACCOUNT, period_window
+
+
+class TestPeriodWindow(unittest.TestCase):
+    def test_last_complete_quarter(self):
+        """Testa o último trimestre completo, inclusive na virada do ano"""
+        self.assertEqual(period_window("trimestre", date(2024, 5, 17)), (date(2024, 1, 1), date(2024, 4, 1)))
+        self.assertEqual(period_window("trimestre", date(2024, 2, 1)), (date(2023, 10, 1), date(2024, 1, 1)))
+
+    def test_last_year(self):
+        """Testa o último ano até a data de referência, inclusive"""
+        self.assertEqual(period_window("ano", date(2024, 2, 29)), (date(2023, 2, 28), date(2024, 3, 1)))
+
+    def test_whole_quarters(self):
+        """Testa os trimestres inteiramente dentro do período"""
+        self.assertEqual(whole_quarters(date(2023, 5, 10), date(2024, 5, 11)), (date(2023, 7, 1), date(2024, 4, 1)))
+        self.assertEqual(whole_quarters(date(2024, 1, 1), date(2024, 4, 1)), (date(2024, 1, 1), date(2024, 4, 1)))
+
+
+class TestTopExpensesAPI(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client_context = TestClient(app)
+        cls.client = cls.client_context.__enter__()
+        with SessionLocal() as db:
+            cls.operators = [op.registro_ans for op in db.query(Operator).order_by(Operator.id).limit(3)]
+            db.query(QuarterlyExpense).delete()
+            db.query(AccountingStatement).delete()
+            rows = [
+                # (trimestre, operadora, conta, total)
+                (date(2024, 1, 1), 0, "411", 100), (date(2024, 1, 1), 0, "412", 50),
+                (date(2024, 1, 1), 1, "411", 300), (date(2024, 1, 1), 2, "411", 10),
+                (date(2023, 10, 1), 2, "411", 1000), (date(2024, 1, 1), 2, "999", 5000),
+                # Trimestres das pontas do último ano até 2024-05-10: só entram as
+                # linhas de demonstracoes_contabeis dentro do período
+                (date(2024, 4, 1), 0, "411", 9000), (date(2023, 4, 1), 1, "411", 8000),
+            ]
+            for trimestre, operator, conta, total in rows:
+                db.add(QuarterlyExpense(
+                    trimestre=trimestre, reg_ans=cls.operators[operator], cd_conta_contabil=conta,
+                    descricao=DEFAULT_ACCOUNT if conta != "999" else "OUTRA CONTA", total=total, linhas=1
+                ))
+            statements = [
+                # (data, operadora, despesa)
+                (date(2024, 5, 2), 0, 7), (date(2024, 5, 20), 0, 8993),
+                (date(2023, 6, 1), 1, 40), (date(2023, 5, 9), 1, 7960),
+            ]
+            for data, operator, despesa in statements:
+                db.add(AccountingStatement(
+                    data=data, reg_ans=cls.operators[operator], cd_conta_contabil="411",
+                    descricao=DEFAULT_ACCOUNT, vl_saldo_inicial=0, vl_saldo_final=despesa
+                ))
+            db.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        with SessionLocal() as db:
+            db.query(QuarterlyExpense).delete()
+            db.query(AccountingStatement).delete()
+            db.commit()
+        cls.client_context.__exit__(None, None, None)
+
+    def test_top_last_quarter(self):
+        """Testa o ranking do último trimestre somando as contas de mesma descrição"""
+        response = self.client.get("/api/despesas/top", params={"referencia": "2024-05-10", "limit": 2})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["inicio"], body["fim"]), ("2024-01-01", "2024-03-31"))
+        self.assertEqual(
+            [(op["registro_ans"], op["total_despesas"]) for op in body["results"]],
+            [(self.operators[1], 300.0), (self.operators[0], 150.0)]
+        )
+        self.assertIsNotNone(body["results"][0]["razao_social"])
+
+    def test_top_last_year(self):
+        """Testa o ranking do último ano com as pontas fora dos trimestres inteiros e a conta sem diferenciar caixa"""
+        response = self.client.get("/api/despesas/top", params={
+            "periodo": "ano", "referencia": "2024-05-10", "conta": DEFAULT_ACCOUNT.lower()
+        })
+        totals = [op["total_despesas"] for op in response.json()["results"]]
+        self.assertEqual(totals, [1010.0, 340.0, 157.0])
+
+    def test_invalid_period(self):
+        """Testa a validação do período"""
+        self.assertEqual(self.client.get("/api/despesas/top", params={"periodo": "mes"}).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
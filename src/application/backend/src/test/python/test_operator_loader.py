@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models.operator import Operator
+from app.repositories.operator_repository import DEFAULT_CSV_PATH, OperatorRepository
+
+
+class TestBulkOperatorLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.engine = create_engine(f"sqlite:///{self.tmp_dir / 'ans.db'}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.lines = DEFAULT_CSV_PATH.read_text(encoding='utf-8-sig').splitlines()
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmp_dir)
+
+    def _write_csv(self, lines):
+        path = self.tmp_dir / "operadoras.csv"
+        path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        return path
+
+    def test_loads_all_operators(self):
+        """Testa a carga completa do CSV de operadoras"""
+        with self.Session() as db:
+            report = OperatorRepository(db).load_data()
+            self.assertEqual(report.loaded, len(self.lines) - 1)
+            self.assertEqual(report.rejected, 0)
+
+            operator = db.query(Operator).filter(Operator.registro_ans == "419761").one()
+            self.assertEqual(operator.cidade, "Além Paraíba")
+            self.assertIsNone(operator.nome_fantasia)
+            self.assertEqual(operator.regiao_de_comercializacao, "6")
+
+    def test_reload_is_idempotent(self):
+        """Testa se carregar de novo atualiza as operadoras em vez de duplicá-las"""
+        changed = [line.replace("Além Paraíba", "Juiz de Fora") for line in self.lines[:20]]
+        with self.Session() as db:
+            repository = OperatorRepository(db)
+            repository.load_data(self._write_csv(self.lines[:20]))
+            self.assertIsNone(repository.load_data(self._write_csv(changed)))
+
+            repository.load_data(self._write_csv(changed), force=True)
+            self.assertEqual(db.query(Operator).count(), 19)
+            operator = db.query(Operator).filter(Operator.registro_ans == "419761").one()
+            self.assertEqual(operator.cidade, "Juiz de Fora")
+
+    def test_bad_rows_are_reported(self):
+        """Testa a rejeição e o relatório das linhas inválidas"""
+        lines = list(self.lines[:6])
+        lines[2] = lines[2].replace('"421545"', '"ABC"').replace('"22869997000153"', '"123"')
+        lines[4] = lines[4].replace(lines[4].split(';')[10], '"XX"')
+        bad_rows_path = self.tmp_dir / "rejeitadas.csv"
+
+        with self.Session() as db, self.assertLogs("app.repositories.operator_loader", "WARNING") as logs:
+            report = OperatorRepository(db).load_data(self._write_csv(lines), bad_rows_path=bad_rows_path)
+            self.assertEqual((report.loaded, report.rejected), (3, 2))
+            self.assertEqual(db.query(Operator).count(), 3)
+        self.assertIn("2 linhas rejeitadas", logs.output[0])
+
+        report_lines = bad_rows_path.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(len(report_lines), 3)
+        self.assertIn("registro_ans inválido; cnpj inválido", report_lines[1])
+        self.assertIn("uf inválida", report_lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
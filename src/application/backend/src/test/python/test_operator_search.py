@@ -0,0 +1,103 @@
+import unittest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.main import app
+from app.models.operator import Operator
+from app.repositories.operator_search import NgramIndex, normalize
+
+
+ROWS = [
+    (1, "UNIMED DE SÃO PAULO", None, "São Paulo"),
+    (2, "AMIL ASSISTÊNCIA MÉDICA", "AMIL", "Rio de Janeiro"),
+    (3, "ODONTO PAULISTA LTDA", None, "Campinas"),
+    (4, "SAÚDE PAULO ALVES", None, "Belém"),
+]
+
+
+class TestNgramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NgramIndex()
+        self.index.build(ROWS)
+
+    def test_normalize(self):
+        """Testa a remoção de acentos, caixa e espaços repetidos"""
+        self.assertEqual(normalize("  São   PAULO "), "sao paulo")
+
+    def test_accent_insensitive(self):
+        """Testa se a busca ignora acentos na consulta e nos dados"""
+        self.assertEqual(self.index.search("sao paulo"), [1])
+        self.assertEqual(self.index.search("assistencia"), [2])
+        self.assertEqual(self.index.search("BELÉM"), [4])
+
+    def test_prefix_ranking(self):
+        """Testa se palavras que começam com a consulta vêm antes, das mais curtas às mais longas"""
+        self.assertEqual(self.index.search("sa"), [4, 1])
+        self.assertEqual(self.index.search("paul"), [4, 1, 3])
+        self.assertEqual(self.index.search("ulo"), [4, 1])
+        self.assertEqual(self.index.search("paul", limit=1), [4])
+
+    def test_short_query_and_no_match(self):
+        """Testa consultas menores que um trigrama e sem resultado"""
+        self.assertEqual(set(self.index.search("am")), {2, 3})
+        self.assertEqual(self.index.search("xyz"), [])
+        self.assertEqual(self.index.search("   "), [])
+
+    def test_search_page(self):
+        """Testa se as páginas seguidas formam a busca completa, inclusive entre os dois grupos"""
+        for query in ("paul", "ulo", "am", "a", "o"):
+            expected = self.index.search(query, limit=100)
+            for size in (1, 2, 3):
+                found, after = [], None
+                while True:
+                    page, _ = self.index.search_page(query, size, after)
+                    if not page:
+                        break
+                    found += [operator_id for _, _, operator_id in page]
+                    after = page[-1][:2]
+                self.assertEqual(found, expected, (query, size))
+
+    def test_invalidate_and_rebuild(self):
+        """Testa a reconstrução do índice com novos dados"""
+        self.index.invalidate()
+        self.assertFalse(self.index.built)
+        version = self.index.version
+        self.index.build(ROWS + [(5, "NOVA OPERADORA", None, "Natal")])
+        self.assertEqual(self.index.version, version + 1)
+        self.assertEqual(self.index.search("nova"), [5])
+
+
+class TestSearchEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client_context = TestClient(app)
+        cls.client = cls.client_context.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client_context.__exit__(None, None, None)
+
+    def test_matches_substring_scan(self):
+        """Testa se o índice encontra as mesmas operadoras que a busca sequencial"""
+        with SessionLocal() as db:
+            operators = db.query(Operator).all()
+        for query in ("unimed", "sao paulo", "odonto", "saude", "rio"):
+            expected = {
+                op.registro_ans for op in operators
+                if query in normalize(" ".join(filter(None, (op.razao_social, op.nome_fantasia, op.cidade))))
+            }
+            response = self.client.get("/api/search", params={"query": query, "limit": 100})
+            found = {op["registro_ans"] for op in response.json()["results"]}
+            if len(expected) <= 100:
+                self.assertEqual(found, expected, query)
+            else:
+                self.assertTrue(found <= expected, query)
+
+    def test_accent_insensitive_endpoint(self):
+        """Testa se 'Sao Paulo' encontra operadoras de 'São Paulo'"""
+        results = self.client.get("/api/search", params={"query": "Sao Paulo"}).json()["results"]
+        self.assertTrue(results)
+        self.assertTrue(any(op["cidade"] == "São Paulo" for op in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.endpoints import get_search_service
+from app.database import SessionLocal
+from app.main import app
+from app.models.operator import Operator
+from app.repositories import operator_snapshot
+from app.repositories.operator_repository import OperatorRepository
+from app.repositories.operator_search import NgramIndex
+from app.repositories.operator_snapshot import SnapshotIndex, SnapshotStore, search_page_snapshot, write_snapshot
+
+COLUMNS = [column.name for column in Operator.__table__.columns]
+
+
+def operator_row(operator_id, razao_social, nome_fantasia, cidade):
+    row = dict.fromkeys(COLUMNS)
+    row.update(id=operator_id, razao_social=razao_social, nome_fantasia=nome_fantasia, cidade=cidade,
+               registro_ans=str(300000 + operator_id), uf="SP")
+    return row
+
+
+ROWS = [
+    operator_row(1, "UNIMED DE SÃO PAULO", None, "São Paulo"),
+    operator_row(2, "AMIL ASSISTÊNCIA MÉDICA", "AMIL", "Rio de Janeiro"),
+    operator_row(3, "ODONTO PAULISTA LTDA", None, "Campinas"),
+    operator_row(4, "SAÚDE PAULO ALVES", None, "Belém"),
+]
+
+
+class TestSnapshotIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "operadoras.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_ngram_index(self):
+        """Testa se o snapshot encontra as mesmas operadoras, na mesma ordem, que o índice em memória"""
+        write_snapshot(self.path, ROWS)
+        snapshot = SnapshotIndex(self.path)
+        index = NgramIndex()
+        index.build([(row['id'], row['razao_social'], row['nome_fantasia'], row['cidade']) for row in ROWS])
+        for query in ("sao paulo", "paul", "ulo", "sa", "am", "a", "BELÉM", "xyz", "  "):
+            for limit in (1, 2, 10):
+                self.assertEqual(snapshot.search(query, limit), index.search(query, limit), (query, limit))
+
+    def test_rows_and_pagination(self):
+        """Testa as colunas projetadas, os nulos e a paginação pelo cursor"""
+        write_snapshot(self.path, ROWS)
+        snapshot = SnapshotIndex(self.path)
+        results, cursor = search_page_snapshot(snapshot, "paul", 2, ("id", "razao_social", "nome_fantasia"))
+        self.assertEqual(results, [
+            {"id": 4, "razao_social": "SAÚDE PAULO ALVES", "nome_fantasia": None},
+            {"id": 1, "razao_social": "UNIMED DE SÃO PAULO", "nome_fantasia": None},
+        ])
+        results, cursor = search_page_snapshot(snapshot, "paul", 2, ("registro_ans",), cursor)
+        self.assertEqual((results, cursor), ([{"registro_ans": "300003"}], None))
+
+    def test_store_swaps_snapshot(self):
+        """Testa a troca para o arquivo novo, com o snapshot anterior ainda legível"""
+        store = SnapshotStore(self.path, check_interval=0)
+        self.assertIsNone(store.current())
+        write_snapshot(self.path, ROWS)
+        old = store.current()
+        self.assertIs(store.current(), old)
+
+        write_snapshot(self.path, ROWS + [operator_row(5, "NOVA OPERADORA", None, "Natal")])
+        new = store.current()
+        self.assertIsNot(new, old)
+        self.assertNotEqual(new.version, old.version)
+        self.assertEqual(new.search("nova"), [5])
+        self.assertEqual(old.search("nova"), [])
+        self.assertEqual(old.search("amil"), [2])
+        self.assertEqual([path.name for path in Path(self.tmp_dir).iterdir()], ["operadoras.snapshot"])
+
+
+class TestSnapshotEndpoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client_context = TestClient(app)
+        cls.client = cls.client_context.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client_context.__exit__(None, None, None)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SnapshotStore(os.path.join(self.tmp_dir, "operadoras.snapshot"), check_interval=0)
+        get_search_service().cache.invalidate()
+
+    def tearDown(self):
+        get_search_service().cache.invalidate()
+        shutil.rmtree(self.tmp_dir)
+
+    def _search(self, **params):
+        response = self.client.get("/api/search", params=params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_serves_search_without_database(self):
+        """Testa se o modo snapshot responde igual ao banco, sem nenhuma consulta"""
+        queries = [{"query": "saude", "limit": 20}, {"query": "unimed", "fields": "registro_ans,uf"},
+                   {"query": "sao paulo", "limit": 5}]
+        expected = [self._search(**params) for params in queries]
+        get_search_service().cache.invalidate()
+        with SessionLocal() as db:
+            self.store.build(db)
+
+        with patch.object(operator_snapshot, "snapshot_store", self.store), \
+                patch.object(AsyncSession, "execute", side_effect=AssertionError("consultou o banco")):
+            for params, body in zip(queries, expected):
+                found = self._search(**params)
+                self.assertEqual(found["results"], body["results"])
+            # Paginação seguindo o cursor do snapshot
+            first = self._search(query="saude", limit=10)
+            second = self._search(query="saude", limit=10, cursor=first["next_cursor"])
+        self.assertEqual(first["results"] + second["results"], expected[0]["results"])
+
+    def test_cache_follows_snapshot_swap(self):
+        """Testa se o cache deixa de servir as páginas do snapshot anterior após a troca do arquivo"""
+        with SessionLocal() as db:
+            self.store.build(db)
+        with patch.object(operator_snapshot, "snapshot_store", self.store):
+            first = self._search(query="paulo", limit=1)
+            self.assertIsNotNone(first["next_cursor"])
+            # Outro worker grava um snapshot novo; este só percebe a troca do arquivo
+            write_snapshot(self.store.path, ROWS)
+            found = self._search(query="paulo", limit=1)
+            self.assertNotEqual(found, first)
+            results, _ = search_page_snapshot(self.store.current(), "paulo", 1, COLUMNS)
+            self.assertEqual(found["results"], results)
+        self.assertEqual(len(self.store.current()), len(ROWS))
+
+    def test_reseed_writes_new_snapshot(self):
+        """Testa se recarregar as operadoras grava um snapshot novo"""
+        with SessionLocal() as db:
+            self.store.build(db)
+            version = self.store.current().version
+            with patch.object(operator_snapshot, "snapshot_store", self.store):
+                OperatorRepository(db).load_data(force=True)
+        self.assertNotEqual(self.store.current().version, version)
+        self.assertGreater(len(self.store.current()), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from app.database import (
+    SessionLocal, dispose_async_engine, get_async_engine, get_async_sessionmaker, init_db
+)
+from app.repositories.operator_repository import OperatorRepository
+from app.services.query_cache import MemoryCacheBackend, QueryCache
+from app.services.search_service import SearchService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QueryCache(max_entries=2, ttl=10, clock=self.clock)
+        self.calls = []
+
+    def compute(self, value):
+        def run():
+            self.calls.append(value)
+            return value
+        return run
+
+    def test_hit_miss_and_lru_eviction(self):
+        """Testa os acertos e a remoção da entrada menos usada"""
+        self.cache.get_or_compute("a", self.compute(1))
+        self.cache.get_or_compute("b", self.compute(2))
+        self.assertEqual(self.cache.get_or_compute("a", self.compute(99)), 1)
+        self.cache.get_or_compute("c", self.compute(3))
+
+        self.assertEqual(self.cache.get_or_compute("a", self.compute(99)), 1)
+        self.assertEqual(self.cache.get_or_compute("b", self.compute(4)), 4)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 4, 2))
+
+    def test_ttl_expiration(self):
+        """Testa se a entrada expira depois do TTL"""
+        self.cache.get_or_compute("a", self.compute(1))
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get_or_compute("a", self.compute(2)), 1)
+        self.clock.now = 10.0
+        self.assertEqual(self.cache.get_or_compute("a", self.compute(2)), 2)
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_concurrent_misses_run_once(self):
+        """Testa se requisições simultâneas iguais fazem uma única consulta"""
+        release = threading.Event()
+
+        def slow():
+            self.calls.append(1)
+            release.wait(5)
+            return "resultado"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(self.cache.get_or_compute, "a", slow) for _ in range(8)]
+            while self.cache.stats()["coalesced"] < 7:
+                threading.Event().wait(0.01)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, ["resultado"] * 8)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_errors_reach_waiters_and_are_not_cached(self):
+        """Testa se um erro na consulta não fica no cache"""
+        def failing():
+            raise RuntimeError("banco indisponível")
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_compute("a", failing)
+        self.assertEqual(self.cache.get_or_compute("a", self.compute(1)), 1)
+
+    def test_invalidate_discards_in_flight_results(self):
+        """Testa se um resultado calculado antes da invalidação não é guardado"""
+        def stale():
+            self.cache.invalidate()
+            return "antigo"
+
+        self.assertEqual(self.cache.get_or_compute("a", stale), "antigo")
+        self.assertEqual(self.cache.get_or_compute("a", self.compute("novo")), "novo")
+
+    def test_shared_backend(self):
+        """Testa o compartilhamento de resultados e invalidações entre workers"""
+        backend = MemoryCacheBackend()
+        worker_1 = QueryCache(backend=backend)
+        worker_2 = QueryCache(backend=backend)
+
+        worker_1.get_or_compute(("unimed", 10), self.compute([{"registro_ans": "1"}]))
+        self.assertEqual(worker_2.get_or_compute(("unimed", 10), self.compute([])), [{"registro_ans": "1"}])
+        self.assertEqual(len(self.calls), 1)
+
+        worker_1.invalidate()
+        self.assertEqual(worker_2.get_or_compute(("unimed", 10), self.compute([])), [])
+
+
+class TestAsyncQueryCache(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_async_misses_run_once(self):
+        """Testa o singleflight entre corrotinas, sem bloquear o event loop"""
+        cache = QueryCache()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "resultado"
+
+        results = await asyncio.gather(*(cache.aget_or_compute("a", slow) for _ in range(50)))
+        self.assertEqual(results, ["resultado"] * 50)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["coalesced"], 49)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        """Testa se o cancelamento do líder faz uma das requisições em espera refazer a consulta"""
+        cache = QueryCache()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "resultado"
+
+        leader = asyncio.create_task(cache.aget_or_compute("a", slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.aget_or_compute("a", slow)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        self.assertEqual(await asyncio.gather(*waiters), ["resultado"] * 3)
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        self.assertEqual(len(calls), 2)
+
+    async def test_cache_invalidated_by_load_data(self):
+        """Testa o cache da busca e a invalidação quando as operadoras são recarregadas"""
+        init_db()
+        service = SearchService(QueryCache())
+        async with get_async_sessionmaker()() as db:
+            first = await service.search_operators(db, "São Paulo", 5)
+            self.assertEqual(await service.search_operators(db, "sao  paulo", 5), first)
+            self.assertEqual(service.cache_stats()["hits"], 1)
+
+            with SessionLocal() as sync_db:
+                OperatorRepository(sync_db).load_data(force=True)
+            self.assertEqual(service.cache_stats()["entries"], 0)
+            self.assertEqual(await service.search_operators(db, "sao paulo", 5), first)
+        await dispose_async_engine()
+        get_async_engine.cache_clear()
+        get_async_sessionmaker.cache_clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,15 @@ const api = axios.create({
   baseURL: 'http://localhost:8010/api',
 });
 
+// Apenas as colunas exibidas em ResultsTable
+const RESULT_FIELDS = 'registro_ans,razao_social,nome_fantasia,modalidade,cidade,uf';
+
 export default {
-  searchOperators(query, limit = 10) {
-    return api.get('/search', {
-      params: { query, limit }
-    });
+  searchOperators(query, limit = 10, cursor = null) {
+    const params = { query, limit, fields: RESULT_FIELDS };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+    return api.get('/search', { params });
   }
-};
\ No newline at end of file
+};
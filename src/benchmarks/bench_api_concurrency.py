@@ -0,0 +1,193 @@
+"""Benchmark de concorrência do /api/search: caminho síncrono x assíncrono
+
+Sobe a API com o uvicorn em um processo separado e dispara --clients clientes
+simultâneos (conexões keep-alive com asyncio) contra três rotas servidas pelo mesmo
+processo e pelo mesmo banco, com o cache de resultados desligado:
+- /sync/search: rota def com a sessão síncrona, executada no threadpool
+- /api/search: AsyncSession de ponta a ponta (implementação atual)
+- /blocking/search (só com --with-blocking): rota async def com a sessão
+  síncrona, como era originalmente. Cada consulta bloqueia o event loop e,
+  com mais clientes que conexões no pool, as requisições esperam conexões
+  que só são devolvidas pelo próprio event loop, até o pool_timeout
+
+Por padrão usa um SQLite temporário (aiosqlite) e soma --latency ms a cada
+comando SQL para simular a ida e volta até um Postgres na rede: com
+time.sleep no driver síncrono e asyncio.sleep no assíncrono. Para medir
+contra o Postgres, informe --database-url e --latency 0.
+
+Uso:
+    $ python benchmarks/bench_api_concurrency.py [--clients 500] [--requests 4] [--with-blocking]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+import uvicorn
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+QUERIES = ["unimed", "saude", "odonto", "sao paulo", "medica", "rio", "assistencia", "vida"]
+
+
+def add_sync_routes(app):
+    """Rotas de referência com a sessão síncrona"""
+    from fastapi import Depends, Query
+    from app.database import get_db
+    from app.repositories.operator_repository import OperatorRepository
+
+    @app.get("/blocking/search")
+    async def blocking_search(query: str = Query(..., min_length=2), limit: int = Query(10), db=Depends(get_db)):
+        return {"query": query, "results": OperatorRepository(db).search_operators(query, limit)}
+
+    @app.get("/sync/search")
+    def sync_search(query: str = Query(..., min_length=2), limit: int = Query(10), db=Depends(get_db)):
+        return {"query": query, "results": OperatorRepository(db).search_operators(query, limit)}
+
+
+def add_latency(engine, latency):
+    """Soma latency segundos a cada comando SQL, nos dois drivers"""
+    import aiosqlite
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def network_round_trip(*args):
+        time.sleep(latency)
+
+    execute = aiosqlite.Cursor.execute
+
+    async def execute_with_latency(self, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return await execute(self, *args, **kwargs)
+
+    aiosqlite.Cursor.execute = execute_with_latency
+
+
+def serve(args):
+    """Processo do servidor: configura a API e roda o uvicorn"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["SEARCH_CACHE_SIZE"] = "0"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.database import engine
+    from app.main import app
+
+    add_sync_routes(app)
+    if args.latency:
+        add_latency(engine, args.latency / 1000)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", backlog=4096)
+
+
+def start_server(args):
+    # Servidor em outro processo, para que os clientes não disputem o GIL com ele
+    command = [
+        sys.executable, __file__, "--serve", "--port", str(args.port),
+        "--database-url", args.database_url, "--latency", str(args.latency),
+    ]
+    process = subprocess.Popen(command)
+    base_url = f"http://127.0.0.1:{args.port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/docs", timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("o servidor não iniciou")
+
+
+async def fetch(reader, writer, host, target):
+    """GET HTTP/1.1 com keep-alive sobre uma conexão já aberta; retorna o status
+
+    Cliente mínimo: com centenas de conexões, o custo do httpx no próprio
+    benchmark passaria a limitar a vazão medida.
+    """
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def load(base_url, path, clients, requests):
+    """Cada cliente faz requests chamadas em sequência; retorna (latências, erros, segundos)"""
+    host = base_url.split("://", 1)[1]
+    hostname, port = host.split(":")
+    latencies = []
+    errors = 0
+
+    async def worker(index):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(hostname, int(port))
+        try:
+            for i in range(requests):
+                query = QUERIES[(index + i) % len(QUERIES)]
+                target = f"{path}?{urlencode({'query': query, 'limit': 10})}"
+                start = time.perf_counter()
+                try:
+                    errors += await fetch(reader, writer, host, target) != 200
+                except (OSError, asyncio.IncompleteReadError):
+                    errors += 1
+                    writer.close()
+                    reader, writer = await asyncio.open_connection(hostname, int(port))
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(clients)))
+    elapsed = time.perf_counter() - start
+    return sorted(latencies), errors, elapsed
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=4, help="requisições por cliente")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--database-url', default=os.environ.get("DATABASE_URL"))
+    parser.add_argument('--latency', type=float, default=5.0, help="ms por comando SQL")
+    parser.add_argument('--with-blocking', action='store_true', help="mede também a rota original")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+    args.database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    process, base_url = start_server(args)
+    try:
+        asyncio.run(load(base_url, "/api/search", 10, 2))  # aquecimento
+        print(f"{args.clients} clientes x {args.requests} requisições, latência simulada {args.latency} ms")
+        print(f"{'rota':>18} {'req/s':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>6}")
+        paths = ["/sync/search", "/api/search"]
+        if args.with_blocking:
+            paths.insert(0, "/blocking/search")
+        for path in paths:
+            latencies, errors, elapsed = asyncio.run(load(base_url, path, args.clients, args.requests))
+            print(f"{path:>18} {len(latencies) / elapsed:>8.1f} {percentile(latencies, 0.5):>10.1f} "
+                  f"{percentile(latencies, 0.99):>10.1f} {errors:>6}")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
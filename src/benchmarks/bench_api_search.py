@@ -0,0 +1,132 @@
+"""Teste de carga do endpoint /api/search do backend de operadoras
+
+Sobe a API com o uvicorn em uma thread e mede requisições por segundo em
+dois endpoints servidos pelo mesmo processo e pelo mesmo banco:
+- /legacy/search: o ciclo de vida original, com um SearchService e uma sessão
+  nova por requisição, SELECT count(*) em operators a cada chamada e a rota
+  declarada como async (a consulta síncrona bloqueia o event loop)
+- /api/search: a implementação atual (sessão por requisição do pool,
+  serviço único e carga dos dados apenas na inicialização)
+
+Por padrão usa um SQLite temporário, com --latency milissegundos somados a
+cada comando SQL para simular a ida e volta até um Postgres na rede. Para
+medir contra o Postgres de verdade, informe --database-url (ou DATABASE_URL)
+e --latency 0.
+
+Uso:
+    $ python benchmarks/bench_api_search.py [--duration 10] [--clients 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+QUERIES = ["unimed", "saude", "odonto", "sao paulo", "medica", "rio", "assistencia", "vida"]
+
+
+def add_legacy_route(app):
+    """Reproduz a rota original para servir de referência"""
+    from fastapi import Query
+    from app.database import SessionLocal
+    from app.models.operator import Operator
+
+    @app.get("/legacy/search")
+    async def legacy_search(query: str = Query(..., min_length=2), limit: int = Query(10, gt=0, le=100)):
+        db = SessionLocal()
+        try:
+            # OperatorRepository.__init__ chamava load_data, que contava as linhas
+            db.query(Operator).count()
+            results = db.query(Operator).filter(
+                Operator.razao_social.ilike(f"%{query}%") |
+                Operator.nome_fantasia.ilike(f"%{query}%") |
+                Operator.cidade.ilike(f"%{query}%")
+            ).limit(limit).all()
+            return {"query": query, "results": results}
+        finally:
+            db.close()
+
+
+def add_latency(engine, latency):
+    """Soma latency segundos a cada comando SQL, como a ida e volta da rede"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def network_round_trip(*args):
+        time.sleep(latency)
+
+
+def start_server(app, port):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def load(base_url, path, duration, clients):
+    """Dispara requisições por duration segundos; retorna (requisições, erros, segundos)"""
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        done = errors = 0
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while time.perf_counter() < deadline:
+                query = QUERIES[(index + done) % len(QUERIES)]
+                response = client.get(path, params={"query": query, "limit": 10})
+                done += 1
+                errors += response.status_code != 200
+        return done, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(worker, range(clients)))
+    elapsed = time.perf_counter() - start
+    return sum(r[0] for r in results), sum(r[1] for r in results), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--database-url', default=os.environ.get("DATABASE_URL"))
+    parser.add_argument('--latency', type=float, default=1.0, help="ms por comando SQL")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.database import engine
+    from app.main import app
+
+    add_legacy_route(app)
+    if args.latency:
+        add_latency(engine, args.latency / 1000)
+    server, thread = start_server(app, args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        # Aquecimento: carga inicial dos dados e conexões do pool
+        load(base_url, "/api/search", 1, args.clients)
+        print(f"{'endpoint':>16} {'requisições':>12} {'erros':>6} {'req/s':>10}")
+        rates = {}
+        for path in ("/legacy/search", "/api/search"):
+            done, errors, elapsed = load(base_url, path, args.duration, args.clients)
+            rates[path] = done / elapsed
+            print(f"{path:>16} {done:>12} {errors:>6} {rates[path]:>10.1f}")
+        print(f"ganho: {rates['/api/search'] / rates['/legacy/search']:.1f}x")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
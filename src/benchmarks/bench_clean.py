@@ -0,0 +1,110 @@
+"""Benchmark da limpeza dos dados extraídos do Rol de Procedimentos
+
+Compara a limpeza original (operações de string encadeadas por coluna e uma
+lambda por célula nas colunas de segmentação) com a limpeza vetorizada de
+ANSDataTransformer, usando dados do tamanho de src/output/rol_procedimentos.csv
+e uma versão sintética 100 vezes maior.
+
+Uso:
+    $ python benchmarks/bench_clean.py [--repeat 3] [--scale 100]
+"""
+import argparse
+import csv
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+from data_transformation.Data_transformtion import ANSDataTransformer
+
+CSV_PATH = SRC_DIR / "output" / "rol_procedimentos.csv"
+PDF_PATH = SRC_DIR / "web_scraping" / "downloads" / "Anexo_II.pdf"
+COLUMNS = ['PROCEDIMENTO', 'RN_ALTERACAO', 'VIGENCIA', 'OD', 'AMB', 'HCO', 'HSO',
+           'REF', 'PAC', 'DUT', 'SUBGRUPO', 'GRUPO', 'CAPITULO']
+
+
+def legacy_clean_frame(transformer, df):
+    """Limpeza original, mantida aqui como referência de desempenho e resultado"""
+    df = df.dropna(how='all')
+    for col in df.columns:
+        df[col] = df[col].astype(str).str.strip().str.replace('\n', ' ')
+        df[col] = df[col].replace({'nan': '', 'None': ''})
+    df = df[~df.iloc[:, 0].str.contains('Legenda:|OD:|AMB:|HCO:|HSO:|REF:|PAC:|DUT:', na=False)]
+    df = df.dropna(axis=1, how='all')
+    df.columns = COLUMNS
+    for col in transformer.column_mapping.keys():
+        if col in df.columns:
+            df[col] = df[col].apply(
+                lambda x: transformer.column_mapping[col] if str(x).strip() == 'X' else ''
+            )
+    return df
+
+
+def load_raw_rows(scale=1, seed=42):
+    """Reconstrói linhas brutas, como saem do pdfplumber, a partir do CSV final"""
+    rng = random.Random(seed)
+    with open(CSV_PATH, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=';')
+        header = next(reader)
+        rows = [row[:len(header)] for row in reader if len(row) >= len(header)]
+
+    raw = [header]
+    legend = ["Legenda: OD: Seg. Odontológica AMB: Seg. Ambulatorial"] + [''] * (len(header) - 1)
+    for _ in range(scale):
+        for row in rows:
+            raw_row = [f" {value}\n" if value and rng.random() < 0.2 else value for value in row]
+            for pos in range(3, 10):
+                raw_row[pos] = rng.choice(['X', ' X ', '', None])
+            raw.append(raw_row)
+        raw.append(legend)
+        raw.append([''] * len(header))
+    return raw
+
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(scale, repeat, transformer):
+    raw = load_raw_rows(scale)
+    # A construção do DataFrame é igual nos dois casos e fica fora da medição
+    df = pd.DataFrame(raw[1:], columns=raw[0])
+
+    legacy_time, legacy = best_of(repeat, lambda: legacy_clean_frame(transformer, df.copy()))
+    new_time, new = best_of(repeat, lambda: transformer._clean_frame(df.copy()))
+
+    # O resultado precisa ser idêntico ao da implementação original
+    pd.testing.assert_frame_equal(
+        legacy.reset_index(drop=True),
+        new.astype(str).reset_index(drop=True),
+        check_dtype=False
+    )
+    return len(raw) - 1, legacy_time, new_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scale', type=int, default=100)
+    args = parser.parse_args()
+
+    transformer = ANSDataTransformer(str(PDF_PATH))
+    print(f"{'linhas':>10} {'original (s)':>14} {'vetorizado (s)':>16} {'ganho':>8}")
+    for scale in (1, args.scale):
+        rows, legacy_time, new_time = run(scale, args.repeat, transformer)
+        print(f"{rows:>10} {legacy_time:>14.3f} {new_time:>16.3f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
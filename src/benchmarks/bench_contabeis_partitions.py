@@ -0,0 +1,168 @@
+"""Benchmark do particionamento trimestral de demonstracoes_contabeis no PostgreSQL
+
+Carrega demonstrações contábeis sintéticas (operadoras x contas x trimestres)
+em duas versões da tabela, cada uma em um schema próprio:
+- heap: a tabela única original, com chave primária e índices em reg_ans e data
+- particionada: o layout de sql/create_tables.sql, uma partição por trimestre
+
+e mede, nas duas:
+- carga: tempo total do COPY de todos os trimestres e do último trimestre,
+  com a tabela já cheia
+- consultas: agregação de uma conta em um trimestre e em um ano (as consultas
+  de período leem só as partições do intervalo)
+- recarga de um trimestre: DELETE + COPY na heap; tabela nova + DETACH/ATTACH
+  na particionada, como ContabeisIngestion.reload_quarter
+
+Requer um PostgreSQL (os schemas bench_heap e bench_particionada são recriados).
+
+Uso:
+    $ python benchmarks/bench_contabeis_partitions.py --database-url postgresql://... [--years 4]
+"""
+import argparse
+import io
+import os
+import random
+import time
+from datetime import date
+
+from sqlalchemy import create_engine
+
+ACCOUNT = "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"
+COLUMNS = "data, reg_ans, cd_conta_contabil, descricao, vl_saldo_inicial, vl_saldo_final"
+TABLE = (
+    "CREATE TABLE {schema}.demonstracoes_contabeis ("
+    "data DATE NOT NULL, reg_ans VARCHAR(20) NOT NULL, cd_conta_contabil VARCHAR(20) NOT NULL, "
+    "descricao VARCHAR(255) NOT NULL, vl_saldo_inicial NUMERIC(15,2) NOT NULL, "
+    "vl_saldo_final NUMERIC(15,2) NOT NULL, PRIMARY KEY (data, reg_ans, cd_conta_contabil)){partitioning}"
+)
+QUERY = (
+    "SELECT reg_ans, SUM(vl_saldo_final - vl_saldo_inicial) AS total FROM {schema}.demonstracoes_contabeis "
+    "WHERE descricao = %(conta)s AND data >= %(inicio)s AND data < %(fim)s "
+    "GROUP BY reg_ans ORDER BY total DESC LIMIT 10"
+)
+
+
+def quarters(years):
+    return [date(2015 + year, month, 1) for year in range(years) for month in (1, 4, 7, 10)]
+
+
+def next_quarter(quarter):
+    month = quarter.month + 3
+    return date(quarter.year + (month > 12), (month - 1) % 12 + 1, 1)
+
+
+def quarter_csv(quarter, operators, accounts, rng):
+    buffer = io.StringIO()
+    for reg in range(operators):
+        for account in range(accounts):
+            descricao = ACCOUNT if account == 0 else f"CONTA {account}"
+            buffer.write(f"{quarter},{400000 + reg},4{account:03d},\"{descricao}\","
+                         f"{rng.uniform(0, 1e6):.2f},{rng.uniform(0, 1e6):.2f}\n")
+    buffer.seek(0)
+    return buffer
+
+
+def partition(schema, quarter):
+    return f"{schema}.demonstracoes_contabeis_{quarter.year}q{(quarter.month - 1) // 3 + 1}"
+
+
+def create_schema(cursor, schema, partitioned):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    cursor.execute(TABLE.format(schema=schema, partitioning=" PARTITION BY RANGE (data)" if partitioned else ""))
+    cursor.execute(f"CREATE INDEX ON {schema}.demonstracoes_contabeis(reg_ans)")
+    cursor.execute(f"CREATE INDEX ON {schema}.demonstracoes_contabeis(data)")
+
+
+def load_quarter(cursor, schema, partitioned, quarter, data):
+    if partitioned:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition(schema, quarter)} PARTITION OF {schema}.demonstracoes_contabeis "
+            f"FOR VALUES FROM ('{quarter}') TO ('{next_quarter(quarter)}')"
+        )
+    cursor.copy_expert(f"COPY {schema}.demonstracoes_contabeis ({COLUMNS}) FROM STDIN WITH (FORMAT csv)", data)
+
+
+def reload_quarter(cursor, schema, partitioned, quarter, data):
+    if not partitioned:
+        cursor.execute(f"DELETE FROM {schema}.demonstracoes_contabeis WHERE data >= %s AND data < %s",
+                       (quarter, next_quarter(quarter)))
+        cursor.copy_expert(f"COPY {schema}.demonstracoes_contabeis ({COLUMNS}) FROM STDIN WITH (FORMAT csv)", data)
+        return
+    name, new = partition(schema, quarter), f"{partition(schema, quarter)}_novo"
+    cursor.execute(f"CREATE TABLE {new} (LIKE {schema}.demonstracoes_contabeis INCLUDING ALL)")
+    cursor.execute(f"ALTER TABLE {new} ADD CHECK (data >= '{quarter}' AND data < '{next_quarter(quarter)}')")
+    cursor.copy_expert(f"COPY {new} ({COLUMNS}) FROM STDIN WITH (FORMAT csv)", data)
+    cursor.execute(f"ALTER TABLE {schema}.demonstracoes_contabeis DETACH PARTITION {name}")
+    cursor.execute(f"DROP TABLE {name}")
+    cursor.execute(f"ALTER TABLE {schema}.demonstracoes_contabeis ATTACH PARTITION {new} "
+                   f"FOR VALUES FROM ('{quarter}') TO ('{next_quarter(quarter)}')")
+
+
+def median_ms(cursor, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=os.environ.get("DATABASE_URL"), required=not os.environ.get("DATABASE_URL"))
+    parser.add_argument('--years', type=int, default=4)
+    parser.add_argument('--operators', type=int, default=1000)
+    parser.add_argument('--accounts', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    connection = create_engine(args.database_url).raw_connection()
+    cursor = connection.cursor()
+    all_quarters = quarters(args.years)
+    rng = random.Random(42)
+    files = {quarter: quarter_csv(quarter, args.operators, args.accounts, rng).getvalue() for quarter in all_quarters}
+    last = all_quarters[-1]
+    results = {}
+
+    for schema, partitioned in (("bench_heap", False), ("bench_particionada", True)):
+        create_schema(cursor, schema, partitioned)
+        connection.commit()
+        start = time.perf_counter()
+        for quarter in all_quarters[:-1]:
+            load_quarter(cursor, schema, partitioned, quarter, io.StringIO(files[quarter]))
+            connection.commit()
+        last_start = time.perf_counter()
+        load_quarter(cursor, schema, partitioned, last, io.StringIO(files[last]))
+        connection.commit()
+        load_last = time.perf_counter() - last_start
+        load_total = time.perf_counter() - start
+        cursor.execute(f"ANALYZE {schema}.demonstracoes_contabeis")
+        connection.commit()
+
+        quarter = all_quarters[-2]
+        query = QUERY.format(schema=schema)
+        quarter_ms = median_ms(cursor, query, {"conta": ACCOUNT, "inicio": quarter, "fim": next_quarter(quarter)},
+                               args.repeat)
+        year_ms = median_ms(cursor, query, {"conta": ACCOUNT, "inicio": all_quarters[-4], "fim": next_quarter(last)},
+                            args.repeat)
+
+        start = time.perf_counter()
+        reload_quarter(cursor, schema, partitioned, quarter, io.StringIO(files[quarter]))
+        connection.commit()
+        reload_s = time.perf_counter() - start
+        results[schema] = (load_total, load_last, quarter_ms, year_ms, reload_s)
+        cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+        connection.commit()
+
+    rows = len(all_quarters) * args.operators * args.accounts
+    print(f"{rows} linhas em {len(all_quarters)} trimestres")
+    print(f"{'layout':>20} {'carga s':>9} {'último trim. s':>15} {'trimestre ms':>13} {'ano ms':>9} {'recarga s':>10}")
+    for schema, (load_total, load_last, quarter_ms, year_ms, reload_s) in results.items():
+        print(f"{schema:>20} {load_total:>9.2f} {load_last:>15.2f} {quarter_ms:>13.2f} {year_ms:>9.2f} {reload_s:>10.2f}")
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark do ranking de maiores despesas: agregação direta vs. despesas_trimestrais
+
+Gera demonstrações contábeis sintéticas (operadoras x contas x trimestres) em
+um SQLite e mede, à medida que mais anos são carregados, a latência do
+ranking do último ano:
+- direto: a consulta original de queries_analiticas.sql, que filtra e agrega
+  demonstracoes_contabeis a cada execução
+- rollup: a mesma resposta a partir dos totais por trimestre mantidos pela
+  ingestão (database/ingestion/rollups.py)
+
+Uso:
+    $ python benchmarks/bench_expense_rollups.py [--years 1,3,5] [--operators 1000] [--accounts 40]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SRC_DIR))
+
+from sqlalchemy import create_engine, text
+from database.ingestion.contabeis import metadata
+from database.ingestion.rollups import next_quarter, refresh_quarters
+
+ACCOUNT = "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"
+
+DIRECT = text(
+    "SELECT reg_ans, SUM(vl_saldo_final - vl_saldo_inicial) AS total_despesas "
+    "FROM demonstracoes_contabeis WHERE upper(descricao) = upper(:conta) "
+    "AND data >= :inicio AND data < :fim GROUP BY reg_ans ORDER BY total_despesas DESC LIMIT 10"
+)
+ROLLUP = text(
+    "SELECT reg_ans, SUM(total) AS total_despesas "
+    "FROM despesas_trimestrais WHERE upper(descricao) = upper(:conta) "
+    "AND trimestre >= :inicio AND trimestre < :fim GROUP BY reg_ans ORDER BY total_despesas DESC LIMIT 10"
+)
+
+
+def quarter_rows(quarter, operators, accounts, rng):
+    for reg in range(operators):
+        for account in range(accounts):
+            descricao = ACCOUNT if account == 0 else f"CONTA {account}"
+            yield (quarter.isoformat(), str(400000 + reg), f"4{account:03d}", descricao,
+                   round(rng.uniform(0, 1e6), 2), round(rng.uniform(0, 1e6), 2))
+
+
+def measure(connection, statement, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(statement, params).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', default="1,3,5")
+    parser.add_argument('--operators', type=int, default=1000)
+    parser.add_argument('--accounts', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}")
+    metadata.create_all(engine)
+    rng = random.Random(42)
+    quarter, loaded = date(2010, 1, 1), 0
+
+    print(f"{'anos':>5} {'linhas':>10} {'direto ms':>10} {'rollup ms':>10} {'ganho':>7}")
+    for years in sorted(int(value) for value in args.years.split(",")):
+        with engine.begin() as connection:
+            # Carrega trimestre a trimestre, recalculando os totais como a ingestão
+            while loaded < years * 4:
+                connection.exec_driver_sql(
+                    "INSERT INTO demonstracoes_contabeis VALUES (?, ?, ?, ?, ?, ?)",
+                    list(quarter_rows(quarter, args.operators, args.accounts, rng))
+                )
+                refresh_quarters(connection, {quarter})
+                quarter, loaded = next_quarter(quarter), loaded + 1
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT count(*) FROM demonstracoes_contabeis")).scalar()
+            # Último ano carregado: os quatro trimestres mais recentes
+            params = {"conta": ACCOUNT, "inicio": date(quarter.year - 1, quarter.month, 1).isoformat(),
+                      "fim": quarter.isoformat()}
+            direct = measure(connection, DIRECT, params, args.repeat)
+            rollup = measure(connection, ROLLUP, params, args.repeat)
+        print(f"{years:>5} {rows:>10} {direct:>10.2f} {rollup:>10.2f} {direct / rollup:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
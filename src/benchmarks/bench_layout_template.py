@@ -0,0 +1,84 @@
+"""Benchmark da extração do PDF com o template de layout
+
+Extrai as tabelas do Anexo I duas vezes, em um único processo: com a
+detecção completa do pdfplumber em todas as páginas e com layout_template=True
+(grade de colunas aprendida nas páginas de amostra). Confere que as duas
+extrações são idênticas, mede o tempo total e o tempo por página e conta as
+páginas que seguiram o template e as que caíram na detecção completa.
+
+Sem web_scraping/downloads/Anexo_I.pdf (ou outro PDF em --pdf), usa um PDF
+sintético no formato do Rol (benchmarks/fixtures.py). Sai com código 1 se as
+extrações divergirem.
+
+Uso:
+    $ python benchmarks/bench_layout_template.py [--pdf Anexo_I.pdf] [--pages 100] [--sample 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+ANEXO_I = SRC_DIR / "web_scraping" / "downloads" / "Anexo_I.pdf"
+sys.path.insert(0, str(SRC_DIR))
+
+from fixtures import write_rol_pdf
+
+
+def extract(pdf_path, last_page, **kwargs):
+    from data_transformation.Data_transformtion import ANSDataTransformer
+
+    transformer = ANSDataTransformer(pdf_path, **kwargs)
+    transformer.last_page = last_page
+    start = time.perf_counter()
+    tables = transformer.extract_tables_from_pdf()
+    return transformer, tables, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pdf', default=str(ANEXO_I) if ANEXO_I.exists() else None)
+    parser.add_argument('--pages', type=int, default=100, help="páginas do PDF sintético")
+    parser.add_argument('--last-page', type=int, help="limita as páginas extraídas")
+    parser.add_argument('--sample', type=int, default=3, help="páginas de amostra do template")
+    args = parser.parse_args()
+
+    import pdfplumber
+    from loguru import logger as log
+    log.remove()
+
+    pdf_path = args.pdf
+    if pdf_path is None:
+        pdf_path = str(write_rol_pdf(Path(tempfile.mkdtemp()) / "rol.pdf", args.pages))
+    print(f"PDF: {pdf_path}")
+
+    _, expected, full_seconds = extract(pdf_path, args.last_page)
+    transformer, found, template_seconds = extract(
+        pdf_path, args.last_page, layout_template=True, template_sample_pages=args.sample
+    )
+    first, last = transformer._page_bounds()
+    pages = last - first
+
+    template = transformer.template
+    matched = 0
+    if template is not None:
+        with pdfplumber.open(pdf_path) as pdf:
+            matched = sum(template.grid(pdf.pages[index]) is not None for index in range(first, last))
+
+    print(f"{pages} páginas; template: "
+          f"{'não aprendido' if template is None else f'{len(template.columns) - 1} colunas'}; "
+          f"{matched} páginas seguem a grade, {pages - matched} exigem a detecção completa")
+    print(f"{'modo':>10} {'total s':>10} {'ms/página':>10}")
+    for name, seconds in (("completa", full_seconds), ("template", template_seconds)):
+        print(f"{name:>10} {seconds:>10.2f} {seconds * 1000 / max(pages, 1):>10.1f}")
+    print(f"ganho: {full_seconds / template_seconds:.2f}x")
+
+    if found != expected:
+        print("ERRO: a extração pelo template difere da detecção completa")
+        sys.exit(1)
+    print(f"extrações idênticas ({len(expected) - 1} linhas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark da carga do CSV de operadoras no banco do backend
+
+Compara o carregamento original (csv.DictReader e um objeto Operator por
+linha adicionado à sessão) com o BulkOperatorLoader (validação vetorizada em
+blocos e COPY/executemany com upsert), com CSVs sintéticos de 1 mil, 100 mil e
+1 milhão de linhas gerados a partir de resources/operadoras.csv.
+
+Por padrão usa um SQLite temporário; para medir o caminho COPY, informe
+--database-url com um PostgreSQL (o banco precisa estar vazio).
+
+Uso:
+    $ python benchmarks/bench_operator_load.py [--sizes 1000,100000,1000000]
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+sys.path.insert(0, str(BACKEND_DIR))
+# Só os modelos são usados; evita que app.database conecte ao banco padrão
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.database import Base
+from app.models.operator import Operator
+from app.repositories.operator_loader import BulkOperatorLoader
+from fixtures import write_operadoras_csv
+
+
+def legacy_load(db, csv_path):
+    """Carregamento original, mantido aqui como referência de desempenho"""
+    optional = {'Nome_Fantasia', 'Complemento', 'DDD', 'Telefone', 'Fax', 'Endereco_eletronico',
+                'Representante', 'Cargo_Representante', 'Regiao_de_Comercializacao'}
+    with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
+        reader = csv.DictReader(csvfile, delimiter=';')
+        for row in reader:
+            operator_data = {
+                name.lower(): (value if value or name not in optional else None)
+                for name, value in row.items()
+            }
+            db.add(Operator(**operator_data))
+        db.commit()
+
+
+def reset(engine):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def run(engine, csv_path, loader):
+    reset(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        start = time.perf_counter()
+        if loader == 'legacy':
+            legacy_load(db, csv_path)
+        else:
+            BulkOperatorLoader(db.connection()).load(csv_path)
+            db.commit()
+        elapsed = time.perf_counter() - start
+        count = db.execute(text("SELECT count(*) FROM operators")).scalar()
+    return elapsed, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--database-url')
+    parser.add_argument('--skip-legacy-above', type=int, default=None,
+                        help="não mede o carregamento original acima deste número de linhas")
+    args = parser.parse_args()
+
+    tmp_dir = Path(tempfile.mkdtemp())
+    engine = create_engine(args.database_url or f"sqlite:///{tmp_dir / 'bench.db'}")
+    print(f"banco: {engine.dialect.name}")
+    print(f"{'linhas':>10} {'original (s)':>14} {'em massa (s)':>14} {'ganho':>8}")
+    try:
+        for size in (int(s) for s in args.sizes.split(',')):
+            csv_path = tmp_dir / f"operadoras_{size}.csv"
+            write_operadoras_csv(csv_path, size)
+
+            bulk_time, bulk_count = run(engine, csv_path, 'bulk')
+            assert bulk_count == size, (bulk_count, size)
+            if args.skip_legacy_above is not None and size > args.skip_legacy_above:
+                print(f"{size:>10} {'-':>14} {bulk_time:>14.2f} {'-':>8}")
+                continue
+            legacy_time, legacy_count = run(engine, csv_path, 'legacy')
+            assert legacy_count == size, (legacy_count, size)
+            print(f"{size:>10} {legacy_time:>14.2f} {bulk_time:>14.2f} {legacy_time / bulk_time:>7.1f}x")
+    finally:
+        engine.dispose()
+        shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark da busca de operadoras com o índice de trigramas em memória
+
+Mede a latência (p50 e p99) de NgramIndex.search à medida que a tabela de
+operadoras cresce, comparada com uma varredura sequencial equivalente ao
+ILIKE '%q%' original (substring em todas as linhas). As operadoras
+sintéticas são as reais de resources/operadoras.csv com uma palavra aleatória
+acrescentada à razão social.
+
+O caminho PostgreSQL (pg_trgm + unaccent) não é medido aqui: depende de um
+servidor com as extensões instaladas.
+
+Uso:
+    $ python benchmarks/bench_search.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import csv
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.repositories.operator_repository import DEFAULT_CSV_PATH
+from app.repositories.operator_search import NgramIndex, normalize
+
+QUERIES = ["unimed", "sao paulo", "odonto", "saude", "rio de janeiro", "amil", "assistencia medica",
+           "bradesco", "cooperativa", "xyzabc", "hap", "porto alegre", "sul america", "medic"]
+
+
+def synthetic_rows(size, seed=42):
+    rng = random.Random(seed)
+    with open(DEFAULT_CSV_PATH, encoding='utf-8-sig') as f:
+        base = [(row['Razao_Social'], row['Nome_Fantasia'], row['Cidade'])
+                for row in csv.DictReader(f, delimiter=';')]
+    for i in range(size):
+        razao, fantasia, cidade = base[i % len(base)]
+        word = ''.join(rng.choices(string.ascii_uppercase, k=6))
+        yield (i + 1, f"{razao} {word}", fantasia or None, cidade)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def measure(search, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'índice (s)':>11} {'varredura p50/p99 (ms)':>24} {'índice p50/p99 (ms)':>21}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        rows = list(synthetic_rows(size))
+        start = time.perf_counter()
+        index = NgramIndex()
+        index.build(rows)
+        build_time = time.perf_counter() - start
+
+        # Varredura: o que o banco faz sem índice para ILIKE '%q%'
+        documents = [normalize(' '.join(filter(None, row[1:]))) for row in rows]
+
+        def scan(query):
+            query = normalize(query)
+            return [i for i, document in enumerate(documents) if query in document][:args.limit]
+
+        scan_p50, scan_p99 = measure(scan, max(1, args.repeat // 10))
+        index_p50, index_p99 = measure(lambda q: index.search(q, args.limit), args.repeat)
+        print(f"{size:>10} {build_time:>11.1f} {scan_p50:>11.2f} / {scan_p99:>9.2f} "
+              f"{index_p50:>9.2f} / {index_p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
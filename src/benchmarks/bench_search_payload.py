@@ -0,0 +1,110 @@
+"""Benchmark do tamanho e do tempo de resposta de /api/search
+
+Compara, com o cache de buscas desligado e o mesmo banco SQLite:
+- legado: objetos Operator completos convertidos em dicts e serializados
+  pelo FastAPI (jsonable_encoder), como a rota antes da paginação
+- completo: /api/search sem fields (todas as colunas, sem objetos ORM)
+- projetado: /api/search com fields=as colunas exibidas pelo frontend
+
+Para cada variante, mede o tamanho médio do corpo da resposta e a latência
+média e p99 das requisições, com o cliente no mesmo processo (TestClient).
+Mede também o percurso de várias páginas seguindo next_cursor.
+
+Uso:
+    $ python benchmarks/bench_search_payload.py [--limit 100] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+QUERIES = ["unimed", "saude", "odonto", "sao paulo", "medica", "rio", "assistencia", "vida"]
+FRONTEND_FIELDS = "registro_ans,razao_social,nome_fantasia,modalidade,cidade,uf"
+
+
+def add_legacy_route(app):
+    """Reproduz a resposta anterior: todas as colunas a partir de objetos ORM"""
+    from fastapi import Depends, Query
+    from app.database import get_async_db
+    from app.repositories.operator_repository import AsyncOperatorRepository
+    from app.services.search_service import COLUMNS
+
+    @app.get("/legacy/search")
+    async def legacy_search(query: str = Query(..., min_length=2), limit: int = Query(10, gt=0, le=100),
+                            db=Depends(get_async_db)):
+        operators = await AsyncOperatorRepository(db).search_operators(query, limit)
+        results = [{column: getattr(op, column) for column in COLUMNS} for op in operators]
+        return {"query": query, "results": results}
+
+
+def measure(client, path, params, repeat):
+    samples = []
+    sizes = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            response = client.get(path, params={"query": query, **params})
+            samples.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(response.content))
+    samples.sort()
+    return sum(sizes) / len(sizes), sum(samples) / len(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def walk_pages(client, limit, pages):
+    """Percorre até pages páginas de cada consulta; retorna o tempo médio por página (ms)"""
+    elapsed = 0.0
+    fetched = 0
+    for query in QUERIES:
+        params = {"query": query, "limit": limit, "fields": FRONTEND_FIELDS}
+        for _ in range(pages):
+            start = time.perf_counter()
+            body = client.get("/api/search", params=params).json()
+            elapsed += time.perf_counter() - start
+            fetched += 1
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+    return elapsed * 1000 / fetched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    # Cada requisição vai ao banco: mede a consulta e a serialização, não o cache
+    os.environ["SEARCH_CACHE_SIZE"] = "0"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    add_legacy_route(app)
+    variants = [
+        ("legado", "/legacy/search", {"limit": args.limit}),
+        ("completo", "/api/search", {"limit": args.limit}),
+        ("projetado", "/api/search", {"limit": args.limit, "fields": FRONTEND_FIELDS}),
+    ]
+    with TestClient(app) as client:
+        measure(client, "/api/search", {"limit": args.limit}, 1)  # aquecimento: índice e pool
+        print(f"{'variante':>10} {'bytes':>10} {'média ms':>10} {'p99 ms':>10}")
+        results = {}
+        for name, path, params in variants:
+            results[name] = measure(client, path, params, args.repeat)
+            size, mean, p99 = results[name]
+            print(f"{name:>10} {size:>10.0f} {mean:>10.2f} {p99:>10.2f}")
+        legacy, projected = results["legado"], results["projetado"]
+        print(f"projetado vs legado: {legacy[0] / projected[0]:.1f}x menos bytes, "
+              f"{legacy[1] / projected[1]:.1f}x mais rápido")
+        print(f"páginas de {args.limit} seguindo next_cursor: "
+              f"{walk_pages(client, args.limit, args.pages):.2f} ms por página")
+
+
+if __name__ == "__main__":
+    main()
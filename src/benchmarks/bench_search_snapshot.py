@@ -0,0 +1,110 @@
+"""Benchmark da busca servida pelo snapshot mapeado em memória
+
+Com operadoras sintéticas (benchmarks/fixtures.py) em um SQLite, compara:
+- ngram: índice de trigramas em memória por processo e as colunas buscadas
+  no banco a cada página (caminho atual fora do PostgreSQL)
+- snapshot: índice e colunas lidos do arquivo mapeado, sem acesso ao banco
+
+e mede a latência por página (média e p99) e a memória que cada worker do
+uvicorn mantém: o heap Python do índice (tracemalloc) contra o arquivo do
+snapshot, que fica no cache de páginas do sistema, uma vez para todos os
+workers.
+
+Uso:
+    $ python benchmarks/bench_search_snapshot.py [--operators 100000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+QUERIES = ["unimed", "saude", "odonto", "sao paulo", "medica", "rio", "assistencia", "vida"]
+FIELDS = ("registro_ans", "razao_social", "nome_fantasia", "modalidade", "cidade", "uf")
+
+from fixtures import write_operadoras_csv
+
+
+async def measure(search, limit, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            await search(query, limit)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def heap_bytes(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--operators', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp())
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from sqlalchemy import select
+    from app.database import Base, SessionLocal, engine, get_async_sessionmaker
+    from app.models.operator import Operator
+    from app.repositories.operator_repository import OperatorRepository
+    from app.repositories.operator_search import NgramIndex, SEARCH_FIELDS, search_page_ngram_async
+    from app.repositories.operator_snapshot import SnapshotIndex, search_page_snapshot, write_snapshot
+
+    Base.metadata.create_all(bind=engine)
+    csv_path = write_operadoras_csv(work_dir / "operadoras.csv", args.operators)
+    snapshot_path = work_dir / "operadoras.snapshot"
+    with SessionLocal() as db:
+        OperatorRepository(db).load_data(csv_path, force=True)
+        index_rows = db.execute(select(Operator.id, *[getattr(Operator, f) for f in SEARCH_FIELDS])).all()
+        start = time.perf_counter()
+        write_snapshot(snapshot_path, db.execute(select(Operator.__table__)).mappings())
+        write_seconds = time.perf_counter() - start
+
+    def build_index():
+        index = NgramIndex()
+        index.build(index_rows)
+        return index
+    _, index_heap = heap_bytes(build_index)
+    start = time.perf_counter()
+    snapshot, snapshot_heap = heap_bytes(lambda: SnapshotIndex(snapshot_path))
+    open_ms = (time.perf_counter() - start) * 1000
+
+    async def run():
+        async with get_async_sessionmaker()() as db:
+            async def ngram(query, limit):
+                return await search_page_ngram_async(db, query, limit, FIELDS)
+            await ngram("aquecimento", 1)
+            results = {"ngram": await measure(ngram, args.limit, args.repeat)}
+
+        async def from_snapshot(query, limit):
+            return search_page_snapshot(snapshot, query, limit, FIELDS)
+        results["snapshot"] = await measure(from_snapshot, args.limit, args.repeat)
+        return results
+
+    results = asyncio.run(run())
+    print(f"{args.operators} operadoras; snapshot de {snapshot_path.stat().st_size / 2**20:.1f} MB "
+          f"gravado em {write_seconds:.2f}s e aberto em {open_ms:.1f} ms")
+    print(f"{'caminho':>10} {'média ms':>10} {'p99 ms':>10} {'heap por worker':>16}")
+    for name, heap in (("ngram", index_heap), ("snapshot", snapshot_heap)):
+        mean, p99 = results[name]
+        print(f"{name:>10} {mean:>10.3f} {p99:>10.3f} {heap / 2**20:>13.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
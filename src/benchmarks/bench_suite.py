@@ -0,0 +1,223 @@
+"""Suíte de benchmarks de ponta a ponta, com resultado em JSON e limites de regressão
+
+Gera dados sintéticos (benchmarks/fixtures.py) e mede cada etapa do pipeline
+e da API:
+- extract_tables_from_pdf, clean_and_transform_data, save_to_csv e
+  compress_csv do ANSDataTransformer, com um PDF no formato do Rol
+- OperatorRepository.load_data com um operadoras.csv sintético
+- ContabeisIngestion.ingest com CSVs trimestrais de demonstrações contábeis
+- /api/search sob carga, com a API em um processo separado e o banco
+  carregado na etapa anterior (cache de resultados desligado)
+
+Além do tempo total, cada etapa registra uma métrica por unidade (ms por
+página, µs por linha, ms por MB), comparável entre execuções com tamanhos
+diferentes. Os limites em benchmarks/thresholds.json valem sobre essas
+métricas e foram calibrados com os tamanhos padrão (com dados muito menores,
+o custo fixo de cada etapa pesa nas métricas por unidade); com --baseline,
+também falha se uma métrica piorar mais que a tolerância em relação a um
+resultado anterior. Sai com código 1 se houver regressão.
+
+Uso:
+    $ python benchmarks/bench_suite.py [--pages 50] [--operators 100000] [--output resultado.json]
+    $ python benchmarks/bench_suite.py --baseline resultado_anterior.json [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = SRC_DIR / "application" / "backend" / "src" / "main" / "python"
+THRESHOLDS_PATH = Path(__file__).resolve().parent / "thresholds.json"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fixtures import write_contabeis_csvs, write_operadoras_csv, write_rol_pdf
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+
+
+def pipeline_stages(args, work_dir):
+    """Etapas do ANSDataTransformer sobre um PDF sintético"""
+    from data_transformation.Data_transformtion import ANSDataTransformer
+
+    pdf_path = write_rol_pdf(work_dir / "rol.pdf", args.pages, args.rows_per_page)
+    transformer = ANSDataTransformer(pdf_path, workers=args.workers)
+    transformer.output_dir = str(work_dir / "output")
+    stages = {}
+
+    with Timer() as timer:
+        raw_data = transformer.extract_tables_from_pdf()
+    stages["extract_tables_from_pdf"] = {
+        "seconds": timer.seconds, "paginas": args.pages, "linhas": len(raw_data),
+        "ms_por_pagina": timer.seconds * 1000 / args.pages,
+    }
+
+    with Timer() as timer:
+        df = transformer.clean_and_transform_data(raw_data)
+    stages["clean_and_transform_data"] = {
+        "seconds": timer.seconds, "linhas": len(df), "us_por_linha": timer.seconds * 1e6 / max(len(df), 1),
+    }
+
+    with Timer() as timer:
+        csv_path = transformer.save_to_csv(df)
+    size = os.path.getsize(csv_path)
+    stages["save_to_csv"] = {
+        "seconds": timer.seconds, "bytes": size, "us_por_linha": timer.seconds * 1e6 / max(len(df), 1),
+    }
+
+    with Timer() as timer:
+        zip_path = transformer.compress_csv(csv_path, "benchmark")
+    stages["compress_csv"] = {
+        "seconds": timer.seconds, "bytes": os.path.getsize(zip_path),
+        "ms_por_mb": timer.seconds * 1000 / (size / 2**20),
+    }
+    return stages
+
+
+def operator_load_stage(args, work_dir):
+    """OperatorRepository.load_data no banco que depois serve a API"""
+    from app.database import Base, SessionLocal, engine
+    from app.repositories.operator_repository import OperatorRepository
+    import app.models.operator, app.models.quarterly_expense  # noqa: F401
+
+    csv_path = write_operadoras_csv(work_dir / "operadoras.csv", args.operators)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db, Timer() as timer:
+        report = OperatorRepository(db).load_data(csv_path, force=True)
+    return {
+        "seconds": timer.seconds, "linhas": report.loaded,
+        "us_por_linha": timer.seconds * 1e6 / max(report.loaded, 1),
+    }
+
+
+def contabeis_stage(args, work_dir):
+    from database.ingestion.contabeis import ContabeisIngestion, discover_files
+
+    write_contabeis_csvs(work_dir / "contabeis", args.quarters, args.contabeis_operators, args.accounts)
+    ingestion = ContabeisIngestion(f"sqlite:///{work_dir / 'contabeis.db'}", workers=args.workers)
+    with Timer() as timer:
+        reports = ingestion.ingest(discover_files(str(work_dir / "contabeis")))
+    rows = sum(report.loaded for report in reports)
+    return {
+        "seconds": timer.seconds, "arquivos": len(reports), "linhas": rows,
+        "falhas": sum(report.status == "falhou" for report in reports),
+        "us_por_linha": timer.seconds * 1e6 / max(rows, 1),
+    }
+
+
+def search_stage(args, database_url):
+    from bench_api_concurrency import load, percentile, start_server
+
+    server_args = argparse.Namespace(port=args.port, database_url=database_url, latency=0)
+    process, base_url = start_server(server_args)
+    try:
+        asyncio.run(load(base_url, "/api/search", 10, 2))  # aquecimento
+        latencies, errors, elapsed = asyncio.run(load(base_url, "/api/search", args.clients, args.requests))
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        "seconds": elapsed, "requisicoes": len(latencies), "erros": errors,
+        "req_por_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5), "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def check(stages, thresholds, baseline, tolerance):
+    """Lista as métricas acima do limite ou piores que a linha de base
+
+    Todas as métricas comparadas são do tipo "menor é melhor".
+    """
+    regressions = []
+    for stage, limits in thresholds.items():
+        for metric, limit in limits.items():
+            value = stages.get(stage, {}).get(metric)
+            if value is not None and value > limit:
+                regressions.append(f"{stage}.{metric} = {value:.2f} acima do limite {limit}")
+    if baseline:
+        for stage, limits in thresholds.items():
+            for metric in limits:
+                value = stages.get(stage, {}).get(metric)
+                previous = baseline["stages"].get(stage, {}).get(metric)
+                if value is not None and previous and value > previous * (1 + tolerance):
+                    regressions.append(
+                        f"{stage}.{metric} = {value:.2f}, {value / previous - 1:+.0%} em relação à linha de base"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--rows-per-page', type=int, default=30)
+    parser.add_argument('--operators', type=int, default=100000)
+    parser.add_argument('--quarters', type=int, default=4)
+    parser.add_argument('--contabeis-operators', type=int, default=500)
+    parser.add_argument('--accounts', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=20, help="requisições por cliente")
+    parser.add_argument('--port', type=int, default=8767)
+    parser.add_argument('--thresholds', default=str(THRESHOLDS_PATH))
+    parser.add_argument('--baseline', help="resultado JSON de uma execução anterior")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="piora máxima em relação à linha de base")
+    parser.add_argument('--output', help="arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    # Banco da API: definido antes de importar app.database
+    database_url = f"sqlite:///{work_dir / 'api.db'}"
+    os.environ["DATABASE_URL"] = database_url
+    try:
+        stages = pipeline_stages(args, work_dir)
+        stages["operator_load_data"] = operator_load_stage(args, work_dir)
+        stages["contabeis_ingest"] = contabeis_stage(args, work_dir)
+        stages["api_search"] = search_stage(args, database_url)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.thresholds, encoding='utf-8') as f:
+        thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = check(stages, thresholds, baseline, args.tolerance)
+
+    result = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {name: value for name, value in vars(args).items()
+                       if name not in ("thresholds", "baseline", "output", "port")},
+        "stages": stages,
+        "regressoes": regressions,
+    }
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for regression in regressions:
+        print(f"REGRESSÃO: {regression}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
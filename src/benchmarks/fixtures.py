@@ -0,0 +1,157 @@
+"""Arquivos sintéticos no formato dos dados da ANS, para os benchmarks
+
+- write_rol_pdf: PDF com a tabela do Rol de Procedimentos, uma tabela com
+  bordas por página a partir da página 3, como o Anexo I
+- write_operadoras_csv: operadoras.csv com Registro_ANS e CNPJ únicos
+- write_contabeis_csvs: CSVs trimestrais de demonstrações contábeis
+
+O PDF é escrito diretamente (texto e linhas em Helvetica), sem dependências
+além da biblioteca padrão.
+"""
+import csv
+import itertools
+import random
+from datetime import date
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+OPERADORAS_CSV = SRC_DIR / "application" / "backend" / "src" / "main" / "resources" / "operadoras.csv"
+
+ROL_HEADER = ["PROCEDIMENTO", "RN\n(alteração)", "VIGÊNCIA", "OD", "AMB", "HCO", "HSO",
+              "REF", "PAC", "DUT", "SUBGRUPO", "GRUPO", "CAPÍTULO"]
+ROL_WIDTHS = [200, 60, 50, 25, 25, 25, 25, 25, 25, 25, 90, 90, 95]
+PAGE_WIDTH, PAGE_HEIGHT = 842, 595
+MARGIN = 30
+ROW_HEIGHT = 14
+FONT_SIZE = 5
+
+
+def _pdf_text(value):
+    data = value.encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def _page_stream(lines, table=None):
+    """Conteúdo de uma página: linhas de texto soltas e, opcionalmente, uma tabela com bordas"""
+    out = [b"0.5 w"]
+    y = PAGE_HEIGHT - MARGIN
+    for text in lines:
+        out.append(b"BT /F1 10 Tf %d %d Td (%s) Tj ET" % (MARGIN, y, _pdf_text(text)))
+        y -= 14
+    if table:
+        top = y - 10
+        bottom = top - ROW_HEIGHT * len(table)
+        xs = [MARGIN]
+        for width in ROL_WIDTHS:
+            xs.append(xs[-1] + width)
+        for row_index in range(len(table) + 1):
+            row_y = top - row_index * ROW_HEIGHT
+            out.append(b"%d %d m %d %d l S" % (xs[0], row_y, xs[-1], row_y))
+        for x in xs:
+            out.append(b"%d %d m %d %d l S" % (x, top, x, bottom))
+        for row_index, row in enumerate(table):
+            for col_index, cell in enumerate(row):
+                cell_lines = str(cell).split("\n")
+                base = top - row_index * ROW_HEIGHT - 6
+                for line_index, text in enumerate(cell_lines):
+                    out.append(b"BT /F1 %d Tf %d %d Td (%s) Tj ET" % (
+                        FONT_SIZE, xs[col_index] + 2, base - line_index * (FONT_SIZE + 1), _pdf_text(text)
+                    ))
+    return b"\n".join(out)
+
+
+def _write_pdf(path, streams):
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, preenchido depois
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for stream in streams:
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return path
+
+
+def rol_rows(page, rows_per_page, rng):
+    marks = ["OD", "AMB", "HCO", "HSO", "REF", "PAC"]
+    for row in range(rows_per_page):
+        yield [
+            f"PROCEDIMENTO {page}-{row} ({rng.choice(['COM', 'SEM'])} DIRETRIZ)",
+            f"RN {rng.randint(400, 500)}/2021", f"{rng.randint(1, 28):02d}/04/2021",
+            *[rng.choice([mark, ""]) for mark in marks],
+            rng.choice(["", "DUT 12"]), f"SUBGRUPO {row % 7}", f"GRUPO {row % 3}", f"CAPÍTULO {page % 5}",
+        ]
+
+
+def write_rol_pdf(path, pages, rows_per_page=30, seed=42):
+    """PDF com duas páginas de apresentação e pages páginas de tabela
+
+    A última página termina com as linhas da legenda, como no documento real.
+    """
+    rng = random.Random(seed)
+    streams = [
+        _page_stream(["ANEXO I - LISTA COMPLETA DE PROCEDIMENTOS (sintético)"]),
+        _page_stream(["Rol de Procedimentos e Eventos em Saúde"]),
+    ]
+    for page in range(pages):
+        table = [ROL_HEADER] + list(rol_rows(page, rows_per_page, rng))
+        if page == pages - 1:
+            table.append(["Legenda:"] + [""] * (len(ROL_HEADER) - 1))
+            table.append(["OD: Seg. Odontológica"] + [""] * (len(ROL_HEADER) - 1))
+        streams.append(_page_stream([f"Página {page + 3}"], table))
+    return _write_pdf(path, streams)
+
+
+def write_operadoras_csv(path, rows):
+    """Replica as operadoras reais com Registro_ANS e CNPJ únicos"""
+    with open(OPERADORAS_CSV, encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=';')
+        header = next(reader)
+        base = list(reader)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(header)
+        for i, row in zip(range(rows), itertools.cycle(base)):
+            writer.writerow([str(100000 + i), f"{i:014d}", *row[2:]])
+    return path
+
+
+def write_contabeis_csvs(directory, quarters, operators, accounts, seed=42):
+    """Um CSV por trimestre em <directory>/<ano>/<n>T<ano>.csv, com valores no formato brasileiro"""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(quarters):
+        quarter = date(2023 + index // 4, index % 4 * 3 + 1, 1)
+        year_dir = Path(directory) / str(quarter.year)
+        year_dir.mkdir(parents=True, exist_ok=True)
+        path = year_dir / f"{index % 4 + 1}T{quarter.year}.csv"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("DATA;REG_ANS;CD_CONTA_CONTABIL;DESCRICAO;VL_SALDO_INICIAL;VL_SALDO_FINAL\n")
+            for reg in range(operators):
+                for account in range(accounts):
+                    initial, final = rng.uniform(0, 1e7), rng.uniform(0, 1e7)
+                    f.write(
+                        f'"{quarter}";"{100000 + reg}";"4{account:03d}";"CONTA {account}";'
+                        f'"{initial:_.2f}";"{final:_.2f}"\n'.replace('.', ',').replace('_', '.')
+                    )
+        paths.append(path)
+    return paths
@@ -0,0 +1,228 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from loguru import logger as log
+from tqdm import tqdm
+
+CHUNK_SIZE = 1024 * 1024
+
+# Codecs suportados e o método de compressão correspondente no ZIP. O zstd
+# depende do suporte nativo do zipfile (Python 3.14+).
+CODECS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+if hasattr(zipfile, 'ZIP_ZSTANDARD'):
+    CODECS['zstd'] = zipfile.ZIP_ZSTANDARD
+
+# A gravação de membros já comprimidos (_append_compressed) depende de
+# atributos internos do zipfile, iguais do CPython 3.8 ao 3.14. Fora dessa
+# faixa, ou se algum deles faltar, add_files comprime em série pela API pública
+RAW_APPEND_VERSIONS = ((3, 8), (3, 14))
+RAW_APPEND_ATTRS = ('fp', 'start_dir', 'filelist', 'NameToInfo', '_writecheck', '_didModify', '_writing')
+
+
+def raw_append_supported(zf):
+    """Indica se o ZipFile aberto permite gravar membros já comprimidos"""
+    low, high = RAW_APPEND_VERSIONS
+    return (
+        sys.implementation.name == 'cpython'
+        and low <= sys.version_info[:2] <= high
+        and all(hasattr(zf, attr) for attr in RAW_APPEND_ATTRS)
+    )
+
+
+def parse_codec(spec):
+    """Converte 'deflate', 'deflate:9', 'stored' ou 'zstd:3' em (codec, nível)"""
+    name, _, level = spec.partition(':')
+    name = name.strip().lower()
+    if name not in CODECS:
+        if name == 'zstd':
+            raise ValueError("O codec zstd requer Python 3.14+ (zipfile.ZIP_ZSTANDARD)")
+        raise ValueError(f"Codec desconhecido: {spec}. Opções: {', '.join(CODECS)}")
+    return name, int(level) if level else None
+
+
+def timestamped_zip_path(output_dir, your_name):
+    """Caminho do ZIP no padrão Teste_<nome>_<data_hora>.zip"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(output_dir, f"Teste_{your_name}_{timestamp}.zip")
+
+
+class _ProgressWriter(io.RawIOBase):
+    """Stream de escrita que repassa os bytes ao membro do ZIP e atualiza o progresso"""
+
+    def __init__(self, target, pbar):
+        self._target = target
+        self._pbar = pbar
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        written = self._target.write(data)
+        self._pbar.update(written)
+        return written
+
+    def close(self):
+        if not self.closed:
+            self._target.close()
+        super().close()
+
+
+class ArchiveWriter:
+    """Escreve arquivos ZIP com codec configurável, compressão paralela e progresso por byte
+
+    Arquivos inteiros entram com add_files: com deflate, cada membro é
+    comprimido em uma thread (o zlib libera o GIL) para um arquivo temporário
+    e depois copiado já comprimido para o ZIP, na ordem informada. Os demais
+    codecs são comprimidos em streaming, um membro por vez, assim como o
+    deflate em versões do Python não cobertas por raw_append_supported. open_member
+    devolve um stream de escrita para gravar um membro à medida que os dados
+    são gerados, sem arquivo intermediário.
+    """
+
+    def __init__(self, zip_path, codec='deflate', level=None, workers=None,
+                 chunk_size=CHUNK_SIZE, desc="Compactando arquivo"):
+        self.zip_path = str(zip_path)
+        self.codec, spec_level = parse_codec(codec)
+        self.level = level if level is not None else spec_level
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.chunk_size = chunk_size
+        self.desc = desc
+        self._progress_lock = threading.Lock()
+        self._zip = zipfile.ZipFile(
+            self.zip_path, 'w', CODECS[self.codec], compresslevel=self.level, allowZip64=True
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close()
+        if exc_type is not None and os.path.exists(self.zip_path):
+            # Não deixa para trás um ZIP incompleto
+            os.remove(self.zip_path)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def add_files(self, members):
+        """Adiciona arquivos ao ZIP; members é uma lista de (caminho, nome_no_zip)"""
+        members = [(str(path), arcname) for path, arcname in members]
+        total = sum(os.path.getsize(path) for path, _ in members)
+
+        with tqdm(total=total, desc=self.desc, unit='B', unit_scale=True) as pbar:
+            if (self.codec == 'deflate' and len(members) > 1 and self.workers > 1
+                    and raw_append_supported(self._zip)):
+                self._add_files_parallel(members, pbar)
+            else:
+                for path, arcname in members:
+                    self._add_file_streaming(path, arcname, pbar)
+
+        for _, arcname in members:
+            log.debug(f"Adicionado ao ZIP: {arcname}")
+
+    def open_member(self, arcname, pbar=None):
+        """Abre um membro para escrita em streaming; retorna um stream binário
+
+        O tamanho final não é conhecido de antemão, então o membro é sempre
+        gravado com extensões ZIP64.
+        """
+        # Com o nome, o zipfile cria o membro com o codec e o nível do arquivo
+        target = self._zip.open(arcname, 'w', force_zip64=True)
+        if pbar is None:
+            return target
+        return _ProgressWriter(target, pbar)
+
+    def _add_file_streaming(self, path, arcname, pbar):
+        zinfo = zipfile.ZipInfo.from_file(path, arcname)
+        zinfo.compress_type = CODECS[self.codec]
+        # O atributo do nível de compressão mudou de nome no Python 3.13
+        if hasattr(zinfo, 'compress_level'):
+            zinfo.compress_level = self.level
+        else:
+            zinfo._compresslevel = self.level
+        with open(path, 'rb') as src, self._zip.open(zinfo, 'w') as dst:
+            for chunk in iter(lambda: src.read(self.chunk_size), b''):
+                dst.write(chunk)
+                pbar.update(len(chunk))
+
+    def _deflate_to_temp(self, path, tmp_dir, pbar):
+        """Comprime um arquivo em deflate bruto; retorna (temporário, crc, tamanho, tamanho comprimido)"""
+        level = self.level if self.level is not None else zlib.Z_DEFAULT_COMPRESSION
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        crc = 0
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix='.deflate')
+        with open(path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+            for chunk in iter(lambda: src.read(self.chunk_size), b''):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                dst.write(compressor.compress(chunk))
+                with self._progress_lock:
+                    pbar.update(len(chunk))
+            dst.write(compressor.flush())
+        return tmp_path, crc, size, os.path.getsize(tmp_path)
+
+    def _add_files_parallel(self, members, pbar):
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(self.zip_path)))
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(self._deflate_to_temp, path, tmp_dir, pbar)
+                    for path, _ in members
+                ]
+                # Os membros entram no ZIP na ordem informada
+                for (path, arcname), future in zip(members, futures):
+                    tmp_path, crc, size, compress_size = future.result()
+                    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+                    zinfo.CRC = crc
+                    zinfo.file_size = size
+                    zinfo.compress_size = compress_size
+                    self._append_compressed(zinfo, tmp_path)
+                    os.remove(tmp_path)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _append_compressed(self, zinfo, data_path):
+        """Grava no ZIP um membro cujos dados já estão comprimidos
+
+        O zipfile não oferece API pública para isso; os passos abaixo são os
+        mesmos de ZipFile.open(..., 'w'), mas com CRC e tamanhos já conhecidos,
+        o que dispensa reescrever o cabeçalho local depois dos dados. Só é
+        chamado quando raw_append_supported(self._zip) é verdadeiro.
+        """
+        zf = self._zip
+        if zf._writing:
+            raise ValueError("Há um membro aberto para escrita neste ZIP")
+        zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(zip64))
+        with open(data_path, 'rb') as src:
+            shutil.copyfileobj(src, zf.fp, self.chunk_size)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+
+
+def zip_files(zip_path, members, codec='deflate', level=None, workers=None, desc="Compactando arquivo"):
+    """Cria um ZIP com os arquivos informados; members é uma lista de (caminho, nome_no_zip)"""
+    with ArchiveWriter(zip_path, codec, level, workers, desc=desc) as archive:
+        archive.add_files(members)
+    return str(zip_path)
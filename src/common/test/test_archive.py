@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+from common import archive
+from common.archive import ArchiveWriter, parse_codec, raw_append_supported, zip_files
+
+
+class TestArchiveWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = []
+        for index in range(3):
+            path = os.path.join(self.tmp_dir, f"arquivo_{index}.csv")
+            with open(path, 'wb') as f:
+                f.write((f"linha;{index};" * 5000 + "\n").encode() * 50 + os.urandom(1000))
+            self.files.append((path, os.path.basename(path)))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _assert_contents(self, zip_path, compress_type):
+        with zipfile.ZipFile(zip_path) as zipf:
+            self.assertIsNone(zipf.testzip())
+            self.assertEqual(zipf.namelist(), [arcname for _, arcname in self.files])
+            for path, arcname in self.files:
+                with open(path, 'rb') as f:
+                    self.assertEqual(zipf.read(arcname), f.read())
+                self.assertEqual(zipf.getinfo(arcname).compress_type, compress_type)
+
+    def test_parallel_deflate(self):
+        """Testa a compressão paralela dos membros com deflate"""
+        zip_path = os.path.join(self.tmp_dir, "paralelo.zip")
+        zip_files(zip_path, self.files, codec="deflate:9", workers=3)
+        self._assert_contents(zip_path, zipfile.ZIP_DEFLATED)
+        self.assertLess(os.path.getsize(zip_path), sum(os.path.getsize(p) for p, _ in self.files))
+
+    def test_serial_fallback_without_zipfile_internals(self):
+        """Testa a compressão em série quando a versão do Python não é coberta"""
+        with zipfile.ZipFile(os.path.join(self.tmp_dir, "versao.zip"), 'w') as zipf:
+            self.assertTrue(raw_append_supported(zipf))
+            with patch.object(archive, 'RAW_APPEND_VERSIONS', ((3, 0), (3, 1))):
+                self.assertFalse(raw_append_supported(zipf))
+
+        zip_path = os.path.join(self.tmp_dir, "serie.zip")
+        with patch.object(archive, 'RAW_APPEND_ATTRS', archive.RAW_APPEND_ATTRS + ('_inexistente',)), \
+                patch.object(ArchiveWriter, '_append_compressed', side_effect=AssertionError("API interna")):
+            zip_files(zip_path, self.files, codec="deflate:9", workers=3)
+        self._assert_contents(zip_path, zipfile.ZIP_DEFLATED)
+
+    def test_stored_and_lzma(self):
+        """Testa os codecs sem compressão e lzma, gravados em streaming"""
+        for codec, compress_type in (("stored", zipfile.ZIP_STORED), ("lzma", zipfile.ZIP_LZMA)):
+            zip_path = os.path.join(self.tmp_dir, f"{codec}.zip")
+            zip_files(zip_path, self.files, codec=codec)
+            self._assert_contents(zip_path, compress_type)
+
+    def test_open_member_streaming(self):
+        """Testa a escrita de um membro em streaming, sem arquivo intermediário"""
+        zip_path = os.path.join(self.tmp_dir, "stream.zip")
+        with ArchiveWriter(zip_path) as archive:
+            with archive.open_member("dados.csv") as member:
+                for index in range(100):
+                    member.write(f"{index};valor\n".encode())
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            self.assertEqual(zipf.read("dados.csv").decode().splitlines()[99], "99;valor")
+
+    def test_failure_removes_partial_zip(self):
+        """Testa se um ZIP incompleto é removido quando ocorre um erro"""
+        zip_path = os.path.join(self.tmp_dir, "falha.zip")
+        with self.assertRaises(FileNotFoundError):
+            zip_files(zip_path, self.files + [("inexistente.csv", "inexistente.csv")])
+        self.assertFalse(os.path.exists(zip_path))
+
+    def test_parse_codec(self):
+        """Testa a leitura da especificação de codec"""
+        self.assertEqual(parse_codec("deflate:9"), ("deflate", 9))
+        self.assertEqual(parse_codec("stored"), ("stored", None))
+        with self.assertRaises(ValueError):
+            parse_codec("rar")
+
+
+if __name__ == "__main__":
+    unittest.main()
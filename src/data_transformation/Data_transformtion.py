@@ -1,19 +1,126 @@
+import io
 import os
+import re
+import numpy as np
 import pandas as pd
 import pdfplumber
-import zipfile
 from pathlib import Path
-from datetime import datetime
 from loguru import logger as log
 from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+# Permite importar os módulos do projeto também quando executado como script
+SRC_DIR = Path(__file__).resolve().parent.parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from common.archive import ArchiveWriter, timestamped_zip_path, zip_files
+from data_transformation.columnar import COLUMNS, open_writer
+from data_transformation.instrumentation import StreamTimings
+from data_transformation.layout_template import LayoutTemplate, find_page_table
+from data_transformation.page_cache import PageCache
+from data_transformation.release_diff import (
+    DatabaseSink, changeset_path, compute_changeset, load_previous_release
+)
+
+# Configurações aprimoradas para extração de tabelas
+TABLE_SETTINGS = {
+    'vertical_strategy': 'lines',
+    'horizontal_strategy': 'lines',
+    'snap_tolerance': 5,
+    'join_tolerance': 10,
+    'edge_min_length': 15,
+    'text_x_tolerance': 2,
+    'text_y_tolerance': 2
+}
+
+# Linhas da legenda que aparecem na primeira coluna ao final das tabelas
+LEGEND_PATTERN = re.compile(r'Legenda:|OD:|AMB:|HCO:|HSO:|REF:|PAC:|DUT:')
+
+
+def normalize_column(series):
+    """Normaliza uma coluna com operações .str vetorizadas: espaços, quebras de linha e nulos"""
+    text = series.astype('string').str.strip().str.replace('\n', ' ', regex=False)
+    return text.mask(text.isin(['nan', 'None']), '').fillna('')
+
+
+def extract_page_range(pdf_path, start, end, table_settings=None):
+    """Extrai as tabelas de um intervalo de páginas [start, end) em um processo do pool
+
+    Cada worker abre o PDF por conta própria, já que os objetos do pdfplumber
+    não podem ser compartilhados entre processos. Retorna uma lista com a
+    tabela (ou None) de cada página, na ordem das páginas.
+    """
+    return [table for table, _ in extract_page_range_timed(pdf_path, start, end, table_settings)]
+
+
+def extract_page_range_timed(pdf_path, start, end, table_settings=None, template=None):
+    """Como extract_page_range, mas com o tempo de extração de cada página: [(tabela, segundos)]
+
+    Com template (LayoutTemplate), as páginas que seguem a grade aprendida são
+    extraídas por ela, e as demais com a detecção completa.
+    """
+    settings = table_settings or TABLE_SETTINGS
+    with pdfplumber.open(pdf_path) as pdf:
+        return [timed_extract(page, settings, template) for page in pdf.pages[start:end]]
+
+
+def timed_extract(page, settings, template=None):
+    start = time.perf_counter()
+    table = template.extract(page) if template is not None else None
+    if table is None:
+        table = page.extract_table(settings)
+    return table, time.perf_counter() - start
+
 
 class ANSDataTransformer:
-    def __init__(self, pdf_path):
-        """Inicializa o transformador com o caminho do PDF"""
+    def __init__(self, pdf_path, workers=1, pages_per_task=8, cache_dir=None,
+                 cache_max_bytes=256 * 1024 * 1024, columnar_formats=(), partition_by=None,
+                 codec='deflate', keep_csv=True, database_url=None, instrumentation=None,
+                 layout_template=False, template_sample_pages=3):
+        """Inicializa o transformador com o caminho do PDF
+
+        workers define quantos processos são usados na extração das páginas
+        (1 mantém a extração serial, None usa todos os núcleos disponíveis) e
+        pages_per_task quantas páginas cada tarefa do pool processa. Com
+        cache_dir, as tabelas de cada página ficam em cache no disco e só as
+        páginas ausentes do cache são extraídas novamente. columnar_formats
+        lista saídas adicionais ao CSV ('parquet', 'arrow'), e partition_by
+        agrupa os row groups do Parquet por uma coluna, como 'CAPITULO'.
+        codec define a compressão do ZIP ('deflate', 'deflate:9', 'stored',
+        ...) e, com keep_csv=False, o modo streaming grava o CSV direto dentro
+        do ZIP, sem o arquivo descompactado. Com database_url, o modo
+        incremental aplica as alterações de cada versão à tabela
+        rol_procedimentos desse banco. instrumentation recebe um
+        RunInstrumentation que mede cada etapa de process e cada página extraída.
+        Com layout_template=True, a grade de colunas é aprendida nas primeiras
+        template_sample_pages páginas com tabela e as demais páginas são
+        extraídas por ela (LayoutTemplate), com a detecção completa apenas nas
+        páginas que não seguem a grade.
+        """
         self.pdf_path = str(Path(pdf_path).absolute())
         self.output_dir = str(Path(__file__).parent.parent / "output")
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task)
+        # Processa apenas a partir da página 3 (índice 2)
+        self.first_page = 2
+        self.last_page = None
+        self.cache = PageCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.columnar_formats = tuple(columnar_formats)
+        self.partition_by = partition_by
+        self.codec = codec
+        self.keep_csv = keep_csv
+        self.database_url = database_url
+        self.instrumentation = instrumentation
+        self.layout_template = layout_template
+        self.template_sample_pages = max(1, template_sample_pages)
+        self.template = None
         self.column_mapping = {
             'OD': 'Seg. Odontológica',
             'AMB': 'Seg. Ambulatorial',
@@ -37,35 +144,9 @@ class ANSDataTransformer:
         all_tables = []
         
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                with logging_redirect_tqdm():
-                    # Processa apenas a partir da página 3 (índice 2)
-                    for page in tqdm(pdf.pages[2:], desc="Extraindo páginas", unit="página"):
-                        # Configurações aprimoradas para extração de tabelas
-                        table_settings = {
-                            'vertical_strategy': 'lines',
-                            'horizontal_strategy': 'lines',
-                            'snap_tolerance': 5,
-                            'join_tolerance': 10,
-                            'edge_min_length': 15,
-                            'text_x_tolerance': 2,
-                            'text_y_tolerance': 2
-                        }
-                        
-                        table = page.extract_table(table_settings)
-                        
-                        if table:
-                            # Filtra cabeçalhos repetidos e linhas de legenda
-                            if "PROCEDIMENTO" in table[0][0]:
-                                header = table[0]
-                                all_tables.append(header)
-                                all_tables.extend(table[1:])
-                            else:
-                                all_tables.extend(table)
-                            
-                            # Adiciona uma linha vazia após cada página
-                            empty_row = [''] * len(table[0])
-                            all_tables.append(empty_row)
+            with logging_redirect_tqdm():
+                for table in self._iter_page_tables():
+                    self._append_page_table(all_tables, table)
             
             if len(all_tables) > 0:
                 log.success(f"Extraídas {len(all_tables)-1} linhas de dados")
@@ -77,6 +158,179 @@ class ANSDataTransformer:
         except Exception as e:
             log.error(f"Erro ao extrair tabelas do PDF: {str(e)}")
             return None
+
+    def _page_bounds(self):
+        """Retorna o intervalo [início, fim) de páginas a serem processadas"""
+        with pdfplumber.open(self.pdf_path) as pdf:
+            total = len(pdf.pages)
+        end = total if self.last_page is None else min(self.last_page, total)
+        return self.first_page, max(self.first_page, end)
+
+    def _iter_page_tables(self):
+        """Gera a tabela de cada página, em ordem, reaproveitando o cache quando possível"""
+        start, end = self._page_bounds()
+        pages = range(start, end)
+
+        sampled = {}
+        if self.layout_template and self.template is None:
+            # A grade do template faz parte da chave do cache, então é aprendida
+            # antes da consulta, sempre nas primeiras páginas do intervalo
+            sampled = self._learn_template(pages)
+        settings = self._cache_settings()
+
+        if self.cache is None:
+            missing = [index for index in pages if index not in sampled]
+        else:
+            pdf_digest = PageCache.file_digest(self.pdf_path)
+            missing = [
+                index for index in pages
+                if index not in sampled and not self.cache.contains(pdf_digest, index, settings)
+            ]
+            log.info(f"Cache de páginas: {len(pages) - len(missing) - len(sampled)} em cache, "
+                     f"{len(missing) + len(sampled)} a extrair")
+
+        if self.workers > 1 and len(missing) > 1:
+            extracted = self._extract_pages_parallel(missing)
+        else:
+            extracted = self._extract_pages_serial(missing)
+
+        missing_set = set(missing)
+        for index in pages:
+            if index in sampled or index in missing_set:
+                table, seconds = sampled.pop(index) if index in sampled else next(extracted)
+                if self.cache is not None:
+                    self.cache.put(pdf_digest, index, settings, table)
+                self._record_page(index, table, seconds, "extraida")
+                yield table
+                continue
+
+            start = time.perf_counter()
+            hit, table = self.cache.get(pdf_digest, index, settings)
+            if not hit:
+                # Entrada removida entre a verificação e a leitura
+                table, seconds = extract_page_range_timed(
+                    self.pdf_path, index, index + 1, template=self.template
+                )[0]
+                self.cache.put(pdf_digest, index, settings, table)
+                self._record_page(index, table, seconds, "extraida")
+            else:
+                self._record_page(index, table, time.perf_counter() - start, "cache")
+            yield table
+
+    def _cache_settings(self):
+        """Configurações que identificam as páginas no cache
+
+        Com o template, a grade aprendida entra junto com as configurações do
+        pdfplumber: as páginas extraídas por ela não se misturam com as da
+        detecção completa nem com as de outra grade.
+        """
+        if self.template is None:
+            return TABLE_SETTINGS
+        return {**TABLE_SETTINGS, 'layout_template': self.template.columns,
+                'template_tolerance': self.template.tolerance}
+
+    def _record_page(self, index, table, seconds, source):
+        if self.instrumentation is not None:
+            self.instrumentation.page(index, seconds, len(table) if table else 0, source)
+
+    def _stage(self, name):
+        """Contexto de medição de uma etapa; sem instrumentação, não mede nada"""
+        if self.instrumentation is None:
+            return nullcontext({})
+        return self.instrumentation.stage(name)
+
+    def _streaming_stage(self, name):
+        """Como _stage, para os blocos do modo streaming; retorna o StreamTimings das etapas intercaladas"""
+        if self.instrumentation is None:
+            return nullcontext(StreamTimings())
+        return self.instrumentation.streaming_stage(name)
+
+    def _extract_pages_serial(self, indices):
+        """Gera (tabela, segundos) de cada página informada, em ordem, no processo atual"""
+        if not indices:
+            return
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for index in tqdm(indices, desc="Extraindo páginas", unit="página"):
+                yield timed_extract(pdf.pages[index], TABLE_SETTINGS, self.template)
+
+    def _learn_template(self, indices):
+        """Aprende o template nas páginas de amostra, com a detecção completa
+
+        Percorre as páginas até encontrar template_sample_pages tabelas e
+        retorna {índice: (tabela, segundos)} das páginas percorridas. Se as
+        amostras discordarem, o template fica em None e todas as páginas
+        usam a detecção completa.
+        """
+        samples = []
+        sampled = {}
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for index in indices:
+                if len(samples) >= self.template_sample_pages:
+                    break
+                start = time.perf_counter()
+                table, columns = find_page_table(pdf.pages[index], TABLE_SETTINGS)
+                if columns is not None:
+                    samples.append(columns)
+                sampled[index] = (table, time.perf_counter() - start)
+
+        self.template = LayoutTemplate.learn(samples, TABLE_SETTINGS)
+        if self.template is not None:
+            log.info(f"Template de layout aprendido em {len(samples)} páginas: "
+                     f"{len(self.template.columns) - 1} colunas")
+        elif samples:
+            log.warning("Páginas de amostra com grades diferentes; usando a detecção completa")
+        return sampled
+
+    def _page_ranges(self, indices):
+        """Agrupa índices crescentes em intervalos contíguos de até pages_per_task páginas"""
+        ranges = []
+        for index in indices:
+            if ranges and ranges[-1][1] == index and ranges[-1][1] - ranges[-1][0] < self.pages_per_task:
+                ranges[-1][1] = index + 1
+            else:
+                ranges.append([index, index + 1])
+        return ranges
+
+    def _extract_pages_parallel(self, indices):
+        """Gera (tabela, segundos) de cada página informada, em ordem, distribuindo intervalos entre processos"""
+        ranges = self._page_ranges(indices)
+        log.info(f"Extraindo {len(indices)} páginas com {self.workers} processos")
+
+        # Limita as tarefas em andamento para que só alguns intervalos já
+        # extraídos fiquem em memória aguardando consumo
+        max_pending = self.workers * 2
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            with tqdm(total=len(indices), desc="Extraindo páginas", unit="página") as pbar:
+                for first, last in ranges:
+                    pending.append(executor.submit(
+                        extract_page_range_timed, self.pdf_path, first, last, TABLE_SETTINGS, self.template
+                    ))
+                    if len(pending) >= max_pending:
+                        tables = pending.popleft().result()
+                        pbar.update(len(tables))
+                        yield from tables
+                # Consome os resultados na ordem das páginas, não na ordem de término
+                while pending:
+                    tables = pending.popleft().result()
+                    pbar.update(len(tables))
+                    yield from tables
+
+    def _append_page_table(self, all_tables, table):
+        """Acrescenta a tabela de uma página ao resultado acumulado"""
+        if table:
+            # Filtra cabeçalhos repetidos e linhas de legenda
+            if "PROCEDIMENTO" in table[0][0]:
+                header = table[0]
+                all_tables.append(header)
+                all_tables.extend(table[1:])
+            else:
+                all_tables.extend(table)
+            
+            # Adiciona uma linha vazia após cada página
+            empty_row = [''] * len(table[0])
+            all_tables.append(empty_row)
+
     def clean_and_transform_data(self, raw_data):
         """Limpa e transforma os dados extraídos"""
         log.info("Iniciando transformação dos dados")
@@ -90,39 +344,7 @@ class ANSDataTransformer:
             
             # Limpeza dos dados
             with logging_redirect_tqdm():
-                # Remove linhas completamente vazias
-                df = df.dropna(how='all')
-                
-                # Limpeza de strings e tratamento de multilinha
-                for col in tqdm(df.columns, desc="Limpando colunas", leave=False):
-                    df[col] = df[col].astype(str).str.strip().str.replace('\n', ' ')
-                    df[col] = df[col].replace({'nan': '', 'None': ''})
-                
-                # Remove linhas com elementos da legenda
-                df = df[~df.iloc[:, 0].str.contains('Legenda:|OD:|AMB:|HCO:|HSO:|REF:|PAC:|DUT:', na=False)]
-                
-                # Remove colunas vazias
-                df = df.dropna(axis=1, how='all')
-                
-                # Renomeia colunas conforme estrutura conhecida
-                df.columns = [
-                    'PROCEDIMENTO', 
-                    'RN_ALTERACAO', 
-                    'VIGENCIA', 
-                    'OD', 
-                    'AMB', 
-                    'HCO', 
-                    'HSO', 
-                    'REF', 
-                    'PAC', 
-                    'DUT', 
-                    'SUBGRUPO', 
-                    'GRUPO', 
-                    'CAPITULO'
-                ]
-                
-                # Substitui abreviações
-                df = self._replace_abbreviations(df)
+                df = self._clean_frame(df, progress=True)
             
             log.success(f"Dados transformados com sucesso. Shape final: {df.shape}")
             return df
@@ -131,13 +353,80 @@ class ANSDataTransformer:
             log.error(f"Erro ao transformar dados: {str(e)}")
             return None
 
+    def _clean_frame(self, df, progress=False):
+        """Aplica a limpeza linha a linha a um DataFrame com o cabeçalho original
+
+        Todas as etapas dependem apenas da própria linha, por isso o mesmo
+        método serve tanto para o documento inteiro quanto para cada bloco do
+        modo streaming, produzindo exatamente o mesmo resultado.
+        """
+        # Remove linhas completamente vazias
+        df = df.dropna(how='all')
+        
+        # Limpeza de strings e tratamento de multilinha
+        positions = range(df.shape[1])
+        if progress:
+            positions = tqdm(positions, desc="Limpando colunas", leave=False)
+        cleaned = pd.DataFrame({pos: normalize_column(df.iloc[:, pos]) for pos in positions}, index=df.index)
+        cleaned.columns = df.columns
+        
+        # Remove linhas com elementos da legenda
+        if len(cleaned.columns):
+            cleaned = cleaned[~cleaned.iloc[:, 0].str.contains(LEGEND_PATTERN, regex=True)]
+        df = cleaned
+        
+        # Renomeia colunas conforme estrutura conhecida
+        df.columns = list(COLUMNS)
+        
+        # Substitui abreviações
+        return self._replace_abbreviations(df)
+
+    def iter_raw_chunks(self, pages_per_chunk=1):
+        """Gera blocos de linhas brutas com as tabelas de pages_per_chunk páginas
+
+        A primeira linha do primeiro bloco é o cabeçalho do documento, como em
+        extract_tables_from_pdf. Apenas um bloco fica em memória por vez.
+        """
+        chunk = []
+        pages = 0
+        for table in self._iter_page_tables():
+            self._append_page_table(chunk, table)
+            pages += 1
+            if pages >= pages_per_chunk and chunk:
+                yield chunk
+                chunk = []
+                pages = 0
+        if chunk:
+            yield chunk
+
+    def iter_clean_chunks(self, pages_per_chunk=1, timings=None):
+        """Gera DataFrames já limpos, um por bloco de páginas
+
+        Com timings (StreamTimings), o tempo da extração e o da limpeza de
+        cada bloco são somados nas etapas extract_tables_from_pdf e
+        clean_and_transform_data, como no modo em lote.
+        """
+        if timings is None:
+            timings = StreamTimings()
+        header = None
+        for rows in timings.iterate("extract_tables_from_pdf", self.iter_raw_chunks(pages_per_chunk)):
+            if header is None:
+                header, rows = rows[0], rows[1:]
+            if rows:
+                with timings.measure("clean_and_transform_data"):
+                    frame = self._clean_frame(pd.DataFrame(rows, columns=header))
+                yield frame
+
     def _replace_abbreviations(self, df):
-        """Substitui as abreviações conforme a legenda"""
-        for col in self.column_mapping.keys():
+        """Substitui as abreviações conforme a legenda
+
+        As colunas de segmentação viram categóricas com apenas dois valores
+        possíveis: vazio ou a descrição da legenda, quando a célula contém 'X'.
+        """
+        for col, label in self.column_mapping.items():
             if col in df.columns:
-                df[col] = df[col].apply(
-                    lambda x: self.column_mapping[col] if str(x).strip() == 'X' else ''
-                )
+                marked = np.where(df[col].str.strip().eq('X').to_numpy(dtype=bool), 1, 0).astype(np.int8)
+                df[col] = pd.Categorical.from_codes(marked, categories=['', label])
         return df
 
     def save_to_csv(self, dataframe, filename="rol_procedimentos.csv"):
@@ -157,21 +446,125 @@ class ANSDataTransformer:
             log.error(f"Erro ao salvar CSV: {str(e)}")
             return None
 
+    def save_to_csv_stream(self, chunks, filename="rol_procedimentos.csv"):
+        """Salva os blocos de dados no CSV à medida que são gerados
+
+        O arquivo é o mesmo gerado por save_to_csv: separador ';', codificação
+        utf-8-sig e cabeçalho escrito uma única vez, no primeiro bloco.
+        """
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            csv_path = os.path.join(self.output_dir, filename)
+            
+            with logging_redirect_tqdm():
+                with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+                    rows = self._write_csv_chunks(f, tqdm(chunks, desc="Salvando CSV", unit="bloco"))
+            
+            if rows is None:
+                os.remove(csv_path)
+                raise ValueError("Dados insuficientes para transformação")
+            
+            log.success(f"CSV salvo em: {csv_path} ({rows} linhas)")
+            return csv_path
+        except Exception as e:
+            log.error(f"Erro ao salvar CSV: {str(e)}")
+            return None
+
+    def save_to_archive_stream(self, chunks, your_name, filename="rol_procedimentos.csv"):
+        """Grava os blocos de dados como CSV direto dentro do ZIP, sem arquivo intermediário"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            zip_path = timestamped_zip_path(self.output_dir, your_name)
+            
+            with logging_redirect_tqdm():
+                with ArchiveWriter(zip_path, self.codec) as archive:
+                    with tqdm(desc="Compactando CSV", unit='B', unit_scale=True) as pbar:
+                        member = io.BufferedWriter(archive.open_member(filename, pbar))
+                        with io.TextIOWrapper(member, encoding='utf-8-sig', newline='') as f:
+                            rows = self._write_csv_chunks(f, chunks)
+                    if rows is None:
+                        raise ValueError("Dados insuficientes para transformação")
+            
+            log.success(f"Arquivo compactado: {zip_path} ({rows} linhas)")
+            return zip_path
+        except Exception as e:
+            log.error(f"Erro ao compactar arquivo: {str(e)}")
+            return None
+
+    def _write_csv_chunks(self, f, chunks):
+        """Escreve os blocos no stream de texto; retorna o total de linhas ou None se não houver blocos"""
+        rows = None
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, sep=';', header=rows is None)
+            rows = (rows or 0) + len(chunk)
+        return rows
+
+    def open_columnar_writers(self, filename="rol_procedimentos.csv"):
+        """Abre um writer para cada formato colunar configurado"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        basename = os.path.splitext(filename)[0]
+        return [
+            open_writer(fmt, self.output_dir, basename, self.partition_by)
+            for fmt in self.columnar_formats
+        ]
+
+    def save_outputs(self, dataframe, filename="rol_procedimentos.csv"):
+        """Salva o CSV e as saídas colunares configuradas; retorna o caminho do CSV"""
+        csv_path = self.save_to_csv(dataframe, filename)
+        if csv_path is None or not self.columnar_formats:
+            return csv_path
+        
+        try:
+            for writer in self.open_columnar_writers(filename):
+                with writer:
+                    writer.write(dataframe)
+                log.success(f"Arquivo colunar salvo em: {writer.path}")
+            return csv_path
+        except Exception as e:
+            log.error(f"Erro ao salvar saídas colunares: {str(e)}")
+            return None
+
+    def save_outputs_stream(self, chunks, filename="rol_procedimentos.csv", your_name=None):
+        """Versão streaming de save_outputs: cada bloco vai para o CSV e para as saídas colunares
+
+        Com your_name, o CSV é gravado direto no ZIP e o caminho retornado é o do ZIP.
+        """
+        try:
+            writers = self.open_columnar_writers(filename)
+        except Exception as e:
+            log.error(f"Erro ao abrir saídas colunares: {str(e)}")
+            return None
+        
+        def tee(chunks):
+            for chunk in chunks:
+                for writer in writers:
+                    writer.write(chunk)
+                yield chunk
+        
+        try:
+            if your_name is None:
+                path = self.save_to_csv_stream(tee(chunks), filename)
+            else:
+                path = self.save_to_archive_stream(tee(chunks), your_name, filename)
+        finally:
+            for writer in writers:
+                writer.close()
+        
+        if path is not None:
+            for writer in writers:
+                log.success(f"Arquivo colunar salvo em: {writer.path} ({writer.rows} linhas)")
+        return path
+
     def compress_csv(self, csv_path, your_name):
         """Compacta o arquivo CSV em um ZIP"""
         try:
             if not os.path.exists(csv_path):
                 raise FileNotFoundError(f"Arquivo CSV não encontrado: {csv_path}")
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            zip_filename = f"Teste_{your_name}_{timestamp}.zip"
-            zip_path = os.path.join(self.output_dir, zip_filename)
+            zip_path = timestamped_zip_path(self.output_dir, your_name)
             
             with logging_redirect_tqdm():
-                with tqdm(total=100, desc="Compactando arquivo") as pbar:
-                    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                        zipf.write(csv_path, arcname=os.path.basename(csv_path))
-                    pbar.update(100)
+                zip_files(zip_path, [(csv_path, os.path.basename(csv_path))], codec=self.codec)
             
             log.success(f"Arquivo compactado: {zip_path}")
             return zip_path
@@ -179,30 +572,129 @@ class ANSDataTransformer:
             log.error(f"Erro ao compactar arquivo: {str(e)}")
             return None
 
-    def process(self, your_name):
-        """Executa todo o fluxo de transformação"""
+    def diff_with_previous(self, dataframe, filename="rol_procedimentos.csv"):
+        """Compara os dados com o CSV da execução anterior e registra o Changeset"""
+        try:
+            previous = load_previous_release(os.path.join(self.output_dir, filename))
+            if previous is None:
+                log.info("Nenhuma versão anterior encontrada; todas as linhas são novas")
+                previous = pd.DataFrame(columns=COLUMNS)
+            
+            changeset = compute_changeset(previous, dataframe)
+            log.info(f"Alterações em relação à versão anterior: {changeset.summary()}")
+            if not changeset.empty:
+                path = changeset.save(changeset_path(self.output_dir))
+                log.success(f"Changeset salvo em: {path}")
+            return changeset
+        except Exception as e:
+            log.error(f"Erro ao comparar com a versão anterior: {str(e)}")
+            return None
+
+    def apply_changeset_to_database(self, changeset, dataframe, full_load=False):
+        """Aplica apenas as linhas alteradas ao banco configurado em database_url
+
+        Com a tabela vazia (primeira carga) ou com full_load (sem versão
+        anterior para comparar), grava a versão inteira em vez do delta.
+        """
+        if self.database_url is None:
+            return True
+        try:
+            sink = DatabaseSink(self.database_url)
+            if full_load or sink.is_empty():
+                sink.replace(dataframe)
+            elif not changeset.empty:
+                sink.apply(changeset)
+            return True
+        except Exception as e:
+            log.error(f"Erro ao atualizar o banco de dados: {str(e)}")
+            return False
+
+    def process(self, your_name, streaming=False, incremental=False):
+        """Executa todo o fluxo de transformação
+
+        Com streaming=True, extração, limpeza e escrita do CSV acontecem página
+        a página, e o uso de memória depende do tamanho da página e não do
+        tamanho do documento.
+
+        Com incremental=True (apenas no modo em lote), os dados são comparados
+        com o CSV da execução anterior: sem alterações, CSV, saídas colunares e
+        ZIP não são gerados novamente; com alterações, o Changeset é salvo em
+        output/changesets e só as linhas alteradas são aplicadas ao banco. O
+        banco é atualizado antes dos artefatos: se a transação falhar, o CSV
+        anterior continua sendo a base da próxima comparação e o mesmo delta
+        é aplicado na execução seguinte.
+        """
         log.info("Iniciando processo de transformação de dados")
         
         logging.basicConfig(handlers=[logging.StreamHandler()], level=logging.INFO)
         
         with logging_redirect_tqdm():
             with tqdm(total=4, desc="Processo completo") as main_pbar:
-                raw_data = self.extract_tables_from_pdf()
+                # No modo streaming, extração, limpeza e escrita se intercalam: as
+                # duas primeiras são medidas nos geradores e relatadas à parte
+                if streaming and not self.keep_csv:
+                    with self._streaming_stage("save_outputs_stream") as timings:
+                        zip_path = self.save_outputs_stream(
+                            self.iter_clean_chunks(timings=timings), your_name=your_name
+                        )
+                    if zip_path is None:
+                        return False
+                    main_pbar.update(4)
+                    
+                    return True
+                
+                if streaming:
+                    with self._streaming_stage("save_outputs_stream") as timings:
+                        csv_path = self.save_outputs_stream(self.iter_clean_chunks(timings=timings))
+                    if csv_path is None:
+                        return False
+                    main_pbar.update(3)
+                    
+                    with self._stage("compress_csv"):
+                        zip_path = self.compress_csv(csv_path, your_name)
+                    if zip_path is None:
+                        return False
+                    main_pbar.update(1)
+                    
+                    return True
+                
+                with self._stage("extract_tables_from_pdf") as stage:
+                    raw_data = self.extract_tables_from_pdf()
+                    stage["linhas"] = len(raw_data) - 1 if raw_data else 0
                 if raw_data is None:
                     return False
                 main_pbar.update(1)
                 
-                df = self.clean_and_transform_data(raw_data)
+                with self._stage("clean_and_transform_data") as stage:
+                    df = self.clean_and_transform_data(raw_data)
+                    stage["linhas"] = 0 if df is None else len(df)
                 if df is None or df.empty:
                     return False
                 main_pbar.update(1)
                 
-                csv_path = self.save_to_csv(df)
+                if incremental:
+                    has_previous = os.path.exists(os.path.join(self.output_dir, "rol_procedimentos.csv"))
+                    with self._stage("diff_with_previous"):
+                        changeset = self.diff_with_previous(df)
+                    if changeset is None:
+                        return False
+                    with self._stage("apply_changeset_to_database"):
+                        if not self.apply_changeset_to_database(changeset, df, full_load=not has_previous):
+                            return False
+                    if changeset.empty:
+                        log.info("Nenhuma alteração desde a última execução; artefatos mantidos")
+                        main_pbar.update(2)
+                        return True
+                
+                with self._stage("save_outputs") as stage:
+                    csv_path = self.save_outputs(df)
+                    stage["linhas"] = len(df)
                 if csv_path is None:
                     return False
                 main_pbar.update(1)
                 
-                zip_path = self.compress_csv(csv_path, your_name)
+                with self._stage("compress_csv"):
+                    zip_path = self.compress_csv(csv_path, your_name)
                 if zip_path is None:
                     return False
                 main_pbar.update(1)
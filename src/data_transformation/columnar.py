@@ -0,0 +1,199 @@
+import os
+from abc import ABC, abstractmethod
+import pandas as pd
+from loguru import logger as log
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # Dependência opcional, necessária apenas para as saídas colunares
+    pa = None
+
+COLUMNS = [
+    'PROCEDIMENTO',
+    'RN_ALTERACAO',
+    'VIGENCIA',
+    'OD',
+    'AMB',
+    'HCO',
+    'HSO',
+    'REF',
+    'PAC',
+    'DUT',
+    'SUBGRUPO',
+    'GRUPO',
+    'CAPITULO'
+]
+
+# Colunas com poucos valores distintos, gravadas com codificação de dicionário
+DICTIONARY_COLUMNS = [
+    'VIGENCIA', 'OD', 'AMB', 'HCO', 'HSO', 'REF', 'PAC', 'DUT',
+    'SUBGRUPO', 'GRUPO', 'CAPITULO'
+]
+
+
+def pyarrow_available():
+    return pa is not None
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "As saídas Parquet/Arrow precisam do pyarrow. Instale com: pip install pyarrow"
+        )
+
+
+def rol_schema():
+    """Esquema fixo das saídas colunares, igual em todas as execuções"""
+    require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        pa.field(col, dictionary if col in DICTIONARY_COLUMNS else pa.string(), nullable=False)
+        for col in COLUMNS
+    ])
+
+
+class ColumnarWriter(ABC):
+    """Base das saídas colunares: recebe DataFrames limpos e grava incrementalmente
+
+    Pode ser usada com o DataFrame completo ou com os blocos do modo streaming.
+    """
+
+    extension = None
+
+    def __init__(self, path):
+        require_pyarrow()
+        self.path = str(path)
+        self.schema = rol_schema()
+        self.rows = 0
+
+    def _encode(self, df, dictionaries=None):
+        """Converte um DataFrame limpo em uma tabela Arrow com o esquema fixo
+
+        Com dictionaries (um dict valor -> código por coluna), os dicionários
+        crescem entre chamadas e os códigos já emitidos continuam válidos.
+        """
+        arrays = []
+        for col in COLUMNS:
+            values = df[col].astype(str).tolist()
+            if col not in DICTIONARY_COLUMNS:
+                arrays.append(pa.array(values, type=pa.string()))
+                continue
+
+            mapping = dictionaries[col] if dictionaries is not None else {}
+            indices = [mapping.setdefault(value, len(mapping)) for value in values]
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(indices, type=pa.int32()),
+                pa.array(list(mapping), type=pa.string())
+            ))
+        return pa.Table.from_arrays(arrays, schema=self.schema)
+
+    @abstractmethod
+    def write(self, df):
+        """Acrescenta as linhas de um DataFrame limpo à saída"""
+
+    @abstractmethod
+    def close(self):
+        """Grava o que estiver pendente e fecha o arquivo"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetOutput(ColumnarWriter):
+    """Grava o Rol em Parquet, opcionalmente com um row group por valor de partition_by
+
+    Com partition_by, as linhas ficam agrupadas pelo valor da coluna, mantendo
+    a ordem original dentro de cada grupo. As linhas são acumuladas por valor
+    e só viram um row group ao chegar a row_group_size linhas ou no close: no
+    modo streaming, cada bloco tem só uma página, e gravar um row group por
+    página e capítulo deixaria o arquivo maior que o próprio CSV.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path, partition_by=None, compression='zstd', row_group_size=100_000):
+        super().__init__(path)
+        self.partition_by = partition_by
+        self.row_group_size = row_group_size
+        self._writer = pq.ParquetWriter(self.path, self.schema, compression=compression)
+        # Blocos pendentes por valor de partition_by, na ordem em que apareceram
+        self._pending = {}
+
+    def write(self, df):
+        if self.partition_by:
+            # Cada valor (por exemplo, cada capítulo) vira um row group próprio,
+            # o que permite ler um capítulo sem descompactar o arquivo inteiro
+            keys = df[self.partition_by].astype(str).to_numpy()
+            for key, group in df.groupby(keys, sort=False):
+                self._buffer(key, group)
+        elif len(df):
+            self._buffer(None, df)
+        self.rows += len(df)
+
+    def _buffer(self, key, df):
+        chunks = self._pending.setdefault(key, [])
+        chunks.append(df)
+        if sum(len(chunk) for chunk in chunks) >= self.row_group_size:
+            self._flush(key)
+
+    def _flush(self, key):
+        chunks = self._pending.pop(key)
+        self._writer.write_table(self._encode(pd.concat(chunks)), row_group_size=self.row_group_size)
+
+    def close(self):
+        if self._writer is not None:
+            for key in list(self._pending):
+                self._flush(key)
+            self._writer.close()
+            self._writer = None
+
+
+class ArrowOutput(ColumnarWriter):
+    """Grava o Rol no formato de arquivo Arrow IPC"""
+
+    extension = "arrow"
+
+    def __init__(self, path):
+        super().__init__(path)
+        # O formato de arquivo IPC só aceita dicionários que crescem entre
+        # lotes (deltas), por isso os mesmos dicionários são reaproveitados
+        self._dictionaries = {col: {} for col in DICTIONARY_COLUMNS}
+        options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        self._sink = pa.OSFile(self.path, 'wb')
+        self._writer = ipc.new_file(self._sink, self.schema, options=options)
+
+    def write(self, df):
+        if len(df):
+            self._writer.write_table(self._encode(df, self._dictionaries))
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+
+
+OUTPUT_FORMATS = {
+    'parquet': ParquetOutput,
+    'arrow': ArrowOutput,
+}
+
+
+def open_writer(fmt, output_dir, basename, partition_by=None):
+    """Cria o writer do formato informado dentro de output_dir"""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Formato de saída desconhecido: {fmt}. Opções: {', '.join(OUTPUT_FORMATS)}")
+    writer_class = OUTPUT_FORMATS[fmt]
+    path = os.path.join(output_dir, f"{basename}.{writer_class.extension}")
+    if writer_class is ParquetOutput:
+        writer = writer_class(path, partition_by=partition_by)
+    else:
+        writer = writer_class(path)
+    log.debug(f"Saída {fmt} aberta em: {path}")
+    return writer
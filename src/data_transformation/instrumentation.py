@@ -0,0 +1,241 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_MODES = ('cpu', 'memory')
+# Limites (em segundos) do histograma de tempo de extração por página
+PAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def peak_rss_bytes():
+    """Pico de memória residente do processo até agora, ou None sem o módulo resource"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Em KB no Linux, em bytes no macOS
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def cpu_seconds():
+    """Tempo de CPU do processo e dos processos filhos já encerrados (workers do pool)"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def top_functions(profiler, limit):
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "funcao": f"{Path(filename).name}:{line}({name})", "chamadas": calls,
+            "tempo_proprio": round(own, 6), "tempo_acumulado": round(cumulative, 6),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def top_allocations(snapshot, limit):
+    return [
+        {"origem": str(stat.traceback[0]), "bytes": stat.size, "blocos": stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+class StreamTimings:
+    """Tempos acumulados por etapa quando as etapas se intercalam, como no modo streaming
+
+    Cada bloco medido com measure (ou cada item gerado por iterate) soma o
+    tempo de relógio e de CPU na etapa informada.
+    """
+
+    def __init__(self):
+        self.totals = {}
+
+    @contextmanager
+    def measure(self, name):
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield
+        finally:
+            total = self.totals.setdefault(name, {"segundos": 0.0, "cpu_segundos": 0.0})
+            total["segundos"] += time.perf_counter() - wall
+            total["cpu_segundos"] += cpu_seconds() - cpu
+
+    def iterate(self, name, iterable):
+        """Repassa os itens de iterable, somando em name o tempo gasto para produzir cada um"""
+        iterator = iter(iterable)
+        while True:
+            with self.measure(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+class RunInstrumentation:
+    def __init__(self, profile=None, profile_dir=None, top=20):
+        """Coleta tempos, memória e contagens de uma execução do ANSDataTransformer
+
+        Por etapa: tempo de relógio, tempo de CPU (incluindo os workers da
+        extração paralela) e memória; por página: tempo de extração, linhas e
+        origem (extraída ou cache). Sem profile='memory', a memória registrada
+        é o pico de RSS do processo até o fim da etapa (pico_rss_processo_bytes),
+        que inclui as etapas anteriores e nunca diminui.
+
+        profile='cpu' roda cada etapa sob o cProfile (só o processo principal)
+        e guarda as funções mais caras no relatório e os arquivos .prof em
+        profile_dir; profile='memory' usa o tracemalloc, com o pico de
+        alocações de cada etapa e as linhas que mais alocaram. Os dois modos
+        deixam a execução bem mais lenta.
+        """
+        if profile not in (None, *PROFILE_MODES):
+            raise ValueError(f"Modo de perfil inválido: {profile}")
+        self.profile = profile
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.top = top
+        self.started_at = datetime.now()
+        self.stages = []
+        self.pages = []
+
+    @contextmanager
+    def stage(self, name):
+        """Mede o bloco como uma etapa; o dict retornado recebe métricas extras, como 'linhas'"""
+        info = {"etapa": name}
+        profiler = None
+        if self.profile == 'cpu':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif self.profile == 'memory':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield info
+        finally:
+            info["segundos"] = time.perf_counter() - wall
+            info["cpu_segundos"] = cpu_seconds() - cpu
+            if profiler is not None:
+                profiler.disable()
+                info["funcoes"] = top_functions(profiler, self.top)
+                if self.profile_dir is not None:
+                    self.profile_dir.mkdir(parents=True, exist_ok=True)
+                    profiler.dump_stats(self.profile_dir / f"{name}.prof")
+            if self.profile == 'memory':
+                info["pico_memoria_bytes"] = tracemalloc.get_traced_memory()[1]
+                info["alocacoes"] = top_allocations(tracemalloc.take_snapshot(), self.top)
+            else:
+                info["pico_rss_processo_bytes"] = peak_rss_bytes()
+            self.stages.append(info)
+
+    @contextmanager
+    def streaming_stage(self, name):
+        """Mede um bloco em que outras etapas se intercalam com a etapa name
+
+        Retorna um StreamTimings: as etapas medidas nele (a extração e a
+        limpeza, dentro dos geradores do modo streaming) entram no relatório
+        como etapas próprias, e name fica com o restante do tempo do bloco (a
+        escrita). A memória do bloco inteiro fica registrada em name.
+        """
+        timings = StreamTimings()
+        with self.stage(name):
+            yield timings
+        info = self.stages.pop()
+        for part, totals in timings.totals.items():
+            self.stages.append({"etapa": part, **totals})
+            info["segundos"] -= totals["segundos"]
+            info["cpu_segundos"] -= totals["cpu_segundos"]
+        self.stages.append(info)
+
+    def page(self, index, seconds, rows, source):
+        """Registra uma página: índice (a partir de 0), tempo, linhas da tabela e origem"""
+        self.pages.append({"pagina": index + 1, "segundos": seconds, "linhas": rows, "origem": source})
+
+    def stop(self):
+        if self.profile == 'memory' and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self):
+        extracted = [page for page in self.pages if page["origem"] == "extraida"]
+        return {
+            "inicio": self.started_at.isoformat(timespec="seconds"),
+            "perfil": self.profile,
+            "total_segundos": sum(stage["segundos"] for stage in self.stages),
+            "etapas": self.stages,
+            "paginas": self.pages,
+            "resumo_paginas": {
+                "total": len(self.pages),
+                "extraidas": len(extracted),
+                "cache": len(self.pages) - len(extracted),
+                "linhas": sum(page["linhas"] for page in self.pages),
+                "mais_lentas": sorted(extracted, key=lambda page: page["segundos"], reverse=True)[:5],
+            },
+        }
+
+    def save_report(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def prometheus(self):
+        """Métricas da execução no formato texto do Prometheus"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        def by_stage(key):
+            return [({"stage": stage["etapa"]}, stage[key]) for stage in self.stages if stage.get(key) is not None]
+
+        metric("ans_pipeline_stage_seconds", "gauge", "Tempo de relógio de cada etapa.", by_stage("segundos"))
+        metric("ans_pipeline_stage_cpu_seconds", "gauge", "Tempo de CPU de cada etapa.", by_stage("cpu_segundos"))
+        metric("ans_pipeline_stage_peak_memory_bytes", "gauge", "Pico de memória alocada em cada etapa (tracemalloc).",
+               by_stage("pico_memoria_bytes"))
+        metric("ans_pipeline_process_peak_rss_bytes", "gauge",
+               "Pico de RSS do processo até o fim de cada etapa, acumulado desde o início.",
+               by_stage("pico_rss_processo_bytes"))
+        metric("ans_pipeline_stage_rows", "gauge", "Linhas produzidas por cada etapa.", by_stage("linhas"))
+
+        extracted = [page["segundos"] for page in self.pages if page["origem"] == "extraida"]
+        lines.append("# HELP ans_pipeline_page_extract_seconds Tempo de extração de cada página.")
+        lines.append("# TYPE ans_pipeline_page_extract_seconds histogram")
+        for bound in PAGE_BUCKETS:
+            count = sum(value <= bound for value in extracted)
+            lines.append(f'ans_pipeline_page_extract_seconds_bucket{{le="{bound}"}} {count}')
+        lines.append(f'ans_pipeline_page_extract_seconds_bucket{{le="+Inf"}} {len(extracted)}')
+        lines.append(f"ans_pipeline_page_extract_seconds_sum {sum(extracted)}")
+        lines.append(f"ans_pipeline_page_extract_seconds_count {len(extracted)}")
+
+        metric("ans_pipeline_pages", "gauge", "Páginas processadas, por origem.", [
+            ({"source": "extraida"}, len(extracted)), ({"source": "cache"}, len(self.pages) - len(extracted))
+        ])
+        metric("ans_pipeline_last_run_timestamp_seconds", "gauge", "Início da última execução.",
+               [({}, self.started_at.timestamp())])
+        return "\n".join(lines) + "\n"
+
+    def save_metrics(self, path):
+        """Grava as métricas de forma atômica, para o textfile collector ou o /metrics da API"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,115 @@
+import bisect
+from pdfplumber import utils
+from pdfplumber.table import TableSettings, merge_edges
+
+
+def column_boundaries(table):
+    """Posições x das linhas verticais de uma tabela detectada pelo pdfplumber, em ordem"""
+    return sorted({cell[0] for cell in table.cells} | {cell[2] for cell in table.cells})
+
+
+def find_page_table(page, settings):
+    """Extrai a tabela da página com a detecção completa: (tabela, limites das colunas)"""
+    tset = TableSettings.resolve(settings)
+    table = page.find_table(tset)
+    if table is None:
+        return None, None
+    return table.extract(**(tset.text_settings or {})), column_boundaries(table)
+
+
+class LayoutTemplate:
+    """Grade de colunas das tabelas do Rol, aprendida uma vez em páginas de amostra
+
+    O Anexo I repete a mesma grade de colunas em todas as páginas; só a
+    quantidade e a altura das linhas mudam. Com a grade conhecida, cada página
+    passa por uma verificação barata: as bordas da página, unidas como na
+    detecção do pdfplumber, precisam formar uma grade completa com exatamente
+    essas colunas, sem nenhuma outra borda. Nesse caso a detecção completa
+    encontraria as mesmas células, então os caracteres são distribuídos nelas
+    diretamente, por busca binária, em vez de percorrer todos os caracteres da
+    página para cada linha da tabela. Se a verificação falhar, extract retorna
+    None e a página deve ser extraída com a detecção completa.
+    """
+
+    def __init__(self, columns, settings, tolerance=1.0):
+        self.columns = list(columns)
+        self.settings = TableSettings.resolve(settings)
+        self.tolerance = tolerance
+
+    @classmethod
+    def learn(cls, samples, settings, tolerance=1.0):
+        """Cria o template a partir dos limites das colunas das páginas de amostra
+
+        Páginas sem tabela (None) são ignoradas. Retorna None se não houver
+        amostras ou se elas discordarem na quantidade ou na posição das colunas.
+        """
+        samples = [columns for columns in samples if columns]
+        if not samples:
+            return None
+        reference = samples[0]
+        for columns in samples[1:]:
+            if len(columns) != len(reference) or any(
+                abs(x - ref) > tolerance for x, ref in zip(columns, reference)
+            ):
+                return None
+        return cls(reference, settings, tolerance)
+
+    def _edges(self, page):
+        # Mesmas etapas de TableFinder.get_edges para a estratégia 'lines'
+        tset = self.settings
+        edges = utils.filter_edges(page.edges, min_length=tset.edge_min_length_prefilter)
+        edges = merge_edges(
+            edges, snap_x_tolerance=tset.snap_x_tolerance, snap_y_tolerance=tset.snap_y_tolerance,
+            join_x_tolerance=tset.join_x_tolerance, join_y_tolerance=tset.join_y_tolerance
+        )
+        return utils.filter_edges(edges, min_length=tset.edge_min_length)
+
+    def grid(self, page):
+        """Posições (xs, ys) das linhas da grade da página, ou None se ela não seguir o template"""
+        vertical, horizontal = [], []
+        for edge in self._edges(page):
+            (vertical if edge["orientation"] == "v" else horizontal).append(edge)
+        if len(vertical) != len(self.columns) or len(horizontal) < 2:
+            return None
+
+        vertical.sort(key=lambda edge: edge["x0"])
+        horizontal.sort(key=lambda edge: edge["top"])
+        xs = [edge["x0"] for edge in vertical]
+        ys = [edge["top"] for edge in horizontal]
+        if len(set(ys)) != len(ys) or any(
+            abs(x - column) > self.tolerance for x, column in zip(xs, self.columns)
+        ):
+            return None
+
+        # Toda borda precisa cruzar todas as da outra orientação, dentro da
+        # tolerância de interseção: só assim as células formam a grade inteira
+        x_tol = self.settings.intersection_x_tolerance
+        y_tol = self.settings.intersection_y_tolerance
+        if any(edge["top"] > ys[0] + y_tol or edge["bottom"] < ys[-1] - y_tol for edge in vertical):
+            return None
+        if any(edge["x0"] > xs[0] + x_tol or edge["x1"] < xs[-1] - x_tol for edge in horizontal):
+            return None
+        return xs, ys
+
+    def extract(self, page):
+        """Extrai a tabela da página pela grade do template, ou None se a verificação falhar
+
+        O resultado é o mesmo de page.extract_table(settings): um caractere
+        pertence à célula que contém o seu centro, e o texto de cada célula é
+        montado por utils.extract_text com as configurações de texto.
+        """
+        grid = self.grid(page)
+        if grid is None:
+            return None
+        xs, ys = grid
+        cells = [[[] for _ in range(len(xs) - 1)] for _ in range(len(ys) - 1)]
+        for char in page.chars:
+            row = bisect.bisect_right(ys, (char["top"] + char["bottom"]) / 2) - 1
+            col = bisect.bisect_right(xs, (char["x0"] + char["x1"]) / 2) - 1
+            if 0 <= row < len(ys) - 1 and 0 <= col < len(xs) - 1:
+                cells[row][col].append(char)
+        text_settings = self.settings.text_settings or {}
+        return [
+            [utils.extract_text(chars, **text_settings) if chars else "" for chars in row]
+            for row in cells
+        ]
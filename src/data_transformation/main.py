@@ -1,10 +1,22 @@
+import argparse
 import Data_transformtion as dt
+from columnar import pyarrow_available
+from instrumentation import PROFILE_MODES, RunInstrumentation
 from pathlib import Path
 from loguru import logger as log
 import os
 from tqdm import tqdm
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrai, transforma e compacta o Rol de Procedimentos")
+    parser.add_argument('--report', help="relatório JSON da execução (padrão: output/relatorio_execucao.json)")
+    parser.add_argument('--metrics', default=os.environ.get("PIPELINE_METRICS_FILE"),
+                        help="arquivo de métricas no formato do Prometheus, lido também pelo /metrics da API")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="cpu: cProfile por etapa; memory: tracemalloc por etapa")
+    parser.add_argument('--layout-template', action='store_true',
+                        help="aprende a grade de colunas em páginas de amostra e extrai as demais por ela")
+    args = parser.parse_args()
     try:
         log.remove()
         log.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
@@ -17,8 +29,36 @@ if __name__ == "__main__":
             exit(1)
         
         log.info(f"Iniciando processamento do arquivo: {pdf_path}")
-        transformer = dt.ANSDataTransformer(str(pdf_path))
-        success = transformer.process("ErickFernandesDeFariasSantos")
+        # Extrai as páginas em paralelo usando todos os núcleos disponíveis e
+        # reaproveita as páginas já extraídas em execuções anteriores. Quando o
+        # pyarrow está instalado, também gera o Parquet agrupado por capítulo
+        cache_dir = project_root / "output" / ".page_cache"
+        instrumentation = RunInstrumentation(args.profile, profile_dir=project_root / "output" / "profiles")
+        transformer = dt.ANSDataTransformer(
+            str(pdf_path), workers=os.cpu_count(), cache_dir=str(cache_dir),
+            columnar_formats=('parquet',) if pyarrow_available() else (),
+            partition_by='CAPITULO', database_url=os.environ.get("ROL_DATABASE_URL"),
+            instrumentation=instrumentation, layout_template=args.layout_template
+        )
+        # Com uma versão anterior já gerada, compara as versões e só regrava os
+        # artefatos (e atualiza o banco) quando houver alterações. Com banco
+        # configurado, a primeira execução também usa o modo incremental, que
+        # faz a carga completa da tabela
+        incremental = (
+            (project_root / "output" / "rol_procedimentos.csv").exists() or transformer.database_url is not None
+        )
+        try:
+            success = transformer.process(
+                "ErickFernandesDeFariasSantos", streaming=not incremental, incremental=incremental
+            )
+        finally:
+            instrumentation.stop()
+            report_path = instrumentation.save_report(
+                args.report or project_root / "output" / "relatorio_execucao.json"
+            )
+            log.info(f"Relatório da execução salvo em: {report_path}")
+            if args.metrics:
+                instrumentation.save_metrics(args.metrics)
         
         if success:
             log.info("Processo concluído com sucesso!")
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from pathlib import Path
+from loguru import logger as log
+
+
+class PageCache:
+    """Cache em disco das tabelas extraídas de cada página do PDF
+
+    Cada entrada é identificada pelo hash do conteúdo do PDF, pelo índice da
+    página e pelas configurações de extração, e guarda as linhas da página em
+    JSON comprimido com zlib. As entradas ficam agrupadas em um diretório por
+    PDF, o que permite invalidar um documento inteiro de uma vez. Quando o
+    tamanho total passa de max_bytes, as entradas menos usadas recentemente
+    (pela data de modificação, atualizada a cada leitura) são removidas.
+    """
+
+    SUFFIX = ".page"
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    @staticmethod
+    def file_digest(path, chunk_size=1024 * 1024):
+        """Calcula o SHA-256 do conteúdo de um arquivo"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def settings_digest(table_settings):
+        """Gera um identificador estável para as configurações de extração"""
+        encoded = json.dumps(table_settings, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    def _entry_path(self, pdf_digest, page_index, table_settings):
+        name = f"{page_index:05d}-{self.settings_digest(table_settings)}{self.SUFFIX}"
+        return self.cache_dir / pdf_digest / name
+
+    def _entries(self):
+        return self.cache_dir.glob(f"*/*{self.SUFFIX}")
+
+    def contains(self, pdf_digest, page_index, table_settings):
+        """Verifica se a página já está no cache"""
+        return self._entry_path(pdf_digest, page_index, table_settings).exists()
+
+    def get(self, pdf_digest, page_index, table_settings):
+        """Retorna (encontrado, tabela) para a página informada"""
+        path = self._entry_path(pdf_digest, page_index, table_settings)
+        try:
+            data = path.read_bytes()
+            # Marca a entrada como usada recentemente para a política LRU
+            os.utime(path)
+        except FileNotFoundError:
+            return False, None
+
+        try:
+            return True, json.loads(zlib.decompress(data).decode('utf-8'))
+        except (zlib.error, ValueError) as e:
+            log.warning(f"Entrada de cache corrompida descartada: {path} ({e})")
+            self._remove(path)
+            return False, None
+
+    def put(self, pdf_digest, page_index, table_settings, table):
+        """Grava a tabela extraída de uma página no cache"""
+        path = self._entry_path(pdf_digest, page_index, table_settings)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(json.dumps(table, ensure_ascii=False).encode('utf-8'))
+
+        previous = path.stat().st_size if path.exists() else 0
+        # Escrita atômica: grava em um arquivo temporário e renomeia
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._size += len(data) - previous
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Remove as entradas menos usadas até o cache caber em max_bytes"""
+        entries = sorted(
+            ((entry.stat(), entry) for entry in self._entries()),
+            key=lambda item: item[0].st_mtime
+        )
+        self._size = sum(stat.st_size for stat, _ in entries)
+        removed = 0
+        for stat, entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            self._remove(entry, stat.st_size)
+            removed += 1
+        if removed:
+            log.debug(f"Removidas {removed} entradas antigas do cache de páginas")
+
+    def invalidate(self, pdf_digest=None):
+        """Remove as entradas de um PDF específico ou, sem argumento, todo o cache"""
+        pattern = f"{pdf_digest}/*{self.SUFFIX}" if pdf_digest else f"*/*{self.SUFFIX}"
+        for entry in self.cache_dir.glob(pattern):
+            self._remove(entry)
+        for directory in self.cache_dir.iterdir():
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()
+        log.info(f"Cache de páginas invalidado: {pdf_digest or 'todas as entradas'}")
+
+    def _remove(self, path, size=None):
+        try:
+            size = path.stat().st_size if size is None else size
+            path.unlink()
+            self._size -= size
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,225 @@
+import bisect
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+import pandas as pd
+from loguru import logger as log
+
+from data_transformation.columnar import COLUMNS
+
+KEY_COLUMNS = ['PROCEDIMENTO', 'RN_ALTERACAO']
+
+
+def row_keys(df):
+    """Chave de cada linha: (PROCEDIMENTO, RN_ALTERACAO, ocorrência)
+
+    A ocorrência diferencia linhas com a mesma chave, como os cabeçalhos
+    repetidos em cada página e as linhas vazias entre as páginas.
+    """
+    keys = []
+    seen = {}
+    for procedimento, rn in zip(df['PROCEDIMENTO'].astype(str), df['RN_ALTERACAO'].astype(str)):
+        occurrence = seen.get((procedimento, rn), 0)
+        seen[(procedimento, rn)] = occurrence + 1
+        keys.append((procedimento, rn, occurrence))
+    return keys
+
+
+def _rows(df):
+    return [tuple(row) for row in df[COLUMNS].astype(str).itertuples(index=False, name=None)]
+
+
+def _longest_increasing(positions):
+    """Índices de uma maior subsequência crescente de positions (O(n log n))"""
+    tails = []
+    tails_index = []
+    previous = [-1] * len(positions)
+    for i, value in enumerate(positions):
+        j = bisect.bisect_left(tails, value)
+        if j == len(tails):
+            tails.append(value)
+            tails_index.append(i)
+        else:
+            tails[j] = value
+            tails_index[j] = i
+        previous[i] = tails_index[j - 1] if j else -1
+    result = set()
+    i = tails_index[-1] if tails_index else -1
+    while i != -1:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+@dataclass
+class Changeset:
+    """Diferença entre duas versões do Rol de Procedimentos
+
+    added guarda a posição de cada linha nova na versão atual, o que permite
+    reconstruir a versão atual exatamente a partir da anterior. Linhas que
+    mudaram de posição aparecem como removidas e adicionadas.
+    """
+
+    added: list = field(default_factory=list)     # {'key', 'position', 'row'}
+    removed: list = field(default_factory=list)   # {'key', 'row'}
+    modified: list = field(default_factory=list)  # {'key', 'before', 'after'}
+
+    @property
+    def empty(self):
+        return not (self.added or self.removed or self.modified)
+
+    def summary(self):
+        return f"{len(self.added)} adicionadas, {len(self.removed)} removidas, {len(self.modified)} alteradas"
+
+    def to_dict(self):
+        return {
+            'columns': COLUMNS,
+            'added': [{**entry, 'key': list(entry['key']), 'row': list(entry['row'])} for entry in self.added],
+            'removed': [{**entry, 'key': list(entry['key']), 'row': list(entry['row'])} for entry in self.removed],
+            'modified': [
+                {'key': list(entry['key']), 'before': list(entry['before']), 'after': list(entry['after'])}
+                for entry in self.modified
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            added=[{**entry, 'key': tuple(entry['key']), 'row': tuple(entry['row'])} for entry in data['added']],
+            removed=[{**entry, 'key': tuple(entry['key']), 'row': tuple(entry['row'])} for entry in data['removed']],
+            modified=[
+                {'key': tuple(entry['key']), 'before': tuple(entry['before']), 'after': tuple(entry['after'])}
+                for entry in data['modified']
+            ],
+        )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def compute_changeset(previous_df, current_df):
+    """Compara duas versões do Rol e retorna o Changeset entre elas"""
+    previous_keys = row_keys(previous_df)
+    current_keys = row_keys(current_df)
+    previous_rows = dict(zip(previous_keys, _rows(previous_df)))
+    current_rows = _rows(current_df)
+    previous_position = {key: pos for pos, key in enumerate(previous_keys)}
+
+    # Linhas mantidas que preservam a ordem relativa; as demais são tratadas
+    # como removidas e adicionadas novamente
+    retained = [pos for pos, key in enumerate(current_keys) if key in previous_position]
+    in_order = _longest_increasing([previous_position[current_keys[pos]] for pos in retained])
+    kept = {current_keys[retained[i]] for i in in_order}
+
+    changeset = Changeset()
+    for key in previous_keys:
+        if key not in kept:
+            changeset.removed.append({'key': key, 'row': previous_rows[key]})
+    for pos, (key, row) in enumerate(zip(current_keys, current_rows)):
+        if key not in kept:
+            changeset.added.append({'key': key, 'position': pos, 'row': row})
+        elif previous_rows[key] != row:
+            changeset.modified.append({'key': key, 'before': previous_rows[key], 'after': row})
+    return changeset
+
+
+def apply_changeset(previous_df, changeset):
+    """Aplica o Changeset à versão anterior e retorna a versão atual"""
+    removed = {entry['key'] for entry in changeset.removed}
+    modified = {entry['key']: entry['after'] for entry in changeset.modified}
+
+    rows = [
+        modified.get(key, row)
+        for key, row in zip(row_keys(previous_df), _rows(previous_df))
+        if key not in removed
+    ]
+    for entry in sorted(changeset.added, key=lambda entry: entry['position']):
+        rows.insert(entry['position'], entry['row'])
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def load_previous_release(csv_path):
+    """Lê o CSV da execução anterior, ou retorna None se ele não existir"""
+    if not os.path.exists(csv_path):
+        return None
+    return pd.read_csv(csv_path, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+
+
+def changeset_path(output_dir):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(output_dir, "changesets", f"rol_changeset_{timestamp}.json")
+
+
+class DatabaseSink:
+    """Aplica um Changeset à tabela rol_procedimentos via SQLAlchemy
+
+    Apenas as linhas do Changeset são escritas: DELETE das removidas, UPDATE
+    das alteradas e INSERT das novas, em uma única transação. replace faz a
+    carga completa de uma versão, usada quando a tabela ainda está vazia.
+    """
+
+    def __init__(self, database_url, table_name='rol_procedimentos'):
+        from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, func, select
+
+        self.engine = create_engine(database_url)
+        metadata = MetaData()
+        self.table = Table(
+            table_name, metadata,
+            Column('procedimento', String, primary_key=True),
+            Column('rn_alteracao', String, primary_key=True),
+            Column('ocorrencia', Integer, primary_key=True),
+            *[Column(col.lower(), String) for col in COLUMNS if col not in KEY_COLUMNS]
+        )
+        metadata.create_all(self.engine)
+        self._count = select(func.count()).select_from(self.table)
+
+    def _key_clause(self, key):
+        table = self.table
+        return (
+            (table.c.procedimento == key[0])
+            & (table.c.rn_alteracao == key[1])
+            & (table.c.ocorrencia == key[2])
+        )
+
+    def _values(self, key, row):
+        values = {col.lower(): value for col, value in zip(COLUMNS, row)}
+        values['ocorrencia'] = key[2]
+        return values
+
+    def is_empty(self):
+        with self.engine.connect() as connection:
+            return connection.execute(self._count).scalar() == 0
+
+    def replace(self, dataframe):
+        """Substitui todo o conteúdo da tabela pela versão informada, em uma única transação"""
+        rows = [
+            self._values(key, row) for key, row in zip(row_keys(dataframe), _rows(dataframe))
+        ]
+        with self.engine.begin() as connection:
+            connection.execute(self.table.delete())
+            if rows:
+                connection.execute(self.table.insert(), rows)
+        log.success(f"Banco de dados carregado por completo: {len(rows)} linhas")
+
+    def apply(self, changeset):
+        with self.engine.begin() as connection:
+            for entry in changeset.removed:
+                connection.execute(self.table.delete().where(self._key_clause(entry['key'])))
+            for entry in changeset.modified:
+                values = self._values(entry['key'], entry['after'])
+                connection.execute(self.table.update().where(self._key_clause(entry['key'])).values(values))
+            if changeset.added:
+                connection.execute(
+                    self.table.insert(),
+                    [self._values(entry['key'], entry['row']) for entry in changeset.added]
+                )
+        log.success(f"Banco de dados atualizado: {changeset.summary()}")
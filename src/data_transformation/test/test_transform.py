@@ -0,0 +1,499 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import pandas as pd
+import pdfplumber
+from benchmarks.fixtures import write_rol_pdf
+from data_transformation.Data_transformtion import TABLE_SETTINGS, ANSDataTransformer, timed_extract
+from data_transformation.instrumentation import RunInstrumentation
+from data_transformation.layout_template import LayoutTemplate
+from data_transformation.page_cache import PageCache
+from data_transformation.release_diff import (
+    Changeset, DatabaseSink, apply_changeset, compute_changeset
+)
+
+PDF_PATH = Path(__file__).parent.parent.parent / "web_scraping" / "downloads" / "Anexo_II.pdf"
+
+HEADER = ["PROCEDIMENTO", "RN\n(alteração)", "VIGÊNCIA", "OD", "AMB", "HCO", "HSO",
+          "REF", "PAC", "DUT", "SUBGRUPO", "GRUPO", "CAPÍTULO"]
+
+
+def synthetic_pages(pages=4, rows_per_page=5):
+    """Gera tabelas de página no formato do Anexo I do Rol de Procedimentos"""
+    tables = []
+    for page in range(pages):
+        table = [list(HEADER)]
+        for row in range(rows_per_page):
+            table.append([
+                f"PROCEDIMENTO {page}-{row}\nCOM QUEBRA", "RN 465/2021", None,
+                "X" if row % 2 else "", "X", "", " X ", "X", "", None,
+                "SUBGRUPO", "GRUPO", f"CAPÍTULO {page}"
+            ])
+        if page == pages - 1:
+            table.append(["Legenda: OD: Seg. Odontológica"] + [""] * 12)
+        tables.append(table)
+    tables.insert(2, None)
+    return tables
+
+
+class TestANSDataTransformer(unittest.TestCase):
+    def setUp(self):
+        self.transformer = ANSDataTransformer(str(PDF_PATH))
+        # Limita a extração a algumas páginas para manter os testes rápidos
+        self.transformer.last_page = 12
+
+    def test_parallel_extraction_matches_serial(self):
+        """Testa se a extração paralela gera o mesmo resultado da serial"""
+        serial = self.transformer.extract_tables_from_pdf()
+
+        self.transformer.workers = 3
+        self.transformer.pages_per_task = 2
+        parallel = self.transformer.extract_tables_from_pdf()
+
+        self.assertIsNotNone(serial)
+        self.assertEqual(serial, parallel)
+
+    def test_clean_frame_normalizes_cells(self):
+        """Testa a limpeza vetorizada: nulos, 'nan'/'None', quebras de linha, marcações ' X ' e legenda"""
+        rows = [
+            ["PROC\nCOM QUEBRA ", "nan", None, " X ", "X", "", "None", "x", " ", None, " SUB ", "G", "C"],
+            ["Legenda: OD: Seg. Odontológica"] + [""] * 12,
+            [None] * 13,
+        ]
+        df = self.transformer._clean_frame(pd.DataFrame(rows, columns=HEADER))
+
+        self.assertEqual(len(df), 1)
+        row = df.iloc[0]
+        self.assertEqual(
+            [row[col] for col in ("PROCEDIMENTO", "RN_ALTERACAO", "VIGENCIA", "SUBGRUPO")],
+            ["PROC COM QUEBRA", "", "", "SUB"]
+        )
+        self.assertEqual(
+            [row[col] for col in ("OD", "AMB", "HCO", "HSO", "REF", "PAC", "DUT")],
+            ["Seg. Odontológica", "Seg. Ambulatorial", "", "", "", "", ""]
+        )
+
+    def test_append_page_table_adds_separator(self):
+        """Testa a linha vazia adicionada após a tabela de cada página"""
+        all_tables = []
+        self.transformer._append_page_table(all_tables, [["PROCEDIMENTO", "RN"], ["A", "B"]])
+        self.transformer._append_page_table(all_tables, None)
+        self.assertEqual(all_tables, [["PROCEDIMENTO", "RN"], ["A", "B"], ["", ""]])
+
+
+class TestLayoutTemplate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.pdf_path = write_rol_pdf(os.path.join(cls.tmp_dir, "rol.pdf"), 6, rows_per_page=12)
+        cls.expected = ANSDataTransformer(cls.pdf_path).extract_tables_from_pdf()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_template_matches_full_detection(self):
+        """Testa se a extração pelo template gera o mesmo resultado da detecção completa"""
+        transformer = ANSDataTransformer(self.pdf_path, layout_template=True, template_sample_pages=2)
+        self.assertEqual(transformer.extract_tables_from_pdf(), self.expected)
+        self.assertEqual(len(transformer.template.columns), 14)
+
+        transformer = ANSDataTransformer(self.pdf_path, workers=2, pages_per_task=1, layout_template=True)
+        self.assertEqual(transformer.extract_tables_from_pdf(), self.expected)
+
+    def test_pages_outside_template_fall_back(self):
+        """Testa a detecção completa nas páginas que não seguem a grade do template"""
+        transformer = ANSDataTransformer(self.pdf_path, layout_template=True)
+        transformer.extract_tables_from_pdf()
+        shifted = LayoutTemplate([x + 5 for x in transformer.template.columns], TABLE_SETTINGS)
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for page in pdf.pages[1:4]:
+                self.assertIsNone(shifted.grid(page))
+                self.assertEqual(timed_extract(page, TABLE_SETTINGS, shifted)[0], page.extract_table(TABLE_SETTINGS))
+            self.assertIsNotNone(transformer.template.grid(pdf.pages[3]))
+        self.assertIsNone(LayoutTemplate.learn([[0, 10, 20], [0, 10, 25]], TABLE_SETTINGS))
+
+        # Anexo II não tem grade regular: o resultado continua o mesmo
+        transformer = ANSDataTransformer(str(PDF_PATH), layout_template=True)
+        transformer.last_page = 12
+        baseline = ANSDataTransformer(str(PDF_PATH))
+        baseline.last_page = 12
+        self.assertEqual(transformer.extract_tables_from_pdf(), baseline.extract_tables_from_pdf())
+
+
+    def test_cache_separates_template_and_full_detection(self):
+        """Testa se as execuções com e sem template no mesmo cache não reaproveitam as páginas uma da outra"""
+        cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        marked = [["EXTRAÍDA PELO TEMPLATE"]]
+
+        def run(**kwargs):
+            instrumentation = RunInstrumentation()
+            transformer = ANSDataTransformer(self.pdf_path, cache_dir=cache_dir,
+                                             instrumentation=instrumentation, **kwargs)
+            tables = list(transformer._iter_page_tables())
+            return tables, [page["origem"] for page in instrumentation.report()["paginas"]]
+
+        run()
+        # O template marca as páginas que extrai: a detecção completa em cache não é
+        # servida à execução com template, e a marca não vaza para a detecção completa
+        with patch.object(LayoutTemplate, 'extract', lambda template, page: marked):
+            tables, sources = run(layout_template=True, template_sample_pages=2)
+        self.assertIn(marked, tables)
+        self.assertNotIn("cache", sources)
+
+        tables, sources = run()
+        self.assertNotIn(marked, tables)
+        self.assertEqual(set(sources), {"cache"})
+
+        # Só as páginas de amostra, que aprendem o template, são extraídas de novo
+        with patch.object(LayoutTemplate, 'extract', lambda template, page: marked):
+            tables, sources = run(layout_template=True, template_sample_pages=2)
+        self.assertIn(marked, tables)
+        self.assertEqual(sources.count("cache"), len(sources) - 2)
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.transformer = ANSDataTransformer(str(PDF_PATH))
+        self.transformer.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.transformer.output_dir)
+
+    @patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(synthetic_pages()))
+    def test_streaming_csv_matches_batch(self):
+        """Testa se o CSV gerado em streaming é idêntico ao gerado em lote"""
+        raw_data = self.transformer.extract_tables_from_pdf()
+        df = self.transformer.clean_and_transform_data(raw_data)
+        batch_path = self.transformer.save_to_csv(df, "batch.csv")
+
+        stream_path = self.transformer.save_to_csv_stream(
+            self.transformer.iter_clean_chunks(), "stream.csv"
+        )
+
+        self.assertEqual(Path(batch_path).read_bytes(), Path(stream_path).read_bytes())
+        self.assertIn("Seg. Odontológica", Path(stream_path).read_text(encoding='utf-8-sig'))
+
+    @patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(synthetic_pages()))
+    def test_streaming_directly_into_zip(self):
+        """Testa a gravação do CSV direto no ZIP, sem o arquivo descompactado"""
+        import zipfile
+        expected_path = self.transformer.save_to_csv_stream(
+            self.transformer.iter_clean_chunks(), "esperado.csv"
+        )
+        os.rename(expected_path, expected_path + ".bak")
+
+        self.transformer.keep_csv = False
+        self.assertTrue(self.transformer.process("Teste", streaming=True))
+
+        zips = list(Path(self.transformer.output_dir).glob("Teste_Teste_*.zip"))
+        self.assertEqual(len(zips), 1)
+        self.assertFalse((Path(self.transformer.output_dir) / "rol_procedimentos.csv").exists())
+        with zipfile.ZipFile(zips[0]) as zipf:
+            self.assertEqual(
+                zipf.read("rol_procedimentos.csv"), Path(expected_path + ".bak").read_bytes()
+            )
+
+    @patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter([None, None]))
+    def test_streaming_without_data(self):
+        """Testa o modo streaming quando nenhuma tabela é encontrada"""
+        self.assertIsNone(self.transformer.save_to_csv_stream(self.transformer.iter_clean_chunks()))
+
+
+class TestColumnarOutputs(unittest.TestCase):
+    def setUp(self):
+        self.transformer = ANSDataTransformer(
+            str(PDF_PATH), columnar_formats=('parquet', 'arrow'), partition_by='CAPITULO'
+        )
+        self.transformer.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.transformer.output_dir)
+
+    def _read(self):
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+        output_dir = Path(self.transformer.output_dir)
+        parquet = pq.ParquetFile(output_dir / "rol_procedimentos.parquet")
+        arrow = ipc.open_file(str(output_dir / "rol_procedimentos.arrow")).read_all()
+        return parquet, arrow
+
+    @patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(synthetic_pages()))
+    def test_columnar_outputs_match_csv(self):
+        """Testa se Parquet e Arrow têm os mesmos dados do CSV e o esquema fixo"""
+        import pandas as pd
+        from data_transformation.columnar import rol_schema
+
+        raw_data = self.transformer.extract_tables_from_pdf()
+        df = self.transformer.clean_and_transform_data(raw_data)
+        csv_path = self.transformer.save_outputs(df)
+        expected = pd.read_csv(csv_path, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+
+        parquet, arrow = self._read()
+        self.assertEqual(parquet.schema_arrow, rol_schema())
+        self.assertEqual(arrow.schema, rol_schema())
+        # Um row group por capítulo, mais os cabeçalhos repetidos e as linhas vazias
+        self.assertEqual(parquet.num_row_groups, 6)
+        self.assertEqual(parquet.read_row_group(0).column('CAPITULO').unique().to_pylist(), ["CAPÍTULO 0"])
+
+        pd.testing.assert_frame_equal(arrow.to_pandas().astype(str), expected)
+        by_chapter = expected.sort_values('CAPITULO', kind='stable', key=lambda s: s.map(
+            {value: pos for pos, value in enumerate(expected['CAPITULO'].unique())}
+        ))
+        pd.testing.assert_frame_equal(
+            parquet.read().to_pandas().astype(str), by_chapter.reset_index(drop=True)
+        )
+
+    @patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(synthetic_pages()))
+    def test_streaming_columnar_outputs(self):
+        """Testa as saídas colunares gravadas bloco a bloco no modo streaming"""
+        self.transformer.save_outputs_stream(self.transformer.iter_clean_chunks())
+
+        parquet, arrow = self._read()
+        self.assertEqual(parquet.metadata.num_rows, arrow.num_rows)
+        self.assertEqual(arrow.column("CAPITULO").to_pylist()[-2], "CAPÍTULO 3")
+        # Os blocos de cada página são acumulados: um row group por capítulo, como no modo em lote
+        streamed = parquet.read().to_pandas().astype(str)
+        self.assertEqual(parquet.num_row_groups, 6)
+
+        raw_data = self.transformer.extract_tables_from_pdf()
+        self.transformer.save_outputs(self.transformer.clean_and_transform_data(raw_data))
+        parquet, _ = self._read()
+        self.assertEqual(parquet.num_row_groups, 6)
+        pd.testing.assert_frame_equal(streamed, parquet.read().to_pandas().astype(str))
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_second_run_uses_cache(self):
+        """Testa se a segunda execução não extrai novamente as páginas em cache"""
+        transformer = ANSDataTransformer(str(PDF_PATH), cache_dir=self.cache_dir)
+        transformer.last_page = 6
+        first = transformer.extract_tables_from_pdf()
+
+        with patch('pdfplumber.page.Page.extract_table', side_effect=AssertionError("extraiu")):
+            second = transformer.extract_tables_from_pdf()
+
+        self.assertEqual(first, second)
+
+    def test_put_get_and_invalidate(self):
+        """Testa a gravação, leitura e invalidação de entradas"""
+        cache = PageCache(self.cache_dir)
+        table = [["PROCEDIMENTO", "RN"], ["CONSULTA", None]]
+        cache.put("abc", 3, {"a": 1}, table)
+
+        self.assertEqual(cache.get("abc", 3, {"a": 1}), (True, table))
+        self.assertEqual(cache.get("abc", 3, {"a": 2}), (False, None))
+
+        cache.invalidate("abc")
+        self.assertFalse(cache.contains("abc", 3, {"a": 1}))
+
+    def test_lru_eviction(self):
+        """Testa a remoção das entradas menos usadas ao exceder o limite"""
+        cache = PageCache(self.cache_dir, max_bytes=10 ** 6)
+        rows = [[str(i) * 50 for i in range(20)]]
+        for index in range(3):
+            cache.put("abc", index, {}, rows)
+            # Datas distintas para que a ordem LRU não dependa da resolução do sistema de arquivos
+            os.utime(cache._entry_path("abc", index, {}), (index, index))
+        entry_size = cache._size // 3
+
+        cache.get("abc", 0, {})
+        cache.max_bytes = entry_size * 2
+        cache.put("abc", 3, {}, rows)
+
+        self.assertTrue(cache.contains("abc", 0, {}))
+        self.assertFalse(cache.contains("abc", 1, {}))
+        self.assertTrue(cache.contains("abc", 3, {}))
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def _transformer(self, instrumentation, **kwargs):
+        transformer = ANSDataTransformer(str(PDF_PATH), instrumentation=instrumentation, **kwargs)
+        transformer.output_dir = self.output_dir
+        transformer.last_page = 6
+        return transformer
+
+    def test_stages_and_pages_in_report(self):
+        """Testa o relatório por etapa e por página e a exportação das métricas"""
+        instrumentation = RunInstrumentation()
+        with patch('pdfplumber.page.Page.extract_table', side_effect=synthetic_pages(3)):
+            self.assertTrue(self._transformer(instrumentation).process("Teste"))
+
+        report = instrumentation.report()
+        self.assertEqual([stage["etapa"] for stage in report["etapas"]], [
+            "extract_tables_from_pdf", "clean_and_transform_data", "save_outputs", "compress_csv"
+        ])
+        for stage in report["etapas"]:
+            self.assertGreaterEqual(stage["cpu_segundos"], 0)
+            self.assertGreater(stage["pico_rss_processo_bytes"], 0)
+        self.assertEqual([page["pagina"] for page in report["paginas"]], [3, 4, 5, 6])
+        self.assertEqual([page["linhas"] for page in report["paginas"]], [6, 6, 0, 7])
+        self.assertEqual(report["resumo_paginas"]["extraidas"], 4)
+
+        metrics = Path(instrumentation.save_metrics(os.path.join(self.output_dir, "pipeline.prom"))).read_text()
+        self.assertIn('ans_pipeline_stage_seconds{stage="compress_csv"}', metrics)
+        self.assertIn('ans_pipeline_page_extract_seconds_count 4', metrics)
+        self.assertIn('ans_pipeline_pages{source="extraida"} 4', metrics)
+
+    def test_streaming_stages_in_report(self):
+        """Testa a extração, a limpeza e a escrita relatadas como etapas separadas no modo streaming"""
+        instrumentation = RunInstrumentation()
+        with patch('pdfplumber.page.Page.extract_table', side_effect=synthetic_pages(3)):
+            self.assertTrue(self._transformer(instrumentation).process("Teste", streaming=True))
+
+        stages = {stage["etapa"]: stage for stage in instrumentation.report()["etapas"]}
+        self.assertEqual(list(stages), [
+            "extract_tables_from_pdf", "clean_and_transform_data", "save_outputs_stream", "compress_csv"
+        ])
+        for stage in stages.values():
+            self.assertGreaterEqual(stage["segundos"], 0)
+        self.assertGreater(stages["extract_tables_from_pdf"]["segundos"], 0)
+        self.assertEqual(len(instrumentation.pages), 4)
+        self.assertIn("pico_rss_processo_bytes", stages["save_outputs_stream"])
+
+    def test_cache_pages_and_parallel_workers(self):
+        """Testa a origem das páginas vindas do cache e os tempos medidos nos workers"""
+        cache_dir = os.path.join(self.output_dir, "cache")
+        self._transformer(None, cache_dir=cache_dir, workers=2, pages_per_task=2).extract_tables_from_pdf()
+
+        instrumentation = RunInstrumentation()
+        transformer = self._transformer(instrumentation, cache_dir=cache_dir)
+        transformer.last_page = 8
+        transformer.extract_tables_from_pdf()
+        self.assertEqual([page["origem"] for page in instrumentation.pages], ["cache"] * 4 + ["extraida"] * 2)
+
+    def test_profile_modes(self):
+        """Testa os modos cProfile e tracemalloc"""
+        profile_dir = os.path.join(self.output_dir, "profiles")
+        instrumentation = RunInstrumentation('cpu', profile_dir=profile_dir, top=5)
+        with instrumentation.stage("soma") as stage:
+            stage["linhas"] = sum(range(10 ** 5))
+        functions = [row["funcao"] for row in instrumentation.stages[0]["funcoes"]]
+        self.assertLessEqual(len(functions), 5)
+        self.assertTrue(any("builtins.sum" in name for name in functions))
+        self.assertTrue(os.path.exists(os.path.join(profile_dir, "soma.prof")))
+
+        instrumentation = RunInstrumentation('memory')
+        with instrumentation.stage("lista"):
+            data = [0] * 10 ** 6
+        instrumentation.stop()
+        self.assertGreaterEqual(instrumentation.stages[0]["pico_memoria_bytes"], 8 * 10 ** 6)
+        self.assertTrue(instrumentation.stages[0]["alocacoes"])
+        del data
+        with self.assertRaises(ValueError):
+            RunInstrumentation('gpu')
+
+
+class TestReleaseDiff(unittest.TestCase):
+    def setUp(self):
+        self.transformer = ANSDataTransformer(str(PDF_PATH))
+        self.transformer.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.transformer.output_dir)
+
+    def _release(self, pages):
+        with patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(pages)):
+            return self.transformer.clean_and_transform_data(self.transformer.extract_tables_from_pdf())
+
+    def _changed_pages(self):
+        pages = synthetic_pages()
+        pages[0][1][12] = "CAPÍTULO NOVO"                # alteração
+        del pages[1][3]                                 # remoção
+        pages[3].insert(2, list(pages[3][1]))           # inclusão
+        pages[3][2][0] = "PROCEDIMENTO INCLUÍDO"
+        pages[0][2], pages[0][4] = pages[0][4], pages[0][2]  # mudança de posição
+        return pages
+
+    def test_changeset_roundtrip(self):
+        """Testa se aplicar o Changeset à versão anterior reproduz a versão atual"""
+        previous = self._release(synthetic_pages())
+        current = self._release(self._changed_pages())
+
+        changeset = compute_changeset(previous, current)
+        self.assertEqual(len(changeset.modified), 1)
+        self.assertTrue(changeset.removed and changeset.added)
+
+        path = changeset.save(os.path.join(self.transformer.output_dir, "changeset.json"))
+        rebuilt = apply_changeset(previous, Changeset.load(path))
+        self.assertEqual(rebuilt.values.tolist(), current.astype(str).values.tolist())
+
+    def test_database_sink_receives_only_delta(self):
+        """Testa se o banco reflete a versão atual após aplicar apenas o delta"""
+        from sqlalchemy import select
+        database_url = f"sqlite:///{self.transformer.output_dir}/rol.db"
+        previous = self._release(synthetic_pages())
+        current = self._release(self._changed_pages())
+
+        sink = DatabaseSink(database_url)
+        sink.apply(compute_changeset(previous.iloc[:0], previous))
+        sink.apply(compute_changeset(previous, current))
+
+        with sink.engine.connect() as connection:
+            stored = connection.execute(select(sink.table.c.procedimento, sink.table.c.capitulo)).all()
+        expected = current[['PROCEDIMENTO', 'CAPITULO']].astype(str).itertuples(index=False, name=None)
+        self.assertEqual(sorted(stored), sorted(expected))
+
+    def test_process_keeps_database_and_baseline_in_sync(self):
+        """Testa a carga completa na primeira execução, o delta e a falha ao aplicar no banco"""
+        from sqlalchemy import select
+        self.transformer.database_url = f"sqlite:///{self.transformer.output_dir}/rol.db"
+        csv_path = Path(self.transformer.output_dir, "rol_procedimentos.csv")
+
+        def run(pages):
+            with patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(pages)):
+                return self.transformer.process("Teste", incremental=True)
+
+        def stored():
+            sink = DatabaseSink(self.transformer.database_url)
+            with sink.engine.connect() as connection:
+                return sorted(connection.execute(select(sink.table.c.procedimento, sink.table.c.capitulo)).all())
+
+        def expected():
+            df = pd.read_csv(csv_path, sep=';', encoding='utf-8-sig', dtype=str, keep_default_na=False)
+            return sorted(df[['PROCEDIMENTO', 'CAPITULO']].itertuples(index=False, name=None))
+
+        # Primeira execução, sem CSV anterior: a tabela recebe a versão inteira
+        self.assertTrue(run(synthetic_pages()))
+        self.assertEqual(stored(), expected())
+
+        # Falha no banco: o CSV anterior continua sendo a base da comparação
+        baseline = csv_path.read_bytes()
+        with patch.object(DatabaseSink, 'apply', side_effect=RuntimeError("banco indisponível")):
+            self.assertFalse(run(self._changed_pages()))
+        self.assertEqual(csv_path.read_bytes(), baseline)
+
+        # Execução seguinte com alterações: o mesmo delta é aplicado
+        self.assertTrue(run(self._changed_pages()))
+        self.assertNotEqual(csv_path.read_bytes(), baseline)
+        self.assertEqual(stored(), expected())
+
+    def test_unchanged_release_is_skipped(self):
+        """Testa se uma versão sem alterações não regrava os artefatos"""
+        with patch.object(ANSDataTransformer, '_iter_page_tables', lambda self: iter(synthetic_pages())):
+            self.assertTrue(self.transformer.process("Teste", incremental=True))
+            with patch.object(ANSDataTransformer, 'save_outputs', side_effect=AssertionError("regravou")):
+                self.assertTrue(self.transformer.process("Teste", incremental=True))
+
+        changesets = list(Path(self.transformer.output_dir, "changesets").glob("*.json"))
+        self.assertEqual(len(changesets), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,510 @@
+import codecs
+import csv
+import hashlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+import pandas as pd
+from loguru import logger as log
+from sqlalchemy import (
+    Column, Date, DateTime, Index, Integer, MetaData, Numeric, String, Table, create_engine, func, insert, select,
+    text
+)
+from database.ingestion.rollups import next_quarter, quarter_start, refresh_quarters
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "arquivos"
+
+# Colunas dos CSVs trimestrais da ANS e as colunas correspondentes da tabela
+COLUMN_MAP = {
+    'DATA': 'data',
+    'REG_ANS': 'reg_ans',
+    'CD_CONTA_CONTABIL': 'cd_conta_contabil',
+    'DESCRICAO': 'descricao',
+    'VL_SALDO_INICIAL': 'vl_saldo_inicial',
+    'VL_SALDO_FINAL': 'vl_saldo_final',
+}
+COLUMNS = list(COLUMN_MAP.values())
+KEY_COLUMNS = ['data', 'reg_ans', 'cd_conta_contabil']
+VALUE_COLUMNS = ['vl_saldo_inicial', 'vl_saldo_final']
+
+CHUNK_SIZE = 100_000
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Marcador de parâmetro posicional de cada paramstyle da DB-API
+PLACEHOLDERS = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+
+# Tabelas da ingestão. No PostgreSQL, demonstracoes_contabeis é criada por
+# sql/create_tables.sql, particionada por trimestre
+metadata = MetaData()
+demonstracoes_contabeis = Table(
+    'demonstracoes_contabeis', metadata,
+    Column('data', Date, primary_key=True),
+    Column('reg_ans', String(20), primary_key=True),
+    Column('cd_conta_contabil', String(20), primary_key=True),
+    Column('descricao', String(255), nullable=False),
+    Column('vl_saldo_inicial', Numeric(15, 2), nullable=False),
+    Column('vl_saldo_final', Numeric(15, 2), nullable=False),
+)
+despesas_trimestrais = Table(
+    'despesas_trimestrais', metadata,
+    Column('trimestre', Date, primary_key=True),
+    Column('reg_ans', String(20), primary_key=True),
+    Column('cd_conta_contabil', String(20), primary_key=True),
+    Column('descricao', String(255), nullable=False),
+    Column('total', Numeric(18, 2), nullable=False),
+    Column('linhas', Integer, nullable=False),
+)
+Index(
+    'ix_despesas_trimestrais_conta', func.upper(despesas_trimestrais.c.descricao), despesas_trimestrais.c.trimestre,
+    despesas_trimestrais.c.reg_ans, despesas_trimestrais.c.total
+)
+ingested_files = Table(
+    'ingested_files', metadata,
+    Column('checksum', String(64), primary_key=True),
+    Column('file_name', String(255), nullable=False),
+    Column('rows', Integer, nullable=False),
+    Column('loaded_at', DateTime, server_default=func.now()),
+)
+
+@dataclass
+class FileReport:
+    path: str
+    checksum: str = None
+    status: str = 'pendente'  # carregado, ignorado ou falhou
+    loaded: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    error: str = None
+
+
+def parse_decimal(values):
+    """Converte valores no formato brasileiro ('1.234,56') para '1234.56'
+
+    Valores sem vírgula são mantidos como estão ('1234.56'). O resultado é
+    texto, para não perder precisão; valores inválidos viram NaN.
+    """
+    values = values.str.strip()
+    brazilian = values.str.contains(',', regex=False)
+    converted = values.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    values = values.where(~brazilian, converted)
+    return values.where(values.str.fullmatch(r'-?\d+(\.\d+)?').fillna(False).astype(bool))
+
+
+def parse_dates(values):
+    """Aceita datas 'AAAA-MM-DD' e 'DD/MM/AAAA'; retorna 'AAAA-MM-DD' ou NaN"""
+    values = values.str.strip()
+    dates = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+    dates = dates.fillna(pd.to_datetime(values, format='%d/%m/%Y', errors='coerce'))
+    return dates.dt.strftime('%Y-%m-%d')
+
+
+def normalize_chunk(df):
+    """Valida e normaliza um bloco do CSV; retorna (válidas, rejeitadas)"""
+    df = df.rename(columns=lambda column: COLUMN_MAP.get(column.strip().upper(), column))
+    missing = [column for column in COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(missing)}")
+
+    df = df[COLUMNS].apply(lambda col: col.str.strip())
+    df['data'] = parse_dates(df['data'])
+    for column in VALUE_COLUMNS:
+        df[column] = parse_decimal(df[column])
+
+    checks = [
+        (df['data'].notna(), 'data inválida'),
+        (df['reg_ans'].str.fullmatch(r'\d{1,20}'), 'reg_ans inválido'),
+        (df['cd_conta_contabil'] != '', 'cd_conta_contabil vazio'),
+        (df['descricao'] != '', 'descricao vazia'),
+        (df['vl_saldo_inicial'].notna(), 'vl_saldo_inicial inválido'),
+        (df['vl_saldo_final'].notna(), 'vl_saldo_final inválido'),
+    ]
+    errors = pd.Series('', index=df.index, dtype=object)
+    for valid, message in checks:
+        invalid = ~valid.fillna(False).astype(bool)
+        errors[invalid] = errors[invalid] + message + '; '
+
+    bad = errors != ''
+    return df[~bad], df[bad].assign(erros=errors[bad].str.rstrip('; '))
+
+
+def file_checksum(path):
+    """SHA-256 do arquivo, lido em blocos, e a codificação detectada no caminho
+
+    Os arquivos da ANS chegam em UTF-8 ou em Latin-1; se algum bloco não for
+    UTF-8 válido, o arquivo é lido como Latin-1.
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    encoding = 'utf-8-sig'
+    with open(path, 'rb') as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+            if encoding != 'latin-1':
+                try:
+                    decoder.decode(block)
+                except UnicodeDecodeError:
+                    encoding = 'latin-1'
+    return digest.hexdigest(), encoding
+
+
+def read_contabeis(path, encoding, chunk_size=CHUNK_SIZE):
+    """Lê o CSV em blocos; cada bloco guarda na coluna 'linha' a linha do arquivo"""
+    reader = pd.read_csv(
+        path, sep=';', encoding=encoding, dtype=str, keep_default_na=False, chunksize=chunk_size
+    )
+    for chunk in reader:
+        chunk.insert(0, 'linha', chunk.index + 2)
+        yield chunk
+
+
+def partition_name(quarter):
+    """Partição do trimestre: 2023-04-01 -> demonstracoes_contabeis_2023q2"""
+    return f"demonstracoes_contabeis_{quarter.year}q{(quarter.month - 1) // 3 + 1}"
+
+
+def discover_files(data_dir=DATA_DIR, years=None):
+    """CSVs trimestrais em <data_dir>/<ano>/, opcionalmente só dos anos informados"""
+    paths = []
+    for year_dir in sorted(Path(data_dir).iterdir()):
+        if year_dir.is_dir() and (years is None or year_dir.name in {str(year) for year in years}):
+            paths.extend(sorted(year_dir.glob('*.csv')))
+    return paths
+
+
+class ContabeisIngestion:
+    """Carrega os CSVs de demonstrações contábeis em paralelo, um arquivo por transação
+
+    - Cada arquivo é lido em blocos e validado no caminho; os valores no formato
+      brasileiro são convertidos antes de chegar ao banco.
+    - Os arquivos já carregados ficam registrados em ingested_files pelo SHA-256
+      do conteúdo: uma nova execução os ignora, mesmo renomeados.
+    - No PostgreSQL, os blocos vão com COPY para uma tabela temporária e um único
+      INSERT ... ON CONFLICT os move para a partição do trimestre, criada se preciso.
+    - reload_quarter substitui um trimestre inteiro: a nova partição é carregada
+      à parte e trocada pela atual com DETACH/ATTACH.
+    - Na mesma transação, os totais de despesas_trimestrais dos trimestres do
+      arquivo são recalculados (rollups.refresh_quarters).
+    - Um arquivo com erro é desfeito sozinho: os demais continuam carregando.
+    """
+
+    def __init__(self, database_url, workers=4, chunk_size=CHUNK_SIZE, bad_rows_dir=None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.bad_rows_dir = Path(bad_rows_dir) if bad_rows_dir else None
+        # Cada worker usa uma conexão para o arquivo e, no PostgreSQL, outra
+        # para criar partições
+        self.engine = create_engine(database_url, pool_size=workers, max_overflow=workers, pool_pre_ping=True)
+        self.dialect = self.engine.dialect.name
+
+    def ensure_schema(self):
+        if self.dialect == 'postgresql':
+            # demonstracoes_contabeis, particionada, vem de sql/create_tables.sql;
+            # a de bancos criados antes do particionamento é convertida aqui
+            with self.engine.begin() as connection:
+                migrate_to_partitions(connection)
+            metadata.create_all(self.engine, tables=[despesas_trimestrais, ingested_files])
+        else:
+            metadata.create_all(self.engine)
+
+    def ingest(self, paths):
+        """Carrega os arquivos com até workers em paralelo; retorna um FileReport por arquivo"""
+        self.ensure_schema()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            reports = list(executor.map(self.ingest_file, paths))
+
+        by_status = {status: sum(r.status == status for r in reports) for status in ('carregado', 'ignorado', 'falhou')}
+        log.info(
+            f"{by_status['carregado']} arquivos carregados, {by_status['ignorado']} ignorados e "
+            f"{by_status['falhou']} com erro; {sum(r.loaded for r in reports)} linhas em "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+        return reports
+
+    def ingest_file(self, path):
+        path = Path(path)
+        report = FileReport(str(path))
+        start = time.perf_counter()
+        try:
+            report.checksum, encoding = file_checksum(path)
+            if self._already_loaded(report.checksum):
+                report.status = 'ignorado'
+                log.info(f"{path.name} já carregado, ignorando")
+                return report
+
+            quarters = set()
+            with self.engine.begin() as connection:
+                if self.dialect == 'postgresql':
+                    self._load_postgres(connection, path, encoding, report, quarters)
+                else:
+                    self._load_generic(connection, path, encoding, report, quarters)
+                refresh_quarters(connection, quarters)
+                connection.execute(insert(ingested_files).values(
+                    checksum=report.checksum, file_name=path.name, rows=report.loaded
+                ))
+            report.status = 'carregado'
+            log.success(f"{path.name}: {report.loaded} linhas carregadas, {report.rejected} rejeitadas")
+        except Exception as e:
+            report.status = 'falhou'
+            report.error = str(e)
+            log.error(f"Erro ao carregar {path.name}: {str(e)}")
+        finally:
+            report.seconds = time.perf_counter() - start
+        return report
+
+    def reload_quarter(self, path):
+        """Substitui todos os dados de um trimestre pelos do arquivo, que deve conter só esse trimestre"""
+        self.ensure_schema()
+        path = Path(path)
+        report = FileReport(str(path))
+        start = time.perf_counter()
+        try:
+            report.checksum, encoding = file_checksum(path)
+            quarters = set()
+            with self.engine.begin() as connection:
+                if self.dialect == 'postgresql':
+                    self._reload_postgres(connection, path, encoding, report, quarters)
+                else:
+                    self._reload_generic(connection, path, encoding, report, quarters)
+                refresh_quarters(connection, quarters)
+                connection.execute(ingested_files.delete().where(ingested_files.c.checksum == report.checksum))
+                connection.execute(insert(ingested_files).values(
+                    checksum=report.checksum, file_name=path.name, rows=report.loaded
+                ))
+            report.status = 'carregado'
+            log.success(f"{path.name}: trimestre recarregado com {report.loaded} linhas")
+        except Exception as e:
+            report.status = 'falhou'
+            report.error = str(e)
+            log.error(f"Erro ao recarregar {path.name}: {str(e)}")
+        finally:
+            report.seconds = time.perf_counter() - start
+        return report
+
+    def _already_loaded(self, checksum):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(ingested_files.c.checksum).where(ingested_files.c.checksum == checksum)
+            ).first() is not None
+
+    def _chunks(self, path, encoding, report, quarters):
+        """Blocos válidos do arquivo, com a coluna 'linha'; registra as linhas rejeitadas e os trimestres"""
+        rejected = []
+        for chunk in read_contabeis(path, encoding, self.chunk_size):
+            lines = chunk.pop('linha')
+            valid, bad = normalize_chunk(chunk)
+            if not bad.empty:
+                rejected.append(bad.assign(linha=lines[bad.index]))
+            if not valid.empty:
+                quarters.update(quarter_start(date.fromisoformat(value)) for value in valid['data'].unique())
+                yield valid.assign(linha=lines[valid.index])
+        if rejected:
+            self._report_bad_rows(path, pd.concat(rejected), report)
+
+    def _report_bad_rows(self, path, bad_rows, report):
+        report.rejected += len(bad_rows)
+        for row in bad_rows.head(3).itertuples():
+            log.warning(f"{path.name}, linha {row.linha}: {row.erros}")
+        if self.bad_rows_dir:
+            self.bad_rows_dir.mkdir(parents=True, exist_ok=True)
+            bad_rows.to_csv(self.bad_rows_dir / f"{path.stem}_rejeitadas.csv", sep=';', index=False)
+
+    def _upsert_sql(self, connection):
+        placeholder = PLACEHOLDERS[connection.dialect.paramstyle]
+        columns = ", ".join(COLUMNS)
+        values = ", ".join([placeholder] * len(COLUMNS))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in COLUMNS if column not in KEY_COLUMNS)
+        return (
+            f"INSERT INTO demonstracoes_contabeis ({columns}) VALUES ({values}) "
+            f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}"
+        )
+
+    def _load_generic(self, connection, path, encoding, report, quarters):
+        # A própria transação do arquivo faz o papel da área de staging
+        sql = self._upsert_sql(connection)
+        for chunk in self._chunks(path, encoding, report, quarters):
+            connection.exec_driver_sql(sql, list(chunk[COLUMNS].itertuples(index=False, name=None)))
+            report.loaded += len(chunk)
+
+    def _reload_generic(self, connection, path, encoding, report, quarters):
+        # Sem partições: apaga o trimestre e insere o arquivo na mesma transação
+        sql = self._upsert_sql(connection)
+        for chunk in self._chunks(path, encoding, report, quarters):
+            if report.loaded == 0:
+                quarter = min(quarters)
+                connection.execute(
+                    text("DELETE FROM demonstracoes_contabeis WHERE data >= :inicio AND data < :fim"),
+                    {"inicio": quarter.isoformat(), "fim": next_quarter(quarter).isoformat()}
+                )
+            connection.exec_driver_sql(sql, list(chunk[COLUMNS].itertuples(index=False, name=None)))
+            report.loaded += len(chunk)
+        _single_quarter(path, quarters)
+
+    def _stage_postgres(self, cursor, path, encoding, report, quarters):
+        """Envia o arquivo com COPY para a tabela temporária contabeis_staging"""
+        cursor.execute("DROP TABLE IF EXISTS contabeis_staging")
+        cursor.execute(
+            "CREATE TEMP TABLE contabeis_staging (data DATE, reg_ans TEXT, cd_conta_contabil TEXT, "
+            "descricao TEXT, vl_saldo_inicial NUMERIC(15,2), vl_saldo_final NUMERIC(15,2), linha BIGINT) "
+            "ON COMMIT DROP"
+        )
+        copy_sql = f"COPY contabeis_staging ({', '.join(COLUMNS)}, linha) FROM STDIN WITH (FORMAT csv)"
+        for chunk in self._chunks(path, encoding, report, quarters):
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, header=False, index=False, quoting=csv.QUOTE_MINIMAL)
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+
+        # Linhas de operadoras fora do cadastro violariam a chave estrangeira
+        cursor.execute(
+            "SELECT count(*) FROM contabeis_staging s WHERE NOT EXISTS "
+            "(SELECT 1 FROM operadoras o WHERE o.registro_ans = s.reg_ans)"
+        )
+        unknown = cursor.fetchone()[0]
+        if unknown:
+            log.warning(f"{path.name}: {unknown} linhas de operadoras fora do cadastro ignoradas")
+            report.rejected += unknown
+
+    def _merge_staging(self, cursor, target):
+        # Se a mesma chave aparecer mais de uma vez, vale a última linha do arquivo
+        columns = ", ".join(COLUMNS)
+        keys = ", ".join(KEY_COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS if column not in KEY_COLUMNS)
+        cursor.execute(
+            f"INSERT INTO {target} ({columns}) "
+            f"SELECT DISTINCT ON ({keys}) {columns} FROM contabeis_staging s "
+            f"WHERE EXISTS (SELECT 1 FROM operadoras o WHERE o.registro_ans = s.reg_ans) "
+            f"ORDER BY {keys}, linha DESC "
+            f"ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+        )
+        return cursor.rowcount
+
+    def _load_postgres(self, connection, path, encoding, report, quarters):
+        cursor = connection.connection.driver_connection.cursor()
+        self._stage_postgres(cursor, path, encoding, report, quarters)
+        self._ensure_partitions(quarters)
+        report.loaded = self._merge_staging(cursor, "demonstracoes_contabeis")
+        cursor.close()
+
+    def _reload_postgres(self, connection, path, encoding, report, quarters):
+        """Carrega o trimestre em uma tabela nova e a troca pela partição atual
+
+        A carga não bloqueia demonstracoes_contabeis; o bloqueio exclusivo fica
+        restrito ao DETACH/ATTACH no fim. A restrição CHECK com os limites do
+        trimestre dispensa a varredura de validação do ATTACH.
+        """
+        cursor = connection.connection.driver_connection.cursor()
+        self._stage_postgres(cursor, path, encoding, report, quarters)
+        quarter = _single_quarter(path, quarters)
+        name = partition_name(quarter)
+        new = f"{name}_novo"
+        start, end = quarter.isoformat(), next_quarter(quarter).isoformat()
+
+        cursor.execute(f"DROP TABLE IF EXISTS {new}")
+        cursor.execute(f"CREATE TABLE {new} (LIKE demonstracoes_contabeis INCLUDING ALL)")
+        cursor.execute(f"ALTER TABLE {new} ADD CONSTRAINT {new}_limites CHECK (data >= '{start}' AND data < '{end}')")
+        report.loaded = self._merge_staging(cursor, new)
+
+        # Serializa com a criação de partições dos outros workers
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext('demonstracoes_contabeis'))")
+        cursor.execute("SELECT to_regclass(%s)", (name,))
+        if cursor.fetchone()[0] is not None:
+            cursor.execute(f"ALTER TABLE demonstracoes_contabeis DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        cursor.execute(
+            f"ALTER TABLE demonstracoes_contabeis ATTACH PARTITION {new} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        cursor.execute(f"ALTER TABLE {new} RENAME TO {name}")
+        cursor.execute(f"ALTER TABLE {name} DROP CONSTRAINT {new}_limites")
+        # Os índices criados pelo LIKE levam o nome da tabela nova
+        cursor.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass", (name,))
+        for (index,) in cursor.fetchall():
+            if index.startswith(new):
+                cursor.execute(f"ALTER INDEX {index} RENAME TO {name}{index[len(new):]}")
+        cursor.close()
+
+    def _ensure_partitions(self, quarters):
+        """Cria as partições trimestrais que faltam, em uma transação curta e separada
+
+        Criar uma partição bloqueia a tabela pai; fazê-lo antes do INSERT do
+        arquivo, e não dentro da transação dele, evita deadlocks entre os workers.
+        """
+        with self.engine.begin() as connection:
+            missing = [
+                quarter for quarter in sorted(quarters)
+                if connection.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(quarter)}).scalar()
+                is None
+            ]
+            if not missing:
+                return
+            # Serializa a criação entre os workers
+            connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('demonstracoes_contabeis'))"))
+            for quarter in missing:
+                connection.exec_driver_sql(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(quarter)} "
+                    f"PARTITION OF demonstracoes_contabeis "
+                    f"FOR VALUES FROM ('{quarter.isoformat()}') TO ('{next_quarter(quarter).isoformat()}')"
+                )
+
+
+def migrate_to_partitions(connection):
+    """Converte uma demonstracoes_contabeis sem partições na tabela particionada por trimestre
+
+    Bancos criados antes do particionamento têm uma tabela comum, em que o
+    DETACH/ATTACH de reload_quarter falharia. A tabela antiga é renomeada, a
+    nova é criada com as mesmas colunas e uma partição por trimestre dos dados,
+    e as linhas são copiadas, tudo na transação de connection: se algo falhar,
+    a tabela antiga continua como estava. Retorna as linhas migradas, ou None
+    se a tabela já for particionada (ou não existir).
+    """
+    kind_query = text("SELECT relkind FROM pg_class WHERE oid = to_regclass('demonstracoes_contabeis')")
+    if connection.execute(kind_query).scalar() != 'r':
+        return None
+    # Outro processo pode ter migrado enquanto este esperava o bloqueio
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('demonstracoes_contabeis'))"))
+    if connection.execute(kind_query).scalar() != 'r':
+        return None
+
+    log.warning("demonstracoes_contabeis sem partições: migrando para a tabela particionada por trimestre")
+    legacy = "demonstracoes_contabeis_legado"
+    connection.exec_driver_sql(f"ALTER TABLE demonstracoes_contabeis RENAME TO {legacy}")
+    connection.exec_driver_sql(
+        f"CREATE TABLE demonstracoes_contabeis (LIKE {legacy} INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"PARTITION BY RANGE (data)"
+    )
+    quarters = connection.exec_driver_sql(
+        f"SELECT DISTINCT date_trunc('quarter', data)::date FROM {legacy}"
+    ).scalars().all()
+    for quarter in sorted(quarters):
+        connection.exec_driver_sql(
+            f"CREATE TABLE {partition_name(quarter)} PARTITION OF demonstracoes_contabeis "
+            f"FOR VALUES FROM ('{quarter.isoformat()}') TO ('{next_quarter(quarter).isoformat()}')"
+        )
+    columns = ", ".join(COLUMNS)
+    rows = connection.exec_driver_sql(
+        f"INSERT INTO demonstracoes_contabeis ({columns}) SELECT {columns} FROM {legacy}"
+    ).rowcount
+    # A chave primária e os índices são criados depois da remoção da tabela
+    # antiga, que ainda usa os mesmos nomes
+    connection.exec_driver_sql(f"DROP TABLE {legacy}")
+    connection.exec_driver_sql("ALTER TABLE demonstracoes_contabeis ADD PRIMARY KEY (data, reg_ans, cd_conta_contabil)")
+    connection.exec_driver_sql(
+        "ALTER TABLE demonstracoes_contabeis ADD FOREIGN KEY (reg_ans) REFERENCES operadoras(registro_ans)"
+    )
+    connection.exec_driver_sql("CREATE INDEX ON demonstracoes_contabeis(reg_ans)")
+    connection.exec_driver_sql("CREATE INDEX ON demonstracoes_contabeis(data)")
+    log.success(f"demonstracoes_contabeis migrada: {rows} linhas em {len(quarters)} partições")
+    return rows
+
+
+def _single_quarter(path, quarters):
+    if len(quarters) != 1:
+        raise ValueError(f"{path.name} deve conter exatamente um trimestre, encontrados {len(quarters)}")
+    return next(iter(quarters))
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from loguru import logger as log
+from database.ingestion.contabeis import DATA_DIR, ContabeisIngestion, discover_files
+from database.ingestion.rollups import rebuild_rollups
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carrega as demonstrações contábeis da ANS no banco")
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--years', default="2023,2024", help="anos separados por vírgula")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--database-url', default=os.environ.get("DATABASE_URL"))
+    parser.add_argument('--bad-rows-dir', help="grava aqui as linhas rejeitadas de cada arquivo")
+    parser.add_argument('--reload', metavar='ARQUIVO',
+                        help="substitui o trimestre do arquivo inteiro pelos dados dele")
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help="recalcula despesas_trimestrais para todos os trimestres já carregados")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        log.error("Informe --database-url ou a variável DATABASE_URL")
+        sys.exit(1)
+
+    if args.reload:
+        report = ContabeisIngestion(args.database_url).reload_quarter(args.reload)
+        sys.exit(0 if report.status == 'carregado' else 1)
+
+    if args.rebuild_rollups:
+        ingestion = ContabeisIngestion(args.database_url)
+        ingestion.ensure_schema()
+        with ingestion.engine.begin() as connection:
+            quarters = rebuild_rollups(connection)
+        log.success(f"Totais recalculados para {len(quarters)} trimestres")
+        sys.exit(0)
+
+    paths = discover_files(args.data_dir, args.years.split(","))
+    if not paths:
+        log.error(f"Nenhum CSV encontrado em {args.data_dir} para os anos {args.years}")
+        sys.exit(1)
+
+    log.info(f"Iniciando a carga de {len(paths)} arquivos com {args.workers} workers")
+    ingestion = ContabeisIngestion(args.database_url, workers=args.workers, bad_rows_dir=args.bad_rows_dir)
+    reports = ingestion.ingest(paths)
+    # Os arquivos com erro não interrompem os demais, mas a execução termina com erro
+    sys.exit(1 if any(report.status == 'falhou' for report in reports) else 0)
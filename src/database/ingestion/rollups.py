@@ -0,0 +1,59 @@
+from datetime import date
+from sqlalchemy import Date, bindparam, text
+
+# Totais por operadora, conta e trimestre, mantidos pela ingestão. Os
+# relatórios de maiores despesas leem estes totais em vez de agregar
+# demonstracoes_contabeis a cada execução
+REFRESH_DELETE = text(
+    "DELETE FROM despesas_trimestrais WHERE trimestre = :trimestre"
+).bindparams(bindparam('trimestre', type_=Date))
+
+REFRESH_INSERT = text(
+    "INSERT INTO despesas_trimestrais "
+    "(trimestre, reg_ans, cd_conta_contabil, descricao, total, linhas) "
+    "SELECT :trimestre, reg_ans, cd_conta_contabil, max(descricao), "
+    "sum(vl_saldo_final - vl_saldo_inicial), count(*) "
+    "FROM demonstracoes_contabeis WHERE data >= :inicio AND data < :fim "
+    "GROUP BY reg_ans, cd_conta_contabil"
+).bindparams(
+    bindparam('trimestre', type_=Date), bindparam('inicio', type_=Date), bindparam('fim', type_=Date)
+)
+
+
+def quarter_start(value):
+    """Primeiro dia do trimestre: 2023-05-17 -> 2023-04-01"""
+    return date(value.year, (value.month - 1) // 3 * 3 + 1, 1)
+
+
+def next_quarter(value):
+    month = value.month + 3
+    return date(value.year + (month > 12), (month - 1) % 12 + 1, 1)
+
+
+def refresh_quarters(connection, quarters):
+    """Recalcula os totais dos trimestres informados, na transação de connection
+
+    Só os trimestres alterados pela carga são recalculados; no PostgreSQL, a
+    consulta fica restrita às partições desses trimestres.
+    """
+    for trimestre in sorted(quarters):
+        if connection.dialect.name == 'postgresql':
+            # Dois arquivos do mesmo trimestre carregados em paralelo recalculam
+            # um após o outro; o segundo já enxerga os dados do primeiro
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext('despesas_trimestrais'), :chave)"),
+                {"chave": trimestre.year * 10 + trimestre.month}
+            )
+        connection.execute(REFRESH_DELETE, {"trimestre": trimestre})
+        connection.execute(REFRESH_INSERT, {
+            "trimestre": trimestre, "inicio": trimestre, "fim": next_quarter(trimestre)
+        })
+
+
+def rebuild_rollups(connection):
+    """Recalcula todos os trimestres presentes em demonstracoes_contabeis"""
+    dates = connection.execute(text("SELECT DISTINCT data FROM demonstracoes_contabeis")).scalars()
+    quarters = {quarter_start(value if isinstance(value, date) else date.fromisoformat(value)) for value in dates}
+    connection.execute(text("DELETE FROM despesas_trimestrais"))
+    refresh_quarters(connection, quarters)
+    return sorted(quarters)
@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine, text
+from datetime import date
+from database.ingestion.contabeis import (
+    ContabeisIngestion, discover_files, file_checksum, normalize_chunk, parse_decimal, partition_name
+)
+from database.ingestion.rollups import rebuild_rollups
+
+HEADER = "DATA;REG_ANS;CD_CONTA_CONTABIL;DESCRICAO;VL_SALDO_INICIAL;VL_SALDO_FINAL\n"
+
+
+def quarter_csv(quarter, operators=3, accounts=4):
+    lines = [HEADER]
+    for reg in range(operators):
+        for account in range(accounts):
+            lines.append(
+                f'"{quarter}";"{419000 + reg}";"4{account}11";"CONTA {account}";'
+                f'"1.234,5{account}";"{reg}0,00"\n'
+            )
+    return "".join(lines)
+
+
+class TestNormalize(unittest.TestCase):
+    def test_parse_decimal(self):
+        """Testa a conversão do formato brasileiro sem perder precisão"""
+        values = pd.Series(["1.234,56", "-0,01", "1234.5", "12.345.678,90", "abc", ""])
+        self.assertEqual(
+            parse_decimal(values).tolist()[:4], ["1234.56", "-0.01", "1234.5", "12345678.90"]
+        )
+        self.assertTrue(parse_decimal(values)[4:].isna().all())
+
+    def test_normalize_chunk(self):
+        """Testa a validação linha a linha e as datas nos dois formatos"""
+        df = pd.DataFrame({
+            'DATA': ["2023-01-01", "01/04/2023", "2023-13-01"],
+            'REG_ANS': ["419761", "419762", "X"],
+            'CD_CONTA_CONTABIL': ["411", "412", "413"],
+            'DESCRICAO': ["A", "B", "C"],
+            'VL_SALDO_INICIAL': ["1,00", "2,00", "3,00"],
+            'VL_SALDO_FINAL': ["1,50", "oops", "3,50"],
+        })
+        valid, rejected = normalize_chunk(df)
+        self.assertEqual(valid['data'].tolist(), ["2023-01-01"])
+        self.assertEqual(rejected['erros'].tolist(), [
+            "vl_saldo_final inválido", "data inválida; reg_ans inválido"
+        ])
+
+
+class TestContabeisIngestion(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.tmp_dir, "arquivos")
+        for year in ("2023", "2024"):
+            os.makedirs(os.path.join(self.data_dir, year))
+            for quarter, month in ((1, "01"), (2, "04")):
+                path = os.path.join(self.data_dir, year, f"{quarter}T{year}.csv")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(quarter_csv(f"{year}-{month}-01"))
+        self.url = f"sqlite:///{os.path.join(self.tmp_dir, 'contabeis.db')}"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _count(self, sql="SELECT count(*) FROM demonstracoes_contabeis"):
+        with create_engine(self.url).connect() as connection:
+            return connection.execute(text(sql)).scalar()
+
+    def test_ingest_and_skip_loaded_files(self):
+        """Testa a carga paralela e se uma nova execução ignora os arquivos já carregados"""
+        paths = discover_files(self.data_dir)
+        self.assertEqual(len(paths), 4)
+        reports = ContabeisIngestion(self.url, workers=2).ingest(paths)
+        self.assertEqual([r.status for r in reports], ["carregado"] * 4)
+        self.assertEqual(self._count(), 48)
+        self.assertAlmostEqual(self._count("SELECT sum(vl_saldo_inicial) FROM demonstracoes_contabeis"), 59256.72)
+
+        reports = ContabeisIngestion(self.url, workers=2).ingest(paths)
+        self.assertEqual([r.status for r in reports], ["ignorado"] * 4)
+        self.assertEqual(self._count("SELECT count(*) FROM ingested_files"), 4)
+
+    def test_failed_file_does_not_affect_others(self):
+        """Testa se um arquivo com erro é desfeito sozinho e carregado na próxima execução"""
+        broken = os.path.join(self.data_dir, "2024", "2T2024.csv")
+        with open(broken, "w", encoding="utf-8") as f:
+            f.write("DATA;REG_ANS\n2024-04-01;419000\n")
+        reports = ContabeisIngestion(self.url, workers=2).ingest(discover_files(self.data_dir))
+        self.assertEqual([r.status for r in reports], ["carregado"] * 3 + ["falhou"])
+        self.assertEqual(self._count(), 36)
+
+        with open(broken, "w", encoding="utf-8") as f:
+            f.write(quarter_csv("2024-04-01"))
+        reports = ContabeisIngestion(self.url).ingest(discover_files(self.data_dir))
+        self.assertEqual([r.status for r in reports], ["ignorado"] * 3 + ["carregado"])
+        self.assertEqual(self._count(), 48)
+
+    def test_rollups_refreshed_by_ingestion(self):
+        """Testa se os totais por trimestre acompanham cada arquivo carregado"""
+        ingestion = ContabeisIngestion(self.url, workers=2)
+        ingestion.ingest(discover_files(self.data_dir))
+        # 4 trimestres x 3 operadoras x 4 contas; saldo final - inicial da operadora 1, conta 0
+        self.assertEqual(self._count("SELECT count(*) FROM despesas_trimestrais"), 48)
+        total = ("SELECT total FROM despesas_trimestrais WHERE trimestre = '2024-04-01' "
+                 "AND reg_ans = '419001' AND cd_conta_contabil = '4011'")
+        self.assertAlmostEqual(self._count(total), 10 - 1234.5)
+
+        # Um arquivo novo do mesmo trimestre recalcula só esse trimestre
+        path = os.path.join(self.tmp_dir, "retificacao.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER + '"2024-04-01";"419001";"4011";"CONTA 0";"0,00";"2.000,00"\n')
+        ingestion.ingest([path])
+        self.assertAlmostEqual(self._count(total), 2000)
+        self.assertEqual(self._count("SELECT count(*) FROM despesas_trimestrais"), 48)
+
+        with ingestion.engine.begin() as connection:
+            self.assertEqual(len(rebuild_rollups(connection)), 4)
+        self.assertAlmostEqual(self._count(total), 2000)
+
+    def test_reload_quarter(self):
+        """Testa a substituição de um trimestre inteiro, sem tocar nos demais"""
+        ingestion = ContabeisIngestion(self.url, workers=2)
+        ingestion.ingest(discover_files(self.data_dir))
+        path = os.path.join(self.tmp_dir, "2T2023_retificado.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER + '"2023-04-01";"419001";"4011";"CONTA 0";"0,00";"1,00"\n')
+        report = ingestion.reload_quarter(path)
+        self.assertEqual((report.status, report.loaded), ("carregado", 1))
+        self.assertEqual(self._count("SELECT count(*) FROM demonstracoes_contabeis WHERE data = '2023-04-01'"), 1)
+        self.assertEqual(self._count(), 37)
+        self.assertEqual(self._count("SELECT count(*) FROM despesas_trimestrais WHERE trimestre = '2023-04-01'"), 1)
+
+        # Um arquivo com mais de um trimestre é recusado e nada muda
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('"2023-07-01";"419001";"4011";"CONTA 0";"0,00";"1,00"\n')
+        self.assertEqual(ingestion.reload_quarter(path).status, "falhou")
+        self.assertEqual(self._count(), 37)
+
+    def test_partition_name(self):
+        """Testa o nome da partição de cada trimestre"""
+        self.assertEqual(partition_name(date(2023, 4, 1)), "demonstracoes_contabeis_2023q2")
+        self.assertEqual(partition_name(date(2024, 12, 1)), "demonstracoes_contabeis_2024q4")
+
+    def test_latin1_and_rejected_rows(self):
+        """Testa arquivos em Latin-1 e o relatório das linhas rejeitadas"""
+        path = os.path.join(self.tmp_dir, "latin1.csv")
+        with open(path, "w", encoding="latin-1") as f:
+            f.write(HEADER + '"2023-01-01";"419761";"411";"ASSISTÊNCIA";"1,00";"2,00"\n'
+                    '"2023-01-01";"419761";"412";"SAÚDE";"x";"2,00"\n')
+        self.assertEqual(file_checksum(path)[1], "latin-1")
+        bad_rows_dir = os.path.join(self.tmp_dir, "rejeitadas")
+        report = ContabeisIngestion(self.url, bad_rows_dir=bad_rows_dir).ingest([path])[0]
+        self.assertEqual((report.loaded, report.rejected), (1, 1))
+        self.assertEqual(self._count("SELECT descricao FROM demonstracoes_contabeis"), "ASSISTÊNCIA")
+        self.assertTrue(os.path.exists(os.path.join(bad_rows_dir, "latin1_rejeitadas.csv")))
+
+
+if __name__ == "__main__":
+    unittest.main()
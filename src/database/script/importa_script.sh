@@ -22,6 +22,13 @@
 #       - Versão inicial do script de importação
 #       - Implementação das funções básicas de importação
 #
+#    v1.1, Erick Farias:
+#       - Demonstrações contábeis carregadas pelo serviço Python de ingestão
+#         (database/ingestion): arquivos em paralelo, valores no formato
+#         brasileiro convertidos, arquivos já carregados ignorados
+#       - Banco padrão ans_db, o mesmo do backend; DATABASE_URL define o
+#         banco das operadoras e das demonstrações contábeis
+#
 # ------------------------------------------------------------------------ #
 # Testado em:
 #   - bash 4.4.19
@@ -35,8 +42,11 @@
 SCRIPT_DIR=$(dirname "$0")
 PROJECT_ROOT=$(cd "$SCRIPT_DIR/../../.." && pwd)
 DATA_DIR="${PROJECT_ROOT}/src/database/arquivos"
-DB_NAME="my_pgdb"
+# Mesmo banco padrão do backend (app/database.py), que lê as operadoras e os
+# totais de despesas_trimestrais; DATABASE_URL vale para as duas cargas
+DB_NAME="ans_db"
 DB_USER="postgres"
+DATABASE_URL="${DATABASE_URL:-postgresql://${DB_USER}@localhost:5432/${DB_NAME}}"
 
 # ------------------------------------------------------------------------ #
 
@@ -81,20 +91,13 @@ main() {
 
     # Importa dados cadastrais das operadoras
     echo "Importando dados das operadoras..."
-    psql -U "${DB_USER}" -d "${DB_NAME}" -c "\copy operadoras FROM '${DATA_DIR}/operadoras.csv' DELIMITER ';' CSV HEADER ENCODING 'UTF8'"
+    psql "${DATABASE_URL}" -c "\copy operadoras FROM '${DATA_DIR}/operadoras.csv' DELIMITER ';' CSV HEADER ENCODING 'UTF8'"
 
-    # Processa arquivos contábeis por ano
-    for year in 2023 2024; do
-        echo "Processando ano: ${year}..."
-        for file in "${DATA_DIR}/${year}/"*.csv; do
-            if [ -f "$file" ]; then
-                echo "Importando: $(basename "$file")"
-                psql -U "${DB_USER}" -d "${DB_NAME}" -c "\copy demonstracoes_contabeis(data, reg_ans, cd_conta_contabil, descricao, vl_saldo_inicial, vl_saldo_final) FROM '${file}' DELIMITER ';' CSV HEADER ENCODING 'UTF8'"
-            else
-                echo "Aviso: Nenhum arquivo CSV encontrado em ${DATA_DIR}/${year}"
-            fi
-        done
-    done
+    # Carrega os arquivos contábeis de 2023 e 2024; cada arquivo é uma transação
+    # e os já carregados (pelo checksum) são ignorados
+    echo "Importando demonstrações contábeis..."
+    python "${PROJECT_ROOT}/src/database/ingestion/main.py" \
+        --data-dir "${DATA_DIR}" --years 2023,2024 --database-url "${DATABASE_URL}"
 
     echo "Importação concluída com sucesso!"
 }
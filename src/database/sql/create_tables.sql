@@ -34,7 +34,66 @@ CREATE TABLE demonstracoes_contabeis (
     ano INT GENERATED ALWAYS AS (EXTRACT(YEAR FROM data)) STORED,
     mes INT GENERATED ALWAYS AS (EXTRACT(MONTH FROM data)) STORED,
     PRIMARY KEY (data, reg_ans, cd_conta_contabil)
-);
+) PARTITION BY RANGE (data);
+
+-- Uma partição por trimestre (demonstracoes_contabeis_2023q1, ...). As consultas
+-- por período leem só as partições do intervalo; a ingestão (database/ingestion)
+-- cria as partições que faltam e recarrega um trimestre trocando a partição.
+-- Em bancos criados antes do particionamento, a ingestão converte a tabela
+-- existente (contabeis.migrate_to_partitions) antes da primeira carga
+DO $$
+DECLARE
+    inicio DATE;
+BEGIN
+    FOR inicio IN SELECT generate_series('2023-01-01'::date, '2024-10-01'::date, INTERVAL '3 months') LOOP
+        EXECUTE format(
+            'CREATE TABLE demonstracoes_contabeis_%sq%s PARTITION OF demonstracoes_contabeis '
+            'FOR VALUES FROM (%L) TO (%L)',
+            extract(year FROM inicio), extract(quarter FROM inicio), inicio, inicio + INTERVAL '3 months'
+        );
+    END LOOP;
+END $$;
 
 CREATE INDEX ON demonstracoes_contabeis(reg_ans);
-CREATE INDEX ON demonstracoes_contabeis(data);
\ No newline at end of file
+CREATE INDEX ON demonstracoes_contabeis(data);
+
+-- Totais por operadora, conta e trimestre, recalculados pela ingestão para os
+-- trimestres de cada arquivo carregado (database/ingestion/rollups.py)
+CREATE TABLE despesas_trimestrais (
+    trimestre DATE NOT NULL,
+    reg_ans VARCHAR(20) NOT NULL,
+    cd_conta_contabil VARCHAR(20) NOT NULL,
+    descricao VARCHAR(255) NOT NULL,
+    total NUMERIC(18,2) NOT NULL,
+    linhas INT NOT NULL,
+    PRIMARY KEY (trimestre, reg_ans, cd_conta_contabil)
+);
+
+CREATE INDEX ix_despesas_trimestrais_conta ON despesas_trimestrais(upper(descricao), trimestre) INCLUDE (reg_ans, total);
+
+-- Arquivos já carregados, pelo SHA-256 do conteúdo: novas execuções os ignoram
+CREATE TABLE ingested_files (
+    checksum CHAR(64) PRIMARY KEY,
+    file_name VARCHAR(255) NOT NULL,
+    rows INT NOT NULL,
+    loaded_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Atualizada incrementalmente pelo data_transformation (DatabaseSink)
+CREATE TABLE rol_procedimentos (
+    procedimento TEXT NOT NULL,
+    rn_alteracao TEXT NOT NULL,
+    ocorrencia INT NOT NULL,
+    vigencia TEXT,
+    od TEXT,
+    amb TEXT,
+    hco TEXT,
+    hso TEXT,
+    ref TEXT,
+    pac TEXT,
+    dut TEXT,
+    subgrupo TEXT,
+    grupo TEXT,
+    capitulo TEXT,
+    PRIMARY KEY (procedimento, rn_alteracao, ocorrencia)
+);
@@ -1,3 +1,6 @@
+-- As consultas leem os totais por trimestre de despesas_trimestrais, mantidos
+-- pela ingestão, em vez de agregar demonstracoes_contabeis inteira
+
 -- 10 maiores despesas no último trimestre completo
 WITH ultimo_trimestre AS (
     SELECT 
@@ -6,25 +9,49 @@ WITH ultimo_trimestre AS (
 )
 SELECT 
     o.razao_social,
-    SUM(d.vl_saldo_final - d.vl_saldo_inicial) AS total_despesas
-FROM demonstracoes_contabeis d
+    SUM(d.total) AS total_despesas
+FROM despesas_trimestrais d
 JOIN operadoras o ON d.reg_ans = o.registro_ans
-WHERE d.descricao ILIKE 'EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR'
-AND d.data BETWEEN (SELECT inicio FROM ultimo_trimestre) 
-                AND (SELECT fim FROM ultimo_trimestre)
+WHERE upper(d.descricao) = upper('EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR')
+AND d.trimestre BETWEEN (SELECT inicio FROM ultimo_trimestre) 
+                    AND (SELECT fim FROM ultimo_trimestre)
 GROUP BY o.razao_social
 ORDER BY total_despesas DESC
 LIMIT 10;
 
 
--- 10 maiores despesas no último ano
+-- 10 maiores despesas no último ano (de CURRENT_DATE - 1 ano a CURRENT_DATE,
+-- como na consulta original sobre demonstracoes_contabeis.data). Os totais de
+-- despesas_trimestrais cobrem trimestres inteiros, então só os trimestres
+-- inteiramente dentro da janela vêm deles. As pontas da janela, que caem no
+-- meio de um trimestre, são somadas de demonstracoes_contabeis pelo mesmo filtro
+-- de data de antes (só as partições dessas pontas são lidas)
+WITH janela AS (
+    SELECT
+        inicio,
+        fim,
+        (date_trunc('quarter', inicio - 1) + INTERVAL '3 months')::date AS primeiro_trimestre,
+        date_trunc('quarter', fim + 1)::date AS apos_ultimo_trimestre
+    FROM (SELECT (CURRENT_DATE - INTERVAL '1 year')::date AS inicio, CURRENT_DATE AS fim) periodo
+),
+totais AS (
+    SELECT d.reg_ans, d.total
+    FROM despesas_trimestrais d, janela j
+    WHERE upper(d.descricao) = upper('EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR')
+    AND d.trimestre >= j.primeiro_trimestre
+    AND d.trimestre < j.apos_ultimo_trimestre
+    UNION ALL
+    SELECT c.reg_ans, c.vl_saldo_final - c.vl_saldo_inicial
+    FROM demonstracoes_contabeis c, janela j
+    WHERE upper(c.descricao) = upper('EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR')
+    AND ((c.data >= j.inicio AND c.data < j.primeiro_trimestre)
+         OR (c.data >= j.apos_ultimo_trimestre AND c.data <= j.fim))
+)
 SELECT 
     o.razao_social,
-    SUM(d.vl_saldo_final - d.vl_saldo_inicial) AS total_despesas
-FROM demonstracoes_contabeis d
-JOIN operadoras o ON d.reg_ans = o.registro_ans
-WHERE d.descricao ILIKE 'EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR'
-AND d.data BETWEEN (CURRENT_DATE - INTERVAL '1 year') AND CURRENT_DATE
+    SUM(t.total) AS total_despesas
+FROM totais t
+JOIN operadoras o ON t.reg_ans = o.registro_ans
 GROUP BY o.razao_social
 ORDER BY total_despesas DESC
 LIMIT 10;
\ No newline at end of file
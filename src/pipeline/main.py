@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loguru import logger as log
+from database.ingestion.contabeis import DATA_DIR
+from pipeline.orchestrator import Orchestrator
+from pipeline.stages import ANS_URL, SRC_DIR, build_stages
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa o pipeline da ANS: download, transformação, compactação e carga no banco"
+    )
+    parser.add_argument('--url', default=ANS_URL)
+    parser.add_argument('--download-dir', default=str(SRC_DIR / "web_scraping" / "downloads"))
+    parser.add_argument('--output-dir', default=str(SRC_DIR / "output"))
+    parser.add_argument('--archive-dir', default=str(SRC_DIR / "web_scraping" / "output"))
+    parser.add_argument('--data-dir', default=str(DATA_DIR))
+    parser.add_argument('--years', default="2023,2024", help="anos das demonstrações contábeis")
+    parser.add_argument('--database-url', default=os.environ.get("DATABASE_URL"),
+                        help="sem banco, a carga das demonstrações contábeis é desativada")
+    parser.add_argument('--state', help="estado das etapas (padrão: <output-dir>/.pipeline_state.json)")
+    parser.add_argument('--workers', type=int, default=3, help="etapas executadas ao mesmo tempo")
+    parser.add_argument('--pdf-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--ingest-workers', type=int, default=4)
+    parser.add_argument('--layout-template', action='store_true',
+                        help="extrai o Anexo I pela grade de colunas aprendida nas primeiras páginas")
+    parser.add_argument('--offline', action='store_true', help="usa os anexos já baixados")
+    parser.add_argument('--force', action='append', default=[], metavar='ETAPA', help="refaz a etapa")
+    parser.add_argument('--from', dest='force_from', action='append', default=[], metavar='ETAPA',
+                        help="refaz a etapa e todas as que dependem dela")
+    args = parser.parse_args()
+
+    options = {
+        "url": args.url, "download_dir": Path(args.download_dir), "output_dir": Path(args.output_dir),
+        "archive_dir": Path(args.archive_dir), "data_dir": args.data_dir, "years": args.years.split(","),
+        "database_url": args.database_url, "pdf_workers": args.pdf_workers,
+        "ingest_workers": args.ingest_workers, "offline": args.offline,
+        "layout_template": args.layout_template,
+    }
+    orchestrator = Orchestrator(
+        build_stages(options), args.state or Path(args.output_dir) / ".pipeline_state.json",
+        workers=args.workers, options=options
+    )
+    unknown = [name for name in args.force + args.force_from if name not in orchestrator.stages]
+    if unknown:
+        log.error(f"Etapas inexistentes: {', '.join(unknown)}")
+        sys.exit(2)
+
+    results = orchestrator.run(force=args.force, force_from=args.force_from)
+    for result in results.values():
+        log.info(f"{result.name:>18}: {result.status} ({result.seconds:.1f}s)")
+    sys.exit(1 if any(result.status in ('falhou', 'bloqueado') for result in results.values()) else 0)
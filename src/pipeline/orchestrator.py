@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from loguru import logger as log
+
+HASH_BLOCK_SIZE = 1024 * 1024
+# Status em que os dependentes podem executar
+SUCCESS = ('executado', 'ignorado', 'desativado')
+
+
+@dataclass
+class Stage:
+    """Etapa do pipeline
+
+    run recebe o Context e retorna os caminhos dos arquivos gerados; uma
+    exceção marca a etapa como falha. inputs é uma lista de caminhos ou uma
+    função que a retorna (avaliada quando a etapa vai executar, depois das
+    dependências). Sem mudança nas entradas, nos params e nas saídas
+    registradas, a etapa não executa novamente; com always_run, executa
+    sempre (a verificação fica a cargo da própria etapa, como nos downloads
+    condicionais).
+    """
+    name: str
+    run: Callable
+    inputs: object = ()
+    deps: tuple = ()
+    params: dict = field(default_factory=dict)
+    always_run: bool = False
+    enabled: bool = True
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = 'pendente'  # executado, ignorado, falhou, bloqueado ou desativado
+    seconds: float = 0.0
+    outputs: list = field(default_factory=list)
+    error: str = None
+
+
+@dataclass
+class Context:
+    """Passado a cada etapa: resultados das dependências e opções da execução"""
+    results: dict
+    options: dict
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PipelineState:
+    """Estado persistido entre execuções: impressões digitais das etapas e dos arquivos
+
+    O SHA-256 de cada arquivo é reaproveitado enquanto tamanho e data de
+    modificação não mudarem, para não reler PDFs grandes a cada execução.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data = {"etapas": {}, "arquivos": {}}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding='utf-8'))
+            except ValueError:
+                log.warning(f"Estado do pipeline ilegível, ignorado: {self.path}")
+
+    def file_fingerprint(self, path):
+        path = Path(path)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            cached = self.data["arquivos"].get(key)
+        if cached and cached["tamanho"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        sha256 = file_sha256(path)
+        with self._lock:
+            self.data["arquivos"][key] = {"tamanho": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def stage(self, name):
+        with self._lock:
+            return self.data["etapas"].get(name)
+
+    def update_stage(self, name, entry):
+        with self._lock:
+            self.data["etapas"][name] = entry
+            self._save()
+
+    def _save(self):
+        # Gravação atômica: uma falha no meio não corrompe o estado anterior
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
+class Orchestrator:
+    def __init__(self, stages, state_path, workers=3, options=None):
+        """Executa as etapas em ordem topológica, com ramos independentes em paralelo
+
+        workers limita quantas etapas executam ao mesmo tempo. O estado de
+        cada etapa concluída é gravado assim que ela termina: após uma falha,
+        a próxima execução pula as etapas já concluídas (se nada mudou) e
+        retoma a partir da que falhou.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Etapa {stage.name} depende de etapas inexistentes: {', '.join(unknown)}")
+        self._check_cycles()
+        self.state = PipelineState(state_path)
+        self.workers = workers
+        self.options = options or {}
+
+    def _check_cycles(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependências na etapa {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def descendants(self, names):
+        """As etapas informadas e todas as que dependem delas, direta ou indiretamente"""
+        selected = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages.values():
+                if stage.name not in selected and selected.intersection(stage.deps):
+                    selected.add(stage.name)
+                    changed = True
+        return selected
+
+    def fingerprint(self, stage):
+        inputs = stage.inputs() if callable(stage.inputs) else stage.inputs
+        files = {str(path): self.state.file_fingerprint(path) for path in inputs}
+        encoded = json.dumps({"params": stage.params, "entradas": files}, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _up_to_date(self, stage, fingerprint):
+        previous = self.state.stage(stage.name)
+        if not previous or previous["status"] != 'executado' or previous["impressao"] != fingerprint:
+            return False
+        # Saídas removidas ou alteradas depois da execução também refazem a etapa
+        return all(self.state.file_fingerprint(path) == sha256 for path, sha256 in previous["saidas"].items())
+
+    def _execute(self, stage, results, forced):
+        result = StageResult(stage.name)
+        start = time.perf_counter()
+        try:
+            fingerprint = self.fingerprint(stage)
+            if not stage.always_run and stage.name not in forced and self._up_to_date(stage, fingerprint):
+                result.status = 'ignorado'
+                result.outputs = list(self.state.stage(stage.name)["saidas"])
+                log.info(f"{stage.name}: entradas sem alteração, etapa ignorada")
+                return result
+            log.info(f"{stage.name}: executando")
+            outputs = stage.run(Context(results, self.options)) or []
+            result.outputs = [str(path) for path in outputs]
+            result.status = 'executado'
+            # Recalculada após a execução: etapas sem dependências podem ter gerado as próprias entradas
+            self.state.update_stage(stage.name, {
+                "status": 'executado', "impressao": self.fingerprint(stage),
+                "saidas": {path: self.state.file_fingerprint(path) for path in result.outputs},
+                "concluido_em": datetime.now().isoformat(timespec="seconds"),
+            })
+            log.success(f"{stage.name}: concluída em {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            result.status = 'falhou'
+            result.error = str(e)
+            self.state.update_stage(stage.name, {
+                "status": 'falhou', "impressao": None, "saidas": {}, "erro": str(e),
+                "concluido_em": datetime.now().isoformat(timespec="seconds"),
+            })
+            log.error(f"Erro na etapa {stage.name}: {str(e)}")
+        finally:
+            result.seconds = time.perf_counter() - start
+        return result
+
+    def run(self, force=(), force_from=()):
+        """Executa o pipeline; retorna um StageResult por etapa, na ordem de término
+
+        force refaz as etapas informadas; force_from refaz também todas as que
+        dependem delas.
+        """
+        forced = set(force) | self.descendants(force_from)
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [results.get(dep) for dep in stage.deps]
+                    if any(dep is None for dep in deps):
+                        continue
+                    del pending[name]
+                    if any(dep.status not in SUCCESS for dep in deps):
+                        results[name] = StageResult(name, 'bloqueado')
+                        log.warning(f"{name}: bloqueada por falha em uma dependência")
+                    elif not stage.enabled:
+                        results[name] = StageResult(name, 'desativado')
+                    else:
+                        running[executor.submit(self._execute, stage, results, forced)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return results
@@ -0,0 +1,137 @@
+import os
+from pathlib import Path
+from pipeline.orchestrator import Stage
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+ANS_URL = "https://www.gov.br/ans/pt-br/acesso-a-informacao/participacao-da-sociedade/atualizacao-do-rol-de-procedimentos"
+YOUR_NAME = "ErickFernandesDeFariasSantos"
+
+
+def download_anexos(context):
+    """Baixa os anexos; o Downloader só transfere os arquivos alterados no servidor"""
+    from web_scraping.main import WebScraper
+
+    options = context.options
+    scraper = WebScraper(options["url"])
+    try:
+        # O Firefox só é iniciado se os links não estiverem no HTML estático
+        if not scraper.find_links_static() and not scraper.start_browser():
+            raise RuntimeError("não foi possível abrir a página dos anexos")
+        if not scraper.get_anexos(str(options["download_dir"])):
+            raise RuntimeError("falha no download dos anexos")
+    finally:
+        scraper.close_browser()
+    return [anexo_path(options, "Anexo_I.pdf"), anexo_path(options, "Anexo_II.pdf")]
+
+
+def transformer_options(options):
+    """Opções do ANSDataTransformer na etapa transform_anexo_i
+
+    São também os params da etapa: qualquer opção que mude as saídas precisa
+    estar aqui, para que a alteração refaça a etapa. A quantidade de processos
+    da extração não muda as saídas e fica de fora (é passada à parte).
+    """
+    output_dir = Path(options["output_dir"])
+    return {
+        "cache_dir": str(output_dir / ".page_cache"),
+        "columnar_formats": tuple(options.get("columnar_formats", ())),
+        "partition_by": options.get("partition_by"),
+        "codec": options.get("codec", "deflate"),
+        "keep_csv": options.get("keep_csv", True),
+        "database_url": os.environ.get("ROL_DATABASE_URL"),
+        "layout_template": options.get("layout_template", False),
+        "template_sample_pages": options.get("template_sample_pages", 3),
+    }
+
+
+def transform_anexo_i(context):
+    """Extrai, transforma e compacta a tabela do Anexo I"""
+    from data_transformation.Data_transformtion import ANSDataTransformer
+    from data_transformation.instrumentation import RunInstrumentation
+
+    options = context.options
+    output_dir = Path(options["output_dir"])
+    instrumentation = RunInstrumentation()
+    transformer = ANSDataTransformer(
+        anexo_path(options, "Anexo_I.pdf"), workers=options["pdf_workers"], instrumentation=instrumentation,
+        **transformer_options(options)
+    )
+    transformer.output_dir = str(output_dir)
+    csv_path = output_dir / "rol_procedimentos.csv"
+    before = set(output_dir.glob(f"Teste_{YOUR_NAME}_*.zip"))
+    # Com uma versão anterior, só regrava os artefatos quando houver alterações;
+    # com banco, o modo incremental também faz a carga completa da primeira versão
+    success = transformer.process(
+        YOUR_NAME, incremental=csv_path.exists() or transformer.database_url is not None
+    )
+    instrumentation.save_report(output_dir / "relatorio_execucao.json")
+    if not success:
+        raise RuntimeError("falha na transformação do Anexo I")
+    outputs = [csv_path, *sorted(set(output_dir.glob(f"Teste_{YOUR_NAME}_*.zip")) - before)]
+    for fmt in transformer.columnar_formats:
+        outputs.extend(output_dir.glob(f"rol_procedimentos.{fmt}"))
+    return outputs
+
+
+def archive_anexos(context):
+    """Compacta os PDFs dos anexos, como web_scraping/main.py"""
+    from web_scraping.main import WebScraper
+
+    options = context.options
+    zip_path = WebScraper(options["url"]).zip_anexos(
+        str(options["download_dir"]), str(options["archive_dir"]), codec="stored"
+    )
+    if zip_path is None:
+        raise RuntimeError("falha ao compactar os anexos")
+    return [zip_path]
+
+
+def contabeis_files(options):
+    from database.ingestion.contabeis import discover_files
+    return discover_files(options["data_dir"], options["years"])
+
+
+def ingest_contabeis(context):
+    """Carrega as demonstrações contábeis; os arquivos já carregados são ignorados pelo checksum"""
+    from database.ingestion.contabeis import ContabeisIngestion
+
+    options = context.options
+    ingestion = ContabeisIngestion(options["database_url"], workers=options["ingest_workers"])
+    reports = ingestion.ingest(contabeis_files(options))
+    failed = [Path(report.path).name for report in reports if report.status == 'falhou']
+    if failed:
+        raise RuntimeError(f"arquivos com erro: {', '.join(failed)}")
+    # Sem arquivos de saída: os dados ficam no banco
+    return []
+
+
+def anexo_path(options, name):
+    return Path(options["download_dir"]) / name
+
+
+def build_stages(options):
+    """DAG do pipeline da ANS
+
+    download_anexos -> transform_anexo_i
+                    -> archive_anexos
+    ingest_contabeis (independente)
+    """
+    download_dir = options["download_dir"]
+    return [
+        Stage("download_anexos", download_anexos, always_run=True, enabled=not options["offline"]),
+        Stage(
+            "transform_anexo_i", transform_anexo_i, deps=("download_anexos",),
+            inputs=[anexo_path(options, "Anexo_I.pdf")],
+            params={"output_dir": str(options["output_dir"]), **transformer_options(options)},
+        ),
+        Stage(
+            "archive_anexos", archive_anexos, deps=("download_anexos",),
+            inputs=[Path(download_dir) / "Anexo_I.pdf", Path(download_dir) / "Anexo_II.pdf"],
+            params={"archive_dir": str(options["archive_dir"])},
+        ),
+        Stage(
+            "ingest_contabeis", ingest_contabeis, inputs=lambda: contabeis_files(options),
+            params={"database_url": options["database_url"], "years": options["years"]},
+            enabled=bool(options["database_url"]),
+        ),
+    ]
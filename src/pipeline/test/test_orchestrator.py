@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from pipeline.orchestrator import Orchestrator, Stage
+
+
+class TestOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.state_path = self.tmp_dir / "estado.json"
+        self.source = self.tmp_dir / "entrada.txt"
+        self.source.write_text("v1")
+        self.calls = []
+        self.fail = set()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _stage(self, name, inputs=(), deps=(), **kwargs):
+        def run(context):
+            self.calls.append(name)
+            if name in self.fail:
+                raise RuntimeError(f"{name} falhou")
+            output = self.tmp_dir / f"{name}.out"
+            # Concatena as entradas, para que a saída mude junto com elas
+            output.write_text("".join(Path(path).read_text() for path in inputs) + name)
+            return [output]
+        return Stage(name, run, inputs=list(inputs), deps=deps, **kwargs)
+
+    def _pipeline(self, workers=2):
+        """entrada -> extrai -> transforma; arquiva depende só de extrai"""
+        return Orchestrator([
+            self._stage("extrai", [self.source]),
+            self._stage("transforma", [self.tmp_dir / "extrai.out"], ("extrai",)),
+            self._stage("arquiva", [self.tmp_dir / "extrai.out"], ("extrai",)),
+        ], self.state_path, workers=workers)
+
+    def _statuses(self, results):
+        return {name: result.status for name, result in results.items()}
+
+    def test_skips_unchanged_and_reruns_changed(self):
+        """Testa se só as etapas com entradas alteradas executam novamente"""
+        self._pipeline().run()
+        self.assertEqual(sorted(self.calls), ["arquiva", "extrai", "transforma"])
+
+        self.calls.clear()
+        results = self._pipeline().run()
+        self.assertEqual(self.calls, [])
+        self.assertEqual(set(self._statuses(results).values()), {"ignorado"})
+
+        self.source.write_text("v2")
+        self._pipeline().run()
+        self.assertEqual(sorted(self.calls), ["arquiva", "extrai", "transforma"])
+
+        # Saída removida: refaz só a etapa que a gerou
+        self.calls.clear()
+        os.remove(self.tmp_dir / "arquiva.out")
+        self._pipeline().run()
+        self.assertEqual(self.calls, ["arquiva"])
+
+    def test_resume_after_failure(self):
+        """Testa a retomada a partir da etapa que falhou, sem refazer as anteriores"""
+        self.fail = {"transforma"}
+        results = self._pipeline().run()
+        self.assertEqual(self._statuses(results),
+                         {"extrai": "executado", "transforma": "falhou", "arquiva": "executado"})
+
+        self.fail.clear()
+        self.calls.clear()
+        results = self._pipeline().run()
+        self.assertEqual(self.calls, ["transforma"])
+        self.assertEqual(results["transforma"].status, "executado")
+
+    def test_failure_blocks_dependents(self):
+        """Testa se as dependentes de uma etapa com falha não executam"""
+        self.fail = {"extrai"}
+        results = self._pipeline().run()
+        self.assertEqual(self._statuses(results),
+                         {"extrai": "falhou", "transforma": "bloqueado", "arquiva": "bloqueado"})
+        self.assertEqual(self.calls, ["extrai"])
+
+    def test_force_from(self):
+        """Testa se force_from refaz a etapa e as dependentes"""
+        self._pipeline().run()
+        self.calls.clear()
+        self._pipeline().run(force_from=["extrai"])
+        self.assertEqual(sorted(self.calls), ["arquiva", "extrai", "transforma"])
+        self.calls.clear()
+        self._pipeline().run(force=["arquiva"])
+        self.assertEqual(self.calls, ["arquiva"])
+
+    def test_independent_branches_run_concurrently(self):
+        """Testa se ramos independentes executam ao mesmo tempo"""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other(context):
+            # Só passa se a outra etapa estiver executando ao mesmo tempo
+            barrier.wait()
+            return []
+
+        results = Orchestrator([
+            Stage("anexo_i", wait_for_other), Stage("contabeis", wait_for_other)
+        ], self.state_path, workers=2).run()
+        self.assertEqual(set(self._statuses(results).values()), {"executado"})
+
+    def test_disabled_and_always_run(self):
+        """Testa etapas desativadas (dependentes seguem) e etapas que sempre executam"""
+        stages = [
+            self._stage("baixa", always_run=True),
+            self._stage("extrai", [self.source], ("baixa",)),
+            self._stage("carrega", enabled=False),
+        ]
+        Orchestrator(stages, self.state_path).run()
+        self.calls.clear()
+        results = Orchestrator(stages, self.state_path).run()
+        self.assertEqual(self.calls, ["baixa"])
+        self.assertEqual(self._statuses(results), {"baixa": "executado", "extrai": "ignorado", "carrega": "desativado"})
+
+    def test_invalid_graph(self):
+        """Testa dependências inexistentes e ciclos"""
+        with self.assertRaises(ValueError):
+            Orchestrator([self._stage("a", deps=("b",))], self.state_path)
+        with self.assertRaises(ValueError):
+            Orchestrator([self._stage("a", deps=("b",)), self._stage("b", deps=("a",))], self.state_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
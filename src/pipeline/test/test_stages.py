@@ -0,0 +1,63 @@
+import inspect
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+from data_transformation.Data_transformtion import ANSDataTransformer
+from pipeline.orchestrator import Orchestrator
+from pipeline.stages import build_stages, transformer_options
+
+
+class TestTransformStageParams(unittest.TestCase):
+    def setUp(self):
+        self.options = {
+            "url": "http://localhost", "download_dir": Path("downloads"), "output_dir": Path("output"),
+            "archive_dir": Path("arquivos"), "data_dir": "dados", "years": ["2024"],
+            "database_url": None, "pdf_workers": 2, "ingest_workers": 1, "offline": True,
+        }
+
+    def _params(self, **options):
+        stages = {stage.name: stage for stage in build_stages({**self.options, **options})}
+        return stages["transform_anexo_i"].params
+
+    def test_options_match_transformer(self):
+        """Testa que toda opção repassada ao transformador é um parâmetro do construtor"""
+        accepted = inspect.signature(ANSDataTransformer).parameters
+        self.assertEqual(set(transformer_options(self.options)) - set(accepted), set())
+
+    def test_output_options_change_params(self):
+        """Testa que as opções que mudam as saídas mudam os params da etapa"""
+        base = self._params()
+        for options in (
+            {"layout_template": True}, {"columnar_formats": ["parquet"]}, {"partition_by": "CAPITULO"},
+            {"codec": "stored"}, {"keep_csv": False}, {"output_dir": Path("outro")},
+        ):
+            with self.subTest(options=options):
+                self.assertNotEqual(self._params(**options), base)
+
+        with mock.patch.dict(os.environ, {"ROL_DATABASE_URL": "sqlite:///rol.db"}):
+            self.assertNotEqual(self._params(), base)
+
+    def test_pdf_workers_keep_stage_up_to_date(self):
+        """Testa que mudar só a quantidade de processos da extração não refaz a etapa"""
+        tmp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        (tmp_dir / "Anexo_I.pdf").write_bytes(b"%PDF")
+        calls = []
+
+        def run(pdf_workers):
+            options = {**self.options, "download_dir": tmp_dir, "output_dir": tmp_dir, "pdf_workers": pdf_workers}
+            stage = {stage.name: stage for stage in build_stages(options)}["transform_anexo_i"]
+            stage = replace(stage, run=lambda context: calls.append(pdf_workers) or [], deps=())
+            return Orchestrator([stage], tmp_dir / "estado.json").run()["transform_anexo_i"].status
+
+        self.assertEqual(run(2), "executado")
+        self.assertEqual(run(8), "ignorado")
+        self.assertEqual(calls, [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,296 @@
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+from loguru import logger as log
+
+CHUNK_SIZE = 256 * 1024
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+class DownloadError(Exception):
+    pass
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: str
+    status: str  # 'downloaded', 'resumed' ou 'not_modified'
+    size: int
+    sha256: str
+
+
+class ConnectionPool:
+    """Mantém conexões HTTP(S) abertas por host para reaproveitá-las entre downloads"""
+
+    def __init__(self, timeout=30, max_idle_per_host=4):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme, netloc):
+        """Retorna (conexão, reaproveitada)"""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self.connect(scheme, netloc), False
+
+    def connect(self, scheme, netloc):
+        """Abre uma conexão nova, sem passar pelas conexões ociosas"""
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout)
+
+    def release(self, scheme, netloc, connection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+class Downloader:
+    """Baixa arquivos em paralelo com retomada, requisições condicionais e escrita atômica
+
+    Para cada destino são mantidos dois arquivos auxiliares:
+    - <destino>.part: download em andamento, retomado com HTTP Range
+    - <destino>.meta.json: ETag, Last-Modified, tamanho e SHA-256 do último
+      download concluído, usados para pular arquivos que não mudaram
+    O arquivo final só aparece (via os.replace) depois de completo.
+    """
+
+    def __init__(self, workers=4, timeout=30, retries=3, backoff=1.0, chunk_size=CHUNK_SIZE):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.chunk_size = chunk_size
+        self.pool = ConnectionPool(timeout=timeout, max_idle_per_host=workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+
+    def download_many(self, jobs):
+        """Baixa concorrentemente uma lista de (url, destino); retorna os DownloadResult na mesma ordem"""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.download, url, dest) for url, dest in jobs]
+            return [future.result() for future in futures]
+
+    def download(self, url, dest):
+        """Baixa url para dest, tentando novamente (e retomando) em caso de falha"""
+        dest = str(dest)
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        for attempt in range(1, self.retries + 1):
+            try:
+                return self._download_once(url, dest)
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                if attempt == self.retries:
+                    raise DownloadError(f"Falha ao baixar {url} após {attempt} tentativas: {e}") from e
+                wait = self.backoff * 2 ** (attempt - 1)
+                log.warning(f"Tentativa {attempt} de baixar {url} falhou ({e}); nova tentativa em {wait:.1f}s")
+                time.sleep(wait)
+
+    @staticmethod
+    def meta_path(dest):
+        return f"{dest}.meta.json"
+
+    @staticmethod
+    def part_path(dest):
+        return f"{dest}.part"
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def file_sha256(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def verify(self, dest):
+        """Confere o arquivo baixado com o SHA-256 registrado nos metadados"""
+        meta = self._read_json(self.meta_path(dest))
+        return bool(meta) and os.path.exists(dest) and self.file_sha256(dest) == meta.get('sha256')
+
+    def _request(self, url, headers, max_redirects=5):
+        """Executa um GET seguindo redirecionamentos; retorna (resposta, conexão, url_final)"""
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            path = parts.path or '/'
+            if parts.query:
+                path = f"{path}?{parts.query}"
+
+            response, connection = self._send(parts, path, headers)
+
+            if response.status in REDIRECT_CODES:
+                location = response.getheader('Location')
+                response.read()
+                self.pool.release(parts.scheme, parts.netloc, connection)
+                if not location:
+                    raise DownloadError(f"Redirecionamento sem Location em {url}")
+                url = urljoin(url, location)
+                continue
+            return response, connection, url
+        raise DownloadError(f"Redirecionamentos demais a partir de {url}")
+
+    def _send(self, parts, path, headers):
+        connection, reused = self.pool.acquire(parts.scheme, parts.netloc)
+        try:
+            connection.request('GET', path, headers={'User-Agent': USER_AGENT, **headers})
+            return connection.getresponse(), connection
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+        # Conexão ociosa fechada pelo servidor: tenta de novo com uma conexão nova
+        connection = self.pool.connect(parts.scheme, parts.netloc)
+        try:
+            connection.request('GET', path, headers={'User-Agent': USER_AGENT, **headers})
+            return connection.getresponse(), connection
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+
+    def _download_once(self, url, dest):
+        meta_path = self.meta_path(dest)
+        part_path = self.part_path(dest)
+        part_meta_path = f"{part_path}.json"
+        meta = self._read_json(meta_path) if os.path.exists(dest) else {}
+        part_meta = self._read_json(part_meta_path)
+
+        headers = {}
+        # Requisição condicional: o servidor responde 304 se o arquivo não mudou
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        # Retomada: pede apenas os bytes que faltam, desde que o arquivo no
+        # servidor ainda seja o mesmo do download parcial (If-Range)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = part_meta.get('etag') or part_meta.get('last_modified')
+        if offset and validator and part_meta.get('url') == url:
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = validator
+        else:
+            offset = 0
+
+        response, connection, final_url = self._request(url, headers)
+        parts = urlsplit(final_url)
+        # A conexão só volta ao pool com a resposta lida por completo
+        reusable = False
+        try:
+            if response.status == 304:
+                response.read()
+                reusable = True
+                if self.verify(dest):
+                    log.info(f"Sem alterações, download ignorado: {os.path.basename(dest)}")
+                    return DownloadResult(url, dest, 'not_modified', meta['size'], meta['sha256'])
+                # Arquivo local divergente dos metadados: baixa novamente por completo
+                os.remove(meta_path)
+                raise DownloadError(f"Arquivo local diferente do registrado: {dest}")
+
+            if response.status == 206:
+                status = 'resumed'
+                start = self._content_range_start(response)
+                if start != offset:
+                    # Intervalo diferente do pedido: não pode ser anexado ao .part
+                    os.remove(part_path)
+                    raise DownloadError(
+                        f"Content-Range de {url} começa em {start}, não em {offset}; reiniciando"
+                    )
+            elif response.status == 200:
+                status = 'downloaded'
+                offset = 0
+            elif response.status == 416:
+                response.read()
+                os.remove(part_path)
+                raise DownloadError(f"Intervalo inválido ao retomar {url}; reiniciando")
+            else:
+                response.read()
+                raise DownloadError(f"HTTP {response.status} ao baixar {url}")
+
+            etag = response.getheader('ETag')
+            last_modified = response.getheader('Last-Modified')
+            self._write_json(part_meta_path, {'url': url, 'etag': etag, 'last_modified': last_modified})
+
+            length = response.getheader('Content-Length')
+            expected = offset + int(length) if length is not None else None
+            size = self._write_body(response, part_path, offset)
+            if expected is not None and size != expected:
+                raise DownloadError(f"Download incompleto de {url}: {size} de {expected} bytes")
+            reusable = True
+        finally:
+            response.close()
+            if reusable:
+                self.pool.release(parts.scheme, parts.netloc, connection)
+            else:
+                connection.close()
+
+        sha256 = self.file_sha256(part_path)
+        os.replace(part_path, dest)
+        os.remove(part_meta_path)
+        self._write_json(meta_path, {
+            'url': url,
+            'final_url': final_url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': size,
+            'sha256': sha256,
+        })
+        verb = "Retomado" if status == 'resumed' else "Baixado"
+        log.success(f"{verb}: {os.path.basename(dest)} ({size} bytes, sha256 {sha256[:12]})")
+        return DownloadResult(url, dest, status, size, sha256)
+
+    @staticmethod
+    def _content_range_start(response):
+        """Primeiro byte do Content-Range ('bytes início-fim/total') de uma resposta 206, ou None"""
+        value = response.getheader('Content-Range') or ''
+        unit, _, byte_range = value.partition(' ')
+        start = byte_range.partition('-')[0]
+        return int(start) if unit == 'bytes' and start.isdigit() else None
+
+    def _write_body(self, response, part_path, offset):
+        """Grava o corpo da resposta no arquivo parcial a partir de offset; retorna o tamanho final"""
+        mode = 'r+b' if offset else 'wb'
+        with open(part_path, mode) as f:
+            f.seek(offset)
+            f.truncate()
+            for chunk in iter(lambda: response.read(self.chunk_size), b''):
+                f.write(chunk)
+            return f.tell()
@@ -0,0 +1,97 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+from loguru import logger as log
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # Dependência opcional: sem lxml, usa o parser da biblioteca padrão
+    lxml_html = None
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0"
+
+# Mesmos critérios usados com o Selenium: texto do link e href apontando para PDF
+ANEXO_XPATHS = {
+    "Anexo I": "//a[contains(., 'Anexo I') and contains(@href, '.pdf')]",
+    "Anexo II": "//a[contains(., 'Anexo II') and contains(@href, '.pdf')]",
+}
+
+
+def fetch_html(url, timeout=15):
+    """Baixa o HTML da página via HTTP simples, sem navegador"""
+    request = Request(url, headers={"User-Agent": USER_AGENT})
+    with urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        return response.read().decode(charset, errors="replace")
+
+
+class _AnchorCollector(HTMLParser):
+    """Coleta (href, texto) de cada <a>, na ordem do documento"""
+
+    def __init__(self):
+        super().__init__()
+        self.anchors = []
+        self._open = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._open.append([dict(attrs).get("href") or "", []])
+
+    def handle_data(self, data):
+        for anchor in self._open:
+            anchor[1].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._open:
+            href, text = self._open.pop()
+            self.anchors.append((href, "".join(text)))
+
+
+def _find_with_lxml(page_html):
+    tree = lxml_html.fromstring(page_html)
+    links = {}
+    for name, xpath in ANEXO_XPATHS.items():
+        elements = tree.xpath(xpath)
+        if elements:
+            links[name] = elements[0].get("href")
+    return links
+
+
+def _find_with_html_parser(page_html):
+    collector = _AnchorCollector()
+    collector.feed(page_html)
+    collector.close()
+    links = {}
+    for name in ANEXO_XPATHS:
+        for href, text in collector.anchors:
+            if name in text and ".pdf" in href:
+                links[name] = href
+                break
+    return links
+
+
+def find_anexo_links(page_html, base_url):
+    """Localiza os links do Anexo I e do Anexo II no HTML estático
+
+    Retorna um dict com as URLs absolutas encontradas, com o primeiro link que
+    satisfaz cada critério, como o Selenium faria.
+    """
+    if lxml_html is not None:
+        links = _find_with_lxml(page_html)
+    else:
+        links = _find_with_html_parser(page_html)
+    return {name: urljoin(base_url, href) for name, href in links.items()}
+
+
+def discover_anexo_links(url, timeout=15):
+    """Busca a página e retorna os links dos anexos, ou None se não estiverem no HTML estático"""
+    try:
+        links = find_anexo_links(fetch_html(url, timeout), url)
+    except Exception as e:
+        log.warning(f"Falha ao buscar a página sem navegador: {str(e)}")
+        return None
+
+    if set(links) != set(ANEXO_XPATHS):
+        log.info("Links dos anexos não encontrados no HTML estático")
+        return None
+    return links
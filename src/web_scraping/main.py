@@ -4,15 +4,25 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from loguru import logger as log
 import os
-from urllib.request import urlretrieve
-import zipfile
-from datetime import datetime as dt
+import sys
+from pathlib import Path
+
+# Permite importar os módulos compartilhados do projeto quando executado como script
+SRC_DIR = Path(__file__).resolve().parent.parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from common.archive import timestamped_zip_path, zip_files
+from web_scraping.downloader import Downloader
+from web_scraping.link_finder import ANEXO_XPATHS, discover_anexo_links
 
 
 class WebScraper:
     def __init__(self, url):
         self.url = url
         self.driver = None
+        # Links dos anexos encontrados sem navegador (find_links_static)
+        self.links = None
         
     
     # Essa função aqui vai iniciar o navegador
@@ -46,6 +56,7 @@ class WebScraper:
 
             log.debug("Função executada com sucesso")
             #self.driver.find_element(By.XPATH, "/html/body/div[2]/div[1]/main/div[2]/div/div/div/div/div[2]/div/ol/li[1]/a[1]").click()
+            return True
 
         except Exception as e:
             log.error(f"Erro ao iniciar o navegador: {str(e)}")
@@ -53,26 +64,47 @@ class WebScraper:
                 self.driver.quit()
             return False
 
+    # Caminho rápido: busca a página via HTTP e procura os links no HTML
+    # estático, sem iniciar o Firefox. Retorna False se os links não estiverem
+    # no HTML, e nesse caso é preciso usar start_browser
+    def find_links_static(self):
+        log.info("Procurando os links dos anexos sem navegador")
+        self.links = discover_anexo_links(self.url)
+        if self.links:
+            log.success("Links dos anexos encontrados no HTML estático")
+            return True
+        return False
+
+    def find_links_browser(self):
+        """Localiza os links dos anexos na página aberta no navegador"""
+        links = {}
+        for name, xpath in ANEXO_XPATHS.items():
+            element = WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.XPATH, xpath))
+            )
+            links[name] = element.get_attribute('href')
+        return links
+
     def get_anexos(self, download_dir="downloads"):
-        """Baixa os anexos usando urllib (biblioteca padrão)"""
+        """Baixa os anexos em paralelo, retomando downloads parciais e pulando arquivos sem alteração"""
         try:
             os.makedirs(download_dir, exist_ok=True)
             
-            # Localiza os links dos anexos
-            anexo_i = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//a[contains(., 'Anexo I') and contains(@href, '.pdf')]"))
-            )
-            anexo_ii = WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located((By.XPATH, "//a[contains(., 'Anexo II') and contains(@href, '.pdf')]"))
-            )
+            # Localiza os links dos anexos (no navegador, se o caminho rápido não os encontrou)
+            links = self.links or self.find_links_browser()
 
             # Obtém URLs
-            url_i = anexo_i.get_attribute('href')
-            url_ii = anexo_ii.get_attribute('href')
+            url_i = links["Anexo I"]
+            url_ii = links["Anexo II"]
 
             # Faz o download
-            urlretrieve(url_i, os.path.join(download_dir, "Anexo_I.pdf"))
-            urlretrieve(url_ii, os.path.join(download_dir, "Anexo_II.pdf"))
+            with Downloader(workers=2) as downloader:
+                results = downloader.download_many([
+                    (url_i, os.path.join(download_dir, "Anexo_I.pdf")),
+                    (url_ii, os.path.join(download_dir, "Anexo_II.pdf")),
+                ])
+            for result in results:
+                log.info(f"{os.path.basename(result.path)}: {result.status} (sha256 {result.sha256})")
             
             return True
 
@@ -88,7 +120,9 @@ class WebScraper:
             log.debug("Navegador fechado com sucesso")
 
     # Função que vaI ZIPAR os anexos
-    def zip_anexos(self, download_dir="downloads", output_dir="output"):
+    # codec aceita 'deflate', 'deflate:9', 'stored' (os PDFs já são
+    # comprimidos internamente), ... e os anexos são comprimidos em paralelo
+    def zip_anexos(self, download_dir="downloads", output_dir="output", codec="deflate"):
 
         try:
             # Cria diretório de saída se não existir
@@ -103,16 +137,17 @@ class WebScraper:
                 return None
             
             # Nome do arquivo ZIP com timestamp
-            timestamp = dt.now().strftime("%Y%m%d_%H%M%S")
-            zip_filename = f"Teste_ErickFernandesDeFariasSantos_{timestamp}.zip"
-            zip_path = os.path.join(output_dir, zip_filename)
+            zip_path = timestamped_zip_path(output_dir, "ErickFernandesDeFariasSantos")
             
             # Cria o arquivo ZIP
             log.info(f"Criando arquivo ZIP: {zip_path}")
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                zipf.write(anexo_i_path, arcname="Anexo_I.pdf")
-                zipf.write(anexo_ii_path, arcname="Anexo_II.pdf")
-                log.success(f"Adicionados Anexo_I.pdf e Anexo_II.pdf ao ZIP")
+            zip_files(
+                zip_path,
+                [(anexo_i_path, "Anexo_I.pdf"), (anexo_ii_path, "Anexo_II.pdf")],
+                codec=codec,
+                desc="Compactando anexos"
+            )
+            log.success(f"Adicionados Anexo_I.pdf e Anexo_II.pdf ao ZIP")
             
             log.success(f"Compactação concluída: {zip_path}")
             return zip_path
@@ -128,7 +163,9 @@ if __name__ == "__main__":
     scraper = WebScraper(url)
 
     try:
-        scraper.start_browser()
+        # O Firefox só é iniciado se os links não estiverem no HTML estático
+        if not scraper.find_links_static():
+            scraper.start_browser()
         scraper.get_anexos()
         scraper.zip_anexos()
     except Exception as e:
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from web_scraping.downloader import Downloader, DownloadError
+
+
+class AnexoHandler(BaseHTTPRequestHandler):
+    """Servidor local que simula o portal da ANS: ETag, Range e falhas no meio do corpo"""
+
+    protocol_version = "HTTP/1.1"
+    files = {}
+    requests = []
+    # Quantidade de bytes enviados antes de derrubar a conexão (None = sem falha)
+    fail_after = None
+    # Deslocamento indevido do intervalo enviado em respostas 206
+    range_skew = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests.append((self.path, dict(self.headers)))
+        if self.path == "/redirect/Anexo_I.pdf":
+            self.send_response(302)
+            self.send_header("Location", "/files/Anexo_I.pdf")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        name = self.path.rsplit("/", 1)[-1]
+        if name not in self.files:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = self.files[name]
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == etag:
+            start = int(range_header.split("=")[1].rstrip("-")) + type(self).range_skew
+            type(self).range_skew = 0
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+
+        payload = body[start:]
+        if type(self).fail_after is not None:
+            payload = payload[:type(self).fail_after]
+            type(self).fail_after = None
+            self.wfile.write(payload)
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+
+class TestDownloader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), AnexoHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.download_dir = tempfile.mkdtemp()
+        AnexoHandler.files = {
+            "Anexo_I.pdf": b"%PDF-1.4 anexo I " + os.urandom(300 * 1024),
+            "Anexo_II.pdf": b"%PDF-1.4 anexo II " + os.urandom(200 * 1024),
+        }
+        AnexoHandler.requests = []
+        AnexoHandler.fail_after = None
+        AnexoHandler.range_skew = 0
+        self.downloader = Downloader(workers=2, retries=3, backoff=0)
+
+    def tearDown(self):
+        self.downloader.close()
+        shutil.rmtree(self.download_dir)
+
+    def _jobs(self):
+        return [
+            (f"{self.base_url}/files/{name}", os.path.join(self.download_dir, name))
+            for name in ("Anexo_I.pdf", "Anexo_II.pdf")
+        ]
+
+    def test_concurrent_download_and_checksum(self):
+        """Testa o download concorrente e o registro do checksum"""
+        results = self.downloader.download_many(self._jobs())
+
+        for result in results:
+            name = os.path.basename(result.path)
+            self.assertEqual(result.status, "downloaded")
+            with open(result.path, "rb") as f:
+                self.assertEqual(f.read(), AnexoHandler.files[name])
+            self.assertEqual(result.sha256, hashlib.sha256(AnexoHandler.files[name]).hexdigest())
+            self.assertTrue(self.downloader.verify(result.path))
+            self.assertFalse(os.path.exists(result.path + ".part"))
+
+    def test_unchanged_files_are_skipped(self):
+        """Testa se arquivos sem alteração não são baixados novamente"""
+        self.downloader.download_many(self._jobs())
+        results = self.downloader.download_many(self._jobs())
+        self.assertEqual([r.status for r in results], ["not_modified", "not_modified"])
+        # As conexões das respostas 304 voltam ao pool
+        self.assertGreater(sum(len(idle) for idle in self.downloader.pool._idle.values()), 0)
+
+        AnexoHandler.files["Anexo_II.pdf"] += b"nova versao"
+        results = self.downloader.download_many(self._jobs())
+        self.assertEqual([r.status for r in results], ["not_modified", "downloaded"])
+
+    def test_resume_after_connection_drop(self):
+        """Testa a retomada com Range depois de uma queda no meio do download"""
+        url, dest = self._jobs()[0]
+        AnexoHandler.fail_after = 100 * 1024
+
+        result = self.downloader.download(url, dest)
+
+        self.assertEqual(result.status, "resumed")
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), AnexoHandler.files["Anexo_I.pdf"])
+        self.assertEqual(AnexoHandler.requests[-1][1].get("Range"), f"bytes={100 * 1024}-")
+
+    def test_wrong_content_range_restarts(self):
+        """Testa se um 206 com intervalo diferente do pedido reinicia o download do zero"""
+        url, dest = self._jobs()[0]
+        AnexoHandler.fail_after = 100 * 1024
+        AnexoHandler.range_skew = 10
+
+        result = self.downloader.download(url, dest)
+
+        self.assertEqual(result.status, "downloaded")
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), AnexoHandler.files["Anexo_I.pdf"])
+        self.assertNotIn("Range", AnexoHandler.requests[-1][1])
+
+    def test_follows_redirect(self):
+        """Testa se redirecionamentos são seguidos"""
+        dest = os.path.join(self.download_dir, "Anexo_I.pdf")
+        result = self.downloader.download(f"{self.base_url}/redirect/Anexo_I.pdf", dest)
+        self.assertEqual(result.size, len(AnexoHandler.files["Anexo_I.pdf"]))
+
+    def test_missing_file_does_not_create_destination(self):
+        """Testa se um erro HTTP não deixa arquivo final para trás"""
+        dest = os.path.join(self.download_dir, "Anexo_III.pdf")
+        with self.assertRaises(DownloadError):
+            self.downloader.download(f"{self.base_url}/files/Anexo_III.pdf", dest)
+        self.assertFalse(os.path.exists(dest))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from web_scraping import link_finder
+from web_scraping.main import WebScraper
+
+FIXTURES = Path(__file__).parent / "fixtures"
+PAGE_URL = "https://www.gov.br/ans/pt-br/acesso-a-informacao/participacao-da-sociedade/atualizacao-do-rol-de-procedimentos"
+BASE = PAGE_URL + "/"
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class TestLinkFinder(unittest.TestCase):
+    expected = {
+        "Anexo I": BASE + "Anexo_I_Rol_2021RN_465.2021_RN627L.2025.pdf",
+        "Anexo II": "https://www.gov.br/ans/pt-br/acesso-a-informacao/participacao-da-sociedade/"
+                    "atualizacao-do-rol-de-procedimentos/Anexo_II_DUT_2021_RN_465.2021_RN628.2025.pdf",
+    }
+
+    def test_find_links_with_lxml(self):
+        """Testa a seleção dos links com XPath (lxml)"""
+        if link_finder.lxml_html is None:
+            self.skipTest("lxml não instalado")
+        links = link_finder.find_anexo_links(read_fixture("rol_procedimentos.html"), PAGE_URL)
+        self.assertEqual(links, self.expected)
+
+    def test_find_links_with_html_parser(self):
+        """Testa a seleção dos links com o parser da biblioteca padrão"""
+        with patch.object(link_finder, "lxml_html", None):
+            links = link_finder.find_anexo_links(read_fixture("rol_procedimentos.html"), PAGE_URL)
+        self.assertEqual(links, self.expected)
+
+    @patch("web_scraping.link_finder.fetch_html")
+    def test_static_page_skips_browser(self, mock_fetch):
+        """Testa se o navegador não é necessário quando os links estão no HTML"""
+        mock_fetch.return_value = read_fixture("rol_procedimentos.html")
+        scraper = WebScraper(PAGE_URL)
+
+        self.assertTrue(scraper.find_links_static())
+        self.assertEqual(scraper.links, self.expected)
+        self.assertIsNone(scraper.driver)
+
+    @patch("web_scraping.link_finder.fetch_html")
+    def test_dynamic_page_requires_browser(self, mock_fetch):
+        """Testa o retorno ao Selenium quando os links são gerados por JavaScript"""
+        mock_fetch.return_value = read_fixture("rol_procedimentos_dinamico.html")
+        scraper = WebScraper(PAGE_URL)
+
+        self.assertFalse(scraper.find_links_static())
+        self.assertIsNone(scraper.links)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,5 +53,21 @@ class TestWebScraper(unittest.TestCase):
         self.scraper.close_browser()
         self.scraper.driver.close.assert_called_once()
 
+    def test_zip_anexos(self):
+        """Testa a compactação dos anexos em um único ZIP"""
+        import tempfile, zipfile
+        output_dir = tempfile.mkdtemp()
+        for name in ("Anexo_I.pdf", "Anexo_II.pdf"):
+            with open(os.path.join(self.download_dir, name), "wb") as f:
+                f.write(b"%PDF-1.4 " + name.encode() * 1000)
+
+        zip_path = self.scraper.zip_anexos(self.download_dir, output_dir, codec="stored")
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            self.assertEqual(zipf.namelist(), ["Anexo_I.pdf", "Anexo_II.pdf"])
+            self.assertTrue(zipf.read("Anexo_II.pdf").startswith(b"%PDF-1.4 Anexo_II.pdf"))
+        os.remove(zip_path)
+        os.rmdir(output_dir)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file